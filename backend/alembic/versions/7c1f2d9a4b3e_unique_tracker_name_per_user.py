@@ -0,0 +1,52 @@
+"""unique tracker name per user
+
+Revision ID: 7c1f2d9a4b3e
+Revises: 44333bd5c5d5
+Create Date: 2026-10-17 10:12:41.204118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1f2d9a4b3e"
+down_revision: Union[str, None] = "44333bd5c5d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge duplicate trackers (same user and name) into the oldest one
+    op.execute("""
+        CREATE TEMPORARY TABLE tracker_duplicates AS
+        SELECT id, keep_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY user_id, name ORDER BY created_at, id
+            ) AS keep_id
+            FROM trackers
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        UPDATE entries SET tracker_id = d.keep_id
+        FROM tracker_duplicates d WHERE entries.tracker_id = d.id
+    """)
+    op.execute("""
+        UPDATE scheduled_events SET tracker_id = d.keep_id
+        FROM tracker_duplicates d WHERE scheduled_events.tracker_id = d.id
+    """)
+    op.execute("DELETE FROM trackers WHERE id IN (SELECT id FROM tracker_duplicates)")
+    op.execute("DROP TABLE tracker_duplicates")
+
+    op.create_index(
+        "ix_trackers_user_id_name", "trackers", ["user_id", "name"], unique=True
+    )
+    op.drop_index(op.f("ix_trackers_user_id"), table_name="trackers")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_trackers_user_id"), "trackers", ["user_id"], unique=False)
+    op.drop_index("ix_trackers_user_id_name", table_name="trackers")
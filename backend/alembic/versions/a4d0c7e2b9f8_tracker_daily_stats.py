@@ -0,0 +1,54 @@
+"""tracker daily stats
+
+Revision ID: a4d0c7e2b9f8
+Revises: d2a7f4e91c05
+Create Date: 2026-10-17 13:21:36.094517
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d0c7e2b9f8"
+down_revision: Union[str, None] = "d2a7f4e91c05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by scripts/backfill_daily_stats.py
+    op.create_table(
+        "tracker_daily_stats",
+        sa.Column("tracker_id", sa.UUID(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("entry_count", sa.Integer(), nullable=False),
+        sa.Column("volume", sa.Float(), nullable=True),
+        sa.Column("max_weight", sa.Float(), nullable=True),
+        sa.Column("fields", postgresql.JSONB(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["tracker_id"], ["trackers.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("tracker_id", "day"),
+    )
+    op.create_index(
+        "ix_tracker_daily_stats_user_id_day",
+        "tracker_daily_stats",
+        ["user_id", "day"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_tracker_daily_stats_user_id_day", table_name="tracker_daily_stats"
+    )
+    op.drop_table("tracker_daily_stats")
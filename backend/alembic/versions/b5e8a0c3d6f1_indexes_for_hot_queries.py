@@ -0,0 +1,81 @@
+"""indexes for hot queries
+
+Revision ID: b5e8a0c3d6f1
+Revises: 7c1f2d9a4b3e
+Create Date: 2026-10-17 11:02:17.583920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e8a0c3d6f1"
+down_revision: Union[str, None] = "7c1f2d9a4b3e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so entries stay writable meanwhile, which can't
+    # happen inside the migration's transaction
+    with op.get_context().autocommit_block():
+        # Newest entries per tracker / per user, id breaking timestamp ties for
+        # keyset pagination; the leading columns also serve the plain user_id
+        # and tracker_id lookups of the old indexes
+        for column in ("tracker_id", "user_id"):
+            op.create_index(
+                f"ix_entries_{column}_timestamp",
+                "entries",
+                [column, sa.text("timestamp DESC"), sa.text("id DESC")],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                op.f(f"ix_entries_{column}"),
+                table_name="entries",
+                postgresql_concurrently=True,
+            )
+
+    # Keep only the most recently updated routine active per user. routines
+    # is small, so its index is built in the same transaction as the clean-up
+    op.execute("""
+        UPDATE routines SET is_active = false
+        WHERE is_active AND id NOT IN (
+            SELECT DISTINCT ON (user_id) id FROM routines
+            WHERE is_active
+            ORDER BY user_id, updated_at DESC, id
+        )
+    """)
+    op.create_index(
+        "ix_routines_user_id_active",
+        "routines",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("is_active IS true"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_routines_user_id_active",
+        table_name="routines",
+        postgresql_where=sa.text("is_active IS true"),
+    )
+    with op.get_context().autocommit_block():
+        for column in ("tracker_id", "user_id"):
+            op.create_index(
+                op.f(f"ix_entries_{column}"),
+                "entries",
+                [column],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                f"ix_entries_{column}_timestamp",
+                table_name="entries",
+                postgresql_concurrently=True,
+            )
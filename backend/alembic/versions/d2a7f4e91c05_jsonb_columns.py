@@ -0,0 +1,65 @@
+"""jsonb columns
+
+Revision ID: d2a7f4e91c05
+Revises: b5e8a0c3d6f1
+Create Date: 2026-10-17 11:48:55.317402
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a7f4e91c05"
+down_revision: Union[str, None] = "b5e8a0c3d6f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_COLUMNS = [
+    ("entries", "data", False),
+    ("trackers", "schema", False),
+    ("routines", "config", False),
+    ("scheduled_events", "reminder_settings", True),
+]
+
+
+def upgrade() -> None:
+    for table, column, nullable in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.JSON(),
+            type_=postgresql.JSONB(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::jsonb",
+        )
+    op.create_index(
+        "ix_entries_data",
+        "entries",
+        ["data"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_entries_data",
+        table_name="entries",
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+    for table, column, nullable in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=postgresql.JSONB(),
+            type_=sa.JSON(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::json",
+        )
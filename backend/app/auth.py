@@ -2,10 +2,11 @@
 
 import logging
 import re
+import secrets
 from typing import Annotated
 
 import jwt  # type: ignore[import-untyped]
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.config import settings
@@ -238,3 +239,21 @@ async def get_current_user(
 
 # Type alias for cleaner dependency injection
 CurrentUser = Annotated[ClerkUser, Depends(get_current_user)]
+
+
+async def require_admin(
+    x_admin_key: Annotated[str | None, Header()] = None,
+) -> None:
+    """FastAPI dependency guarding operational endpoints with a shared key."""
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled",
+        )
+    if not x_admin_key or not secrets.compare_digest(
+        x_admin_key, settings.admin_api_key
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key",
+        )
@@ -1,22 +1,319 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from typing import Any, cast
+from uuid import uuid4
 
+import redis.asyncio as redis
+from sqlalchemy import JSON, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    NullPool,
+    Pool,
+    QueuePool,
+)
+
+from app.auth import CurrentUser
 from app.config import settings
+from app.metrics import HitRatio, Summary, register
+
+logger = logging.getLogger(__name__)
 
 # Convert postgresql:// to postgresql+asyncpg://
 database_url = settings.database_url.replace(
     "postgresql://", "postgresql+asyncpg://"
 )
+database_read_url = settings.database_read_url.replace(
+    "postgresql://", "postgresql+asyncpg://"
+)
+
+# Reads served by the replica (hits) vs. sent to the primary after a write
+replica_reads = register(HitRatio("read_replica"))
+
+
+class PoolStats:
+    """Checkout waits and connection usage of an engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait = Summary(f"{name}_checkout_wait_seconds")
+        self.timeouts = 0
+        self.engine: AsyncEngine | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        values: dict[str, Any] = {
+            "timeouts": self.timeouts,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+        }
+        pool = self.engine.pool if self.engine is not None else None
+        if isinstance(pool, QueuePool):
+            values["size"] = pool.size()
+            values["in_use"] = pool.checkedout()
+            # Connections opened beyond pool_size; negative means unopened capacity
+            values["overflow"] = max(0, pool.overflow())
+        return values
+
+
+class _TimedCheckout(Pool):
+    """Pool mixin that records how long each checkout waited."""
+
+    stats: PoolStats | None = None
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.stats is not None:
+                self.stats.timeouts += 1
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.checkout_wait.observe(time.perf_counter() - started)
+
+    def recreate(self) -> Pool:
+        # Pool.recreate() builds another instance of the same class
+        pool = cast(_TimedCheckout, super().recreate())
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """Per-worker connection pool, the default."""
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    """Opens a connection per checkout, for use behind an external pooler."""
+
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def build_engine(
+    url: str,
+    stats: PoolStats | None = None,
+    external_pooler: bool | None = None,
+    **overrides: Any,
+) -> AsyncEngine:
+    """Create an engine with the pool and statement cache from settings.
+
+    With an external pooler (PgBouncer in transaction mode) connections are
+    not pooled here, and prepared statements are neither cached nor reused
+    by name, since consecutive transactions may run on different server
+    connections. Keyword arguments override the settings, e.g. pool_size=1
+    in tests.
+    """
+    if external_pooler is None:
+        external_pooler = settings.db_external_pooler
+
+    options: dict[str, Any] = {"echo": settings.db_echo}
+    if external_pooler:
+        options["poolclass"] = TimedNullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+
+    if url.startswith("postgresql+asyncpg") and external_pooler:
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _prepared_statement_name,
+        }
+    elif url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            # asyncpg's own statement cache per connection
+            "statement_cache_size": settings.db_statement_cache_size,
+            # SQLAlchemy's cache of prepared statements per connection
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        }
+    options.update(overrides)
+
+    engine = create_async_engine(url, **options)
+    if stats is not None and isinstance(engine.pool, _TimedCheckout):
+        engine.pool.stats = stats
+        stats.engine = engine
+    return engine
+
+
+class RecentWrites:
+    """Users who wrote within the last few seconds.
+
+    A replica lags behind the primary, so these users read from the
+    primary until the window has passed. Kept per worker and shared
+    through Redis when configured, since the next request may be served
+    by another worker.
+    """
+
+    KEY_PREFIX = "recent-write:"
+
+    def __init__(
+        self,
+        window_seconds: float,
+        redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
+    ):
+        self._window = window_seconds
+        self._redis = redis_client
+        # user_id -> expires_at, oldest write first
+        self._local: OrderedDict[str, float] = OrderedDict()
+
+    def _prune(self, now: float) -> None:
+        while self._local:
+            user_id, expires_at = next(iter(self._local.items()))
+            if expires_at > now:
+                return
+            del self._local[user_id]
 
-engine = create_async_engine(database_url, echo=settings.env == "development")
+    async def mark(self, user_id: str) -> None:
+        """Record that the user just committed a write."""
+        now = time.monotonic()
+        self._prune(now)
+        self._local[user_id] = now + self._window
+        self._local.move_to_end(user_id)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                self.KEY_PREFIX + user_id, "1", px=max(1, int(self._window * 1000))
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Recent write record failed: {e}")
 
-async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async def contains(self, user_id: str) -> bool:
+        """Whether the user wrote within the window, on any worker."""
+        self._prune(time.monotonic())
+        if user_id in self._local:
+            return True
+        if self._redis is None:
+            return False
+        try:
+            return bool(await self._redis.exists(self.KEY_PREFIX + user_id))
+        except redis.RedisError as e:
+            # Reading from the primary is always safe
+            logger.warning(f"Recent write lookup failed: {e}")
+            return True
+
+    def clear(self) -> None:
+        """Forget all writes recorded by this worker."""
+        self._local.clear()
+
+
+recent_writes = RecentWrites(
+    window_seconds=settings.read_your_writes_seconds,
+    redis_client=(
+        redis.from_url(settings.redis_url, decode_responses=True)
+        if database_read_url and settings.read_your_writes_redis_enabled
+        else None
+    ),
+)
+
+
+class _PrimarySyncSession(Session):
+    pass
+
+
+@event.listens_for(_PrimarySyncSession, "after_flush")
+def _flushed(session: Session, flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(_PrimarySyncSession, "do_orm_execute")
+def _executed(state: ORMExecuteState) -> None:
+    # Bulk insert/update/delete statements bypass the flush
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(_PrimarySyncSession, "after_rollback")
+def _rolled_back(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+class PrimarySession(AsyncSession):
+    """Session on the primary that records its user's writes on commit.
+
+    The user is taken from info["user_id"]; see RecentWrites.
+    """
+
+    sync_session_class = _PrimarySyncSession
+
+    async def commit(self) -> None:
+        await super().commit()
+        user_id = self.info.get("user_id")
+        if self.info.pop("wrote", False) and user_id and has_read_replica():
+            await recent_writes.mark(user_id)
+
+
+pool_stats = register(PoolStats("db_pool"))
+
+engine = build_engine(database_url, pool_stats)
+
+async_session = async_sessionmaker(
+    engine, class_=PrimarySession, expire_on_commit=False
+)
+
+if database_read_url:
+    read_engine = build_engine(database_read_url, register(PoolStats("db_read_pool")))
+    async_read_session = async_sessionmaker(
+        read_engine, class_=AsyncSession, expire_on_commit=False
+    )
+else:
+    read_engine = engine
+    async_read_session = async_session
+
+
+def has_read_replica() -> bool:
+    return async_read_session is not async_session
+
+
+async def read_sessions_for(
+    user_id: str,
+) -> async_sessionmaker[AsyncSession] | async_sessionmaker[PrimarySession]:
+    """Sessions for a user's reads: the replica, unless they just wrote."""
+    if not has_read_replica():
+        return async_session
+    if await recent_writes.contains(user_id):
+        replica_reads.miss()
+        return async_session
+    replica_reads.hit()
+    return async_read_session
 
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncSession:
-    async with async_session() as session:
+# JSON columns are stored as JSONB on PostgreSQL (parsed once, indexable)
+# and as plain JSON elsewhere, e.g. SQLite in tests
+JSONData = JSON().with_variant(JSONB(), "postgresql")
+
+
+async def get_db(user: CurrentUser) -> AsyncIterator[AsyncSession]:
+    # A connection is only held while a transaction is open, so handlers
+    # should commit before slow non-database work (e.g. calling the AI)
+    async with async_session(info={"user_id": user.id}) as session:
+        yield session
+
+
+async def get_read_db(user: CurrentUser) -> AsyncIterator[AsyncSession]:
+    """Session for read-only handlers, on the read replica if configured."""
+    sessions = await read_sessions_for(user.id)
+    async with sessions() as session:
         yield session
@@ -1,13 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import metrics
+from app.auth import require_admin
 from app.config import settings
-from app.routers import chat, trackers
+from app.responses import ORJSONResponse
+from app.routers import admin, chat, trackers
+from app.services.ai import ai_service
+from app.services.context import context_engine
+from app.services.llm_scheduler import LLMBusyError
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Local context cache is only used while invalidations are received
+    await context_engine.start_invalidation_listener()
+    yield
+    await context_engine.stop_invalidation_listener()
+    await ai_service.client.aclose()
+
 
 app = FastAPI(
     title="AI Life Tracker",
     description="Voice-first AI-powered life tracking",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS for frontend
@@ -19,9 +39,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(LLMBusyError)
+async def llm_busy_handler(request: Request, exc: LLMBusyError):
+    """Rejected LLM calls: tell the client when to try again."""
+    return ORJSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
 # Include routers
 app.include_router(chat.router)
 app.include_router(trackers.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -32,3 +64,9 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", dependencies=[Depends(require_admin)])
+async def get_metrics():
+    """Per-worker metrics; they reveal load and usage, so admins only."""
+    return metrics.snapshot()
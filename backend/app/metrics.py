@@ -0,0 +1,89 @@
+"""Lightweight in-process metrics, exposed as JSON at /metrics (admin key).
+
+Values are per worker; aggregate across workers in the scraper.
+"""
+
+from collections import deque
+from typing import Any, Protocol
+
+
+class Metric(Protocol):
+    name: str
+
+    def snapshot(self) -> dict[str, Any]: ...
+
+
+_registry: dict[str, Metric] = {}
+
+
+def register[M: Metric](metric: M) -> M:
+    """Register a metric so it shows up in snapshot(). Returns the metric."""
+    _registry[metric.name] = metric
+    return metric
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    """Current values of all registered metrics."""
+    return {name: metric.snapshot() for name, metric in sorted(_registry.items())}
+
+
+class HitRatio:
+    """Counts hits and misses, e.g. for caches and fast paths."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        self.hits += 1
+
+    def miss(self) -> None:
+        self.misses += 1
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "ratio": self.ratio}
+
+
+class Summary:
+    """Count, mean and percentiles of observed values (e.g. wait times).
+
+    Percentiles are computed over the most recent observations only.
+    """
+
+    def __init__(self, name: str, window: int = 1000):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+        }
@@ -1,6 +1,7 @@
 from app.models.entry import Entry
 from app.models.routine import Routine, ScheduledEvent
+from app.models.stats import TrackerDailyStats
 from app.models.tracker import Tracker
 from app.models.user import User
 
-__all__ = ["User", "Tracker", "Entry", "Routine", "ScheduledEvent"]
+__all__ = ["User", "Tracker", "Entry", "Routine", "ScheduledEvent", "TrackerDailyStats"]
@@ -1,29 +1,50 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, JSONData
 
 
 class Entry(Base):
     """Individual tracking entry - the actual data points"""
 
     __tablename__ = "entries"
+    __table_args__ = (
+        # Newest entries per tracker / per user (list_entries, get_recent_entries);
+        # id breaks timestamp ties for keyset pagination
+        Index(
+            "ix_entries_tracker_id_timestamp",
+            "tracker_id",
+            text("timestamp DESC"),
+            text("id DESC"),
+        ),
+        Index(
+            "ix_entries_user_id_timestamp",
+            "user_id",
+            text("timestamp DESC"),
+            text("id DESC"),
+        ),
+        # Containment queries on the tracked values (data @> '{"unit": "kg"}')
+        Index(
+            "ix_entries_data",
+            "data",
+            postgresql_using="gin",
+            postgresql_ops={"data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
-    tracker_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("trackers.id"), index=True
-    )
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
+    tracker_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("trackers.id"))
 
     # The actual tracked values as JSON
     # Example: {"weight": 80, "sets": 3, "reps": 10}
-    data: Mapped[dict] = mapped_column(JSON, default=dict)
+    data: Mapped[dict] = mapped_column(JSONData, default=dict)
 
     # Optional notes
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
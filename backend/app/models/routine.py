@@ -1,17 +1,29 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, JSONData
 
 
 class Routine(Base):
     """Training routines/programs (e.g., Push/Pull/Legs, 5x5, Dorian Yates HIT)"""
 
     __tablename__ = "routines"
+    __table_args__ = (
+        # At most one active routine per user (get_active_routine). The
+        # predicate is written like Routine.is_active.is_(True) compiles, or
+        # the planner can't match it to the queries
+        Index(
+            "ix_routines_user_id_active",
+            "user_id",
+            unique=True,
+            postgresql_where=text("is_active IS true"),
+            sqlite_where=text("is_active IS 1"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -24,7 +36,7 @@ class Routine(Base):
 
     # Full routine configuration as JSON
     # Example: {"days": [{"name": "Push", "exercises": [...]}], "schedule": "MWF"}
-    config: Mapped[dict] = mapped_column(JSON, default=dict)
+    config: Mapped[dict] = mapped_column(JSONData, default=dict)
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=False)
 
@@ -65,7 +77,7 @@ class ScheduledEvent(Base):
     time: Mapped[str | None] = mapped_column(String(10), nullable=True)
 
     # Reminder settings as JSON
-    reminder_settings: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    reminder_settings: Mapped[dict | None] = mapped_column(JSONData, nullable=True)
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
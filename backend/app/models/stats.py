@@ -0,0 +1,43 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base, JSONData
+
+
+class TrackerDailyStats(Base):
+    """Per-tracker daily rollup of entries, for charts and range analytics.
+
+    Maintained by the entry service whenever entries are written (see
+    app/services/stats.py); days are UTC like entry timestamps.
+    """
+
+    __tablename__ = "tracker_daily_stats"
+    __table_args__ = (
+        # All trackers of a user over a date range (heatmaps)
+        Index("ix_tracker_daily_stats_user_id_day", "user_id", "day"),
+    )
+
+    tracker_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("trackers.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
+
+    entry_count: Mapped[int] = mapped_column(Integer)
+    # Sum of sets × reps × weight (sets default to 1); None if no entry has all three
+    volume: Mapped[float | None] = mapped_column(Float, nullable=True)
+    max_weight: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    # Min/max/sum of every numeric field in the day's entries
+    # Example: {"weight": {"min": 80, "max": 90, "sum": 250}, "reps": {...}}
+    fields: Mapped[dict] = mapped_column(JSONData, default=dict)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
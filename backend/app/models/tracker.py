@@ -1,28 +1,33 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, JSONData
 
 
 class Tracker(Base):
     """Flexible tracker definition - can track anything (workouts, habits, health, etc.)"""
 
     __tablename__ = "trackers"
+    __table_args__ = (
+        # Name lookups in get_or_create_tracker; unique so concurrent
+        # creations can't produce duplicate trackers
+        Index("ix_trackers_user_id_name", "user_id", "name", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
     name: Mapped[str] = mapped_column(String(100))
     category: Mapped[str] = mapped_column(String(50))  # fitness, habit, health, etc.
 
     # JSON schema defining what fields this tracker has
     # Example: {"fields": [{"name": "weight", "type": "number", "unit": "kg"}, ...]}
-    schema: Mapped[dict] = mapped_column(JSON, default=dict)
+    schema: Mapped[dict] = mapped_column(JSONData, default=dict)
 
     icon: Mapped[str | None] = mapped_column(String(50), nullable=True)
     color: Mapped[str | None] = mapped_column(String(20), nullable=True)
@@ -0,0 +1,46 @@
+"""JSON responses rendered with orjson."""
+
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(value: Any) -> Any:
+    # Only called for types orjson does not serialize itself; UUID,
+    # datetime, date and dataclasses are handled natively
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """Default response class of the app (see main.py).
+
+    orjson writes UUIDs and datetimes itself; only other unknown types
+    fall back to jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_response[T](
+    adapter: TypeAdapter[T], content: Any, status_code: int = 200
+) -> Response:
+    """Validate content (e.g. ORM objects) with the adapter and render it.
+
+    For hot list endpoints: the JSON is written by Pydantic's serializer in
+    one pass, skipping jsonable_encoder and FastAPI's response handling.
+    Declare the same model as response_model for the OpenAPI schema.
+    """
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(
+        adapter.dump_json(value), status_code=status_code, media_type="application/json"
+    )
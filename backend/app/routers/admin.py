@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from app.auth import require_admin
+from app.services.ai import ai_service
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.delete("/ai-cache")
+async def purge_ai_cache():
+    """Drop all cached AI responses (e.g. after changing the system prompt)."""
+    if ai_service.cache is None:
+        return {"deleted": 0}
+    return {"deleted": await ai_service.cache.purge()}
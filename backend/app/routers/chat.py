@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import CurrentUser
-from app.database import get_db
-from app.schemas.chat import ChatRequest, ChatResponse
+from app.auth import ClerkUser, CurrentUser
+from app.config import settings
+from app.database import async_session, get_db, get_read_db, read_sessions_for
+from app.responses import model_response
+from app.schemas.chat import ChatRequest, ChatResponse, HistoryPage, RoutineSummary
+from app.schemas.tracker import MAX_PAGE_SIZE
 from app.services.ai import ai_service
-from app.services.context import context_engine
+from app.services.context import (
+    ContextConflictError,
+    ContextSession,
+    context_engine,
+)
 from app.services.entry import save_entry
+from app.services.fast_path import parse_fast_path
+from app.services.llm_scheduler import LLMBusyError
 from app.services.routine import (
     create_routine,
     delete_routine,
@@ -17,18 +32,22 @@ from app.services.routine import (
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+HISTORY_PAGE = TypeAdapter(HistoryPage)
 
-@router.post("", response_model=ChatResponse)
-async def chat(
-    request: ChatRequest,
-    user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
-):
-    """Process a chat message through the AI."""
-    user_id = user.id
 
-    # Get current context
-    context = await context_engine.get_context(user_id)
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _build_context(
+    request: ChatRequest,
+    session: ContextSession,
+    db: AsyncSession,
+    user_id: str,
+) -> dict[str, Any]:
+    """Assemble the context sent to the AI for this message."""
+    context = {**session.context}
 
     # Add active routine to context
     active_routine = await get_active_routine(db, user_id)
@@ -43,9 +62,21 @@ async def chat(
     if request.context:
         context.update(request.context)
 
-    # Process through AI
-    result = await ai_service.process_message(request.message, context)
+    # End the read transaction so no connection is held while the AI works
+    await db.commit()
+
+    return context
 
+
+async def _handle_result(
+    result: dict[str, Any],
+    context: dict[str, Any],
+    session: ContextSession,
+    user: ClerkUser,
+    db: AsyncSession,
+) -> ChatResponse:
+    """Apply the side effects of an AI result and build the response."""
+    user_id = user.id
     action = result.get("action")
     data = result.get("data", {})
     routine_id = None
@@ -75,7 +106,16 @@ async def chat(
             weight = data.get("weight", context.get("last_weight"))
             reps = data.get("reps", 0)
             if weight and reps:
-                await context_engine.record_set(user_id, weight, reps)
+                session.record_set(weight, reps)
+
+    # Handle moving on to the next exercise
+    elif action == "next_exercise":
+        upcoming = session.next_exercise()
+        if upcoming:
+            result["message"] = f"Nächste Übung: {upcoming.get('name', '')}"
+            result["data"] = {"exercise": upcoming}
+        else:
+            result["message"] = "Keine weiteren Übungen geplant."
 
     # Handle routine creation
     elif action == "create_routine":
@@ -95,15 +135,13 @@ async def chat(
     # Handle show routines
     elif action == "show_routines":
         try:
-            routines = await get_user_routines(db, user_id)
+            # A pure read, so it can go to the replica
+            sessions = await read_sessions_for(user_id)
+            async with sessions() as read_db:
+                routines = await get_user_routines(read_db, user_id, summary=True)
             result["data"] = {
                 "routines": [
-                    {
-                        "id": str(r.id),
-                        "name": r.name,
-                        "is_active": r.is_active,
-                        "config": r.config,
-                    }
+                    RoutineSummary.model_validate(r).model_dump(mode="json")
                     for r in routines
                 ]
             }
@@ -134,13 +172,18 @@ async def chat(
         routine_name = data.get("name")
         if routine_name:
             try:
-                routines = await get_user_routines(db, user_id)
+                routines = await get_user_routines(db, user_id, summary=True)
                 matching = [r for r in routines if r.name.lower() == routine_name.lower()]
                 if matching:
                     await delete_routine(db, matching[0].id)
             except Exception as e:
                 print(f"Error deleting routine: {e}")
 
+    try:
+        await session.flush()
+    except ContextConflictError as e:
+        print(f"Error saving context: {e}")
+
     return ChatResponse(
         action=result.get("action", "chat"),
         message=result.get("message", ""),
@@ -151,6 +194,78 @@ async def chat(
     )
 
 
+@router.post("", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+):
+    """Process a chat message through the AI."""
+    # Load context once; changes are flushed in a single write at the end
+    session = await context_engine.load_session(user.id)
+    context = await _build_context(request, session, db, user.id)
+
+    # Common workout inputs are resolved locally, everything else goes to the AI
+    result = None
+    if settings.fast_path_enabled:
+        result = parse_fast_path(request.message, context, session.current_exercise())
+    if result is None:
+        result = await ai_service.process_message(request.message, context, user.id)
+
+    return await _handle_result(result, context, session, user, db)
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, user: CurrentUser):
+    """Process a chat message, streaming the AI answer as server-sent events.
+
+    Events:
+        action: {"action": ...} as soon as the AI has decided what to do
+        delta: {"text": ...} for each new piece of the message text
+        result: the final ChatResponse, after side effects were applied
+        error: {"detail": ..., "retry_after": ...} if the AI is busy
+    """
+
+    async def events() -> AsyncIterator[str]:
+        # The request-scoped session from get_db would be closed before the
+        # body is streamed, so the stream owns its own session.
+        async with async_session(info={"user_id": user.id}) as db:
+            session = await context_engine.load_session(user.id)
+            context = await _build_context(request, session, db, user.id)
+
+            fast_result = None
+            if settings.fast_path_enabled:
+                fast_result = parse_fast_path(
+                    request.message, context, session.current_exercise()
+                )
+            if fast_result is not None:
+                yield _sse("action", {"action": fast_result["action"]})
+                response = await _handle_result(fast_result, context, session, user, db)
+                yield _sse("result", response.model_dump())
+                return
+
+            try:
+                async for event, payload in ai_service.stream_message(
+                    request.message, context, user.id
+                ):
+                    if event == "result":
+                        response = await _handle_result(
+                            payload, context, session, user, db
+                        )
+                        yield _sse("result", response.model_dump())
+                    else:
+                        yield _sse(event, payload)
+            except LLMBusyError as e:
+                # Headers are already sent, so report it in-band
+                yield _sse("error", {"detail": str(e), "retry_after": e.retry_after})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/workout/start")
 async def start_workout(user: CurrentUser, routine_name: str | None = None):
     """Start a workout session."""
@@ -180,30 +295,26 @@ async def get_context(user: CurrentUser):
     return await context_engine.get_context(user_id)
 
 
-@router.get("/history")
+@router.get("/history", response_model=HistoryPage)
 async def get_history(
     user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     tracker: str | None = None,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
 ):
-    """Get recent tracking history."""
-    from app.services.entry import get_recent_entries
-
-    entries = await get_recent_entries(
-        db=db,
-        user_id=user.id,
-        tracker_name=tracker,
-        limit=limit,
-    )
+    """Get tracking history, newest first, one page at a time."""
+    from app.services.entry import get_entry_page
 
-    return [
-        {
-            "id": str(entry.id),
-            "tracker_id": str(entry.tracker_id),
-            "data": entry.data,
-            "notes": entry.notes,
-            "timestamp": entry.timestamp.isoformat(),
-        }
-        for entry in entries
-    ]
+    try:
+        entries, next_cursor = await get_entry_page(
+            db=db,
+            user_id=user.id,
+            tracker_name=tracker,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+    return model_response(HISTORY_PAGE, {"items": entries, "next_cursor": next_cursor})
@@ -1,33 +1,83 @@
+from datetime import date
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from app.auth import CurrentUser
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Entry, Tracker
+from app.responses import model_response
 from app.schemas.tracker import (
+    MAX_PAGE_SIZE,
+    MAX_STATS_DAYS,
+    DailyStatsResponse,
+    EntryBatchCreate,
+    EntryBatchItem,
+    EntryBatchResponse,
+    EntryBatchResult,
     EntryCreate,
+    EntryPage,
     EntryResponse,
+    EntryUpdate,
     TrackerCreate,
     TrackerResponse,
+    TrackerSummary,
     TrackerUpdate,
 )
-from app.services.user import get_or_create_user
+from app.services.entry import (
+    delete_entry,
+    normalize_tracker_name,
+    save_entries,
+    tracker_id_cache,
+    update_entry,
+)
+from app.services.pagination import fetch_entry_page
+from app.services.stats import get_daily_stats, refresh_daily_stats
+from app.services.user import ensure_user
 
 router = APIRouter(prefix="/api/trackers", tags=["trackers"])
 
+ENTRY_PAGE = TypeAdapter(EntryPage)
+DAILY_STATS = TypeAdapter(list[DailyStatsResponse])
+
+# Columns rendered in tracker lists (TrackerSummary)
+SUMMARY_COLUMNS = (
+    Tracker.id,
+    Tracker.name,
+    Tracker.category,
+    Tracker.icon,
+    Tracker.color,
+    Tracker.created_at,
+)
+
 
-@router.get("", response_model=list[TrackerResponse])
-async def list_trackers(user: CurrentUser, db: AsyncSession = Depends(get_db)):
-    """List all trackers for the current user."""
+@router.get("", response_model=list[TrackerResponse] | list[TrackerSummary])
+async def list_trackers(
+    user: CurrentUser,
+    fields: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List all trackers for the current user.
+
+    With fields=summary the schema JSON is neither loaded nor returned.
+    """
     user_id = user.id
 
-    result = await db.execute(
-        select(Tracker).where(Tracker.user_id == user_id)
-    )
-    return result.scalars().all()
+    query = select(Tracker).where(Tracker.user_id == user_id)
+    if fields == "summary":
+        query = query.options(load_only(*SUMMARY_COLUMNS, raiseload=True))
+    result = await db.execute(query)
+    trackers = result.scalars().all()
+
+    if fields == "summary":
+        return [TrackerSummary.model_validate(tracker) for tracker in trackers]
+    return trackers
 
 
 @router.post("", response_model=TrackerResponse)
@@ -38,28 +88,73 @@ async def create_tracker(
 ):
     """Create a new tracker."""
     # Ensure user exists in DB
-    await get_or_create_user(db, user.id, user.email)
+    await ensure_user(db, user.id, user.email)
     user_id = user.id
 
     db_tracker = Tracker(
         user_id=user_id,
-        name=tracker.name,
+        # Stored like save_entry looks trackers up
+        name=normalize_tracker_name(tracker.name),
         category=tracker.category,
         schema=tracker.schema,
         icon=tracker.icon,
         color=tracker.color,
     )
     db.add(db_tracker)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Tracker already exists") from None
     await db.refresh(db_tracker)
+    tracker_id_cache.set(user_id, db_tracker.name, db_tracker.id)
     return db_tracker
 
 
+@router.post("/entries:batch", response_model=EntryBatchResponse)
+async def create_entries_batch(
+    user: CurrentUser,
+    batch: EntryBatchCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Create many entries across trackers, e.g. for imports.
+
+    Invalid items are reported in the results without failing the batch.
+    """
+    results: list[EntryBatchResult | None] = []
+    valid: list[dict] = []
+    positions: list[int] = []
+    for index, raw in enumerate(batch.entries):
+        try:
+            item = EntryBatchItem.model_validate(raw)
+        except ValidationError as e:
+            message = "; ".join(error["msg"] for error in e.errors())
+            results.append(EntryBatchResult(index=index, error=message))
+            continue
+        results.append(None)
+        positions.append(index)
+        valid.append(item.model_dump())
+
+    saved = await save_entries(db, user.id, user.email, valid) if valid else []
+    for index, outcome in zip(positions, saved, strict=True):
+        if isinstance(outcome, str):
+            results[index] = EntryBatchResult(index=index, error=outcome)
+        else:
+            results[index] = EntryBatchResult(index=index, id=outcome)
+
+    created = sum(1 for result in results if result and result.id)
+    return EntryBatchResponse(
+        created=created,
+        failed=len(results) - created,
+        results=[result for result in results if result is not None],
+    )
+
+
 @router.get("/{tracker_id}", response_model=TrackerResponse)
 async def get_tracker(
     user: CurrentUser,
     tracker_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a specific tracker."""
     result = await db.execute(
@@ -80,7 +175,7 @@ async def update_tracker(
 ):
     """Update an existing tracker."""
     # Ensure user exists in DB
-    await get_or_create_user(db, user.id, user.email)
+    await ensure_user(db, user.id, user.email)
 
     # Fetch the tracker
     result = await db.execute(select(Tracker).where(Tracker.id == tracker_id))
@@ -94,12 +189,20 @@ async def update_tracker(
         raise HTTPException(status_code=403, detail="Not authorized to update this tracker")
 
     # Update only provided fields
+    old_name = tracker.name
     update_data = tracker_update.model_dump(exclude_unset=True)
+    if update_data.get("name") is not None:
+        update_data["name"] = normalize_tracker_name(update_data["name"])
     for field, value in update_data.items():
         setattr(tracker, field, value)
 
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Tracker already exists") from None
     await db.refresh(tracker)
+    tracker_id_cache.invalidate(user.id, normalize_tracker_name(old_name), tracker.name)
     return tracker
 
 
@@ -111,7 +214,7 @@ async def delete_tracker(
 ):
     """Delete a tracker."""
     # Ensure user exists in DB
-    await get_or_create_user(db, user.id, user.email)
+    await ensure_user(db, user.id, user.email)
 
     # Fetch the tracker
     result = await db.execute(select(Tracker).where(Tracker.id == tracker_id))
@@ -126,17 +229,19 @@ async def delete_tracker(
 
     await db.delete(tracker)
     await db.commit()
+    tracker_id_cache.invalidate(user.id, normalize_tracker_name(tracker.name))
     return {"message": "Tracker deleted successfully"}
 
 
-@router.get("/{tracker_id}/entries", response_model=list[EntryResponse])
+@router.get("/{tracker_id}/entries", response_model=EntryPage)
 async def list_entries(
     user: CurrentUser,
     tracker_id: UUID,
-    limit: int = 50,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """List entries for a tracker."""
+    """List entries for a tracker, newest first, one page at a time."""
     # Verify tracker ownership
     tracker_result = await db.execute(
         select(Tracker).where(Tracker.id == tracker_id, Tracker.user_id == user.id)
@@ -145,13 +250,13 @@ async def list_entries(
     if not tracker:
         raise HTTPException(status_code=404, detail="Tracker not found")
 
-    result = await db.execute(
-        select(Entry)
-        .where(Entry.tracker_id == tracker_id)
-        .order_by(Entry.timestamp.desc())
-        .limit(limit)
-    )
-    return result.scalars().all()
+    try:
+        entries, next_cursor = await fetch_entry_page(
+            db, select(Entry).where(Entry.tracker_id == tracker_id), limit, cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    return model_response(ENTRY_PAGE, {"items": entries, "next_cursor": next_cursor})
 
 
 @router.post("/{tracker_id}/entries", response_model=EntryResponse)
@@ -163,7 +268,7 @@ async def create_entry(
 ):
     """Create a new entry for a tracker."""
     # Ensure user exists in DB
-    await get_or_create_user(db, user.id, user.email)
+    await ensure_user(db, user.id, user.email)
 
     # Verify tracker ownership
     tracker_result = await db.execute(
@@ -181,6 +286,54 @@ async def create_entry(
         timestamp=entry.timestamp,
     )
     db.add(db_entry)
+    await db.flush()
+    await refresh_daily_stats(db, [(tracker_id, db_entry.timestamp.date())])
     await db.commit()
     await db.refresh(db_entry)
     return db_entry
+
+
+@router.put("/{tracker_id}/entries/{entry_id}", response_model=EntryResponse)
+async def update_tracker_entry(
+    user: CurrentUser,
+    tracker_id: UUID,
+    entry_id: UUID,
+    entry_update: EntryUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Update an entry's data, notes or timestamp."""
+    entry = await update_entry(
+        db, user.id, tracker_id, entry_id, entry_update.model_dump(exclude_unset=True)
+    )
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    return entry
+
+
+@router.delete("/{tracker_id}/entries/{entry_id}")
+async def delete_tracker_entry(
+    user: CurrentUser,
+    tracker_id: UUID,
+    entry_id: UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete an entry."""
+    if not await delete_entry(db, user.id, tracker_id, entry_id):
+        raise HTTPException(status_code=404, detail="Entry not found")
+    return {"message": "Entry deleted successfully"}
+
+
+@router.get("/{tracker_id}/stats/daily", response_model=list[DailyStatsResponse])
+async def list_daily_stats(
+    user: CurrentUser,
+    tracker_id: UUID,
+    since: date,
+    until: date,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Daily rollups of a tracker for since <= day < until, e.g. for charts."""
+    if (until - since).days > MAX_STATS_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATS_DAYS} days per request")
+    return model_response(
+        DAILY_STATS, await get_daily_stats(db, user.id, tracker_id, since, until)
+    )
@@ -1,4 +1,6 @@
+from datetime import datetime
 from typing import Any
+from uuid import UUID
 
 from pydantic import BaseModel
 
@@ -15,3 +17,33 @@ class ChatResponse(BaseModel):
     component: str | None = None
     tracker: str | None = None
     routine_id: str | None = None
+
+
+class RoutineSummary(BaseModel):
+    """A routine as listed in chat, without its config."""
+
+    id: UUID
+    name: str
+    type: str
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+
+class HistoryEntry(BaseModel):
+    id: UUID
+    tracker_id: UUID
+    data: dict[str, Any]
+    notes: str | None
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class HistoryPage(BaseModel):
+    """One page of tracking history, newest first (see EntryPage)."""
+
+    items: list[HistoryEntry]
+    next_cursor: str | None = None
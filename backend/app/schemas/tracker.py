@@ -1,8 +1,26 @@
-from datetime import datetime
-from typing import Any
+from datetime import UTC, date, datetime
+from typing import Annotated, Any
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, Field, field_validator, model_validator
+
+# Maximum number of entries per batch request
+MAX_BATCH_SIZE = 10_000
+# Maximum number of entries per page of a listing
+MAX_PAGE_SIZE = 200
+# Maximum number of days of daily stats per request
+MAX_STATS_DAYS = 731
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    # Entries are stored as naive UTC (see Entry.timestamp)
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+# Entry timestamp as stored: offsets are converted to UTC and dropped
+EntryTimestamp = Annotated[datetime, AfterValidator(_to_naive_utc)]
 
 
 class TrackerCreate(BaseModel):
@@ -36,10 +54,43 @@ class TrackerResponse(BaseModel):
         from_attributes = True
 
 
+class TrackerSummary(BaseModel):
+    """A tracker as shown in lists, without its schema."""
+
+    id: UUID
+    name: str
+    category: str
+    icon: str | None
+    color: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class EntryCreate(BaseModel):
     data: dict[str, Any]
     notes: str | None = None
-    timestamp: datetime | None = None
+    timestamp: EntryTimestamp | None = None
+
+
+class EntryUpdate(BaseModel):
+    """Schema for updating an entry - all fields optional.
+
+    Only notes can be cleared with null; data and timestamp can be left out
+    but not set to null.
+    """
+
+    data: dict[str, Any] | None = None
+    notes: str | None = None
+    timestamp: EntryTimestamp | None = None
+
+    @field_validator("data", "timestamp")
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        if value is None:
+            raise ValueError("must not be null")
+        return value
 
 
 class EntryResponse(BaseModel):
@@ -52,3 +103,58 @@ class EntryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class EntryPage(BaseModel):
+    """One page of entries, newest first.
+
+    Pass next_cursor as ?cursor= to get the following page; it is None on
+    the last page.
+    """
+
+    items: list[EntryResponse]
+    next_cursor: str | None = None
+
+
+class DailyStatsResponse(BaseModel):
+    day: date
+    entry_count: int
+    volume: float | None
+    max_weight: float | None
+    fields: dict[str, dict[str, float]]
+
+    class Config:
+        from_attributes = True
+
+
+class EntryBatchItem(BaseModel):
+    """One entry of a batch; the tracker is given by ID or by name."""
+
+    tracker_id: UUID | None = None
+    tracker: str | None = Field(default=None, min_length=1, max_length=100)
+    data: dict[str, Any]
+    notes: str | None = None
+    timestamp: EntryTimestamp | None = None
+
+    @model_validator(mode="after")
+    def check_tracker(self) -> "EntryBatchItem":
+        if (self.tracker_id is None) == (self.tracker is None):
+            raise ValueError("Exactly one of tracker_id or tracker is required")
+        return self
+
+
+class EntryBatchCreate(BaseModel):
+    # Items are validated one by one so a bad item doesn't reject the batch
+    entries: list[dict[str, Any]] = Field(max_length=MAX_BATCH_SIZE)
+
+
+class EntryBatchResult(BaseModel):
+    index: int
+    id: UUID | None = None
+    error: str | None = None
+
+
+class EntryBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[EntryBatchResult]
@@ -1,13 +1,15 @@
+import asyncio
 import json
+from collections.abc import AsyncGenerator
+from contextlib import AbstractAsyncContextManager, nullcontext
 from typing import Any
 
-import google.generativeai as genai
-from starlette.concurrency import run_in_threadpool
-
 from app.config import settings
-
-# Configure Gemini
-genai.configure(api_key=settings.gemini_api_key)
+from app.services.ai_cache import AIResponseCache
+from app.services.gemini import GeminiClient, GeminiError
+from app.services.llm_scheduler import LLMBusyError, LLMScheduler, llm_scheduler
+from app.services.prompt_context import CONTEXT_KEY_LEGEND, serialize_prompt_context
+from app.services.stream_parser import DELTA, FIELD, IncrementalJSONParser
 
 # System prompt for the AI assistant
 SYSTEM_PROMPT = """Du bist ein KI-Assistent für einen Life Tracker. Du hilfst Nutzern dabei:
@@ -114,58 +116,181 @@ Response: {
 }
 
 Sei kurz und präzise in deinen Antworten.
-"""
+
+""" + CONTEXT_KEY_LEGEND
 
 
 class AIService:
-    def __init__(self):
-        self.model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
-            system_instruction=SYSTEM_PROMPT,
+    def __init__(
+        self,
+        cache: AIResponseCache | None = None,
+        client: GeminiClient | None = None,
+        scheduler: LLMScheduler | None = None,
+    ):
+        self.client = client or GeminiClient(system_instruction=SYSTEM_PROMPT)
+        # Optional cache for repeated, side-effect free prompts
+        self.cache = cache
+        # Optional admission control; without it calls are not limited
+        self.scheduler = scheduler
+
+    def _slot(self, user_id: str | None) -> AbstractAsyncContextManager[None]:
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(user_id)
+
+    @staticmethod
+    def _provider_busy(error: GeminiError) -> LLMBusyError | None:
+        """Rate limiting by the provider, reported to the client like our own."""
+        if error.status_code not in (429, 503):
+            return None
+        return LLMBusyError(
+            "KI ist gerade ausgelastet, bitte gleich nochmal versuchen",
+            retry_after=error.retry_after or 1.0,
         )
 
+    def _build_prompt(self, message: str, context: dict[str, Any] | None) -> str:
+        """Combine the user message with the compact context relevant to it."""
+        context_str = serialize_prompt_context(message, context)
+        if not context_str:
+            return message
+        return f"{message}\n\nKontext: {context_str}"
+
+    def _parse_response(self, text: str) -> dict[str, Any]:
+        """Extract the structured JSON response from the model output."""
+        # Try to parse as JSON
+        try:
+            # Find JSON in response
+            start = text.find("{")
+            end = text.rfind("}") + 1
+            if start != -1 and end > start:
+                return json.loads(text[start:end])
+        except json.JSONDecodeError:
+            pass
+
+        # Fallback: return as chat message
+        return {
+            "action": "chat",
+            "message": text,
+            "component": None,
+        }
+
+    def _error_response(self, error: Exception) -> dict[str, Any]:
+        return {
+            "action": "error",
+            "message": f"AI Error: {str(error)}",
+            "component": None,
+        }
+
     async def process_message(
         self,
         message: str,
         context: dict[str, Any] | None = None,
+        user_id: str | None = None,
     ) -> dict[str, Any]:
-        """Process a user message and return structured response."""
+        """Process a user message and return structured response.
 
-        # Build context string
-        context_str = ""
-        if context:
-            context_str = f"\n\nAktueller Kontext:\n{json.dumps(context, ensure_ascii=False)}"
+        Raises:
+            LLMBusyError: If the call was rejected by the scheduler or the
+                provider is rate limiting.
+        """
+        if self.cache is not None:
+            cached = await self.cache.get(message, context)
+            if cached is not None:
+                return cached
 
-        prompt = f"{message}{context_str}"
+        prompt = self._build_prompt(message, context)
 
         try:
-            response = await run_in_threadpool(self.model.generate_content, prompt)
-            text = response.text
+            async with self._slot(user_id):
+                text = await self.client.generate(prompt)
+            result = self._parse_response(text)
 
-            # Try to parse as JSON
+        except LLMBusyError:
+            raise
+        except GeminiError as e:
+            if busy := self._provider_busy(e):
+                raise busy from e
+            return self._error_response(e)
+        except Exception as e:
+            return self._error_response(e)
+
+        if self.cache is not None:
+            await self.cache.set(message, context, result)
+        return result
+
+    async def stream_message(
+        self,
+        message: str,
+        context: dict[str, Any] | None = None,
+        user_id: str | None = None,
+    ) -> AsyncGenerator[tuple[str, dict[str, Any]]]:
+        """Process a user message, yielding results while the model is still writing.
+
+        Yields (event, payload) tuples:
+            ("action", {"action": ...}) as soon as the action is known
+            ("delta", {"text": ...}) for each new piece of the message text
+            ("result", {...}) once, with the full structured response
+
+        Raises:
+            LLMBusyError: Like process_message, before anything is yielded.
+        """
+        if self.cache is not None:
+            cached = await self.cache.get(message, context)
+            if cached is not None:
+                yield "action", {"action": cached.get("action", "chat")}
+                yield "delta", {"text": cached.get("message", "")}
+                yield "result", cached
+                return
+
+        prompt = self._build_prompt(message, context)
+        parser = IncrementalJSONParser(stream_fields=("message",))
+        chunks: list[str] = []
+        # None marks the end of the upstream stream. Unbounded, but no larger
+        # than one model response.
+        received: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def read_upstream() -> None:
+            # The slot is held while Gemini writes, not while a slow client
+            # reads: it is released as soon as the response is complete
             try:
-                # Find JSON in response
-                start = text.find("{")
-                end = text.rfind("}") + 1
-                if start != -1 and end > start:
-                    return json.loads(text[start:end])
-            except json.JSONDecodeError:
-                pass
-
-            # Fallback: return as chat message
-            return {
-                "action": "chat",
-                "message": text,
-                "component": None,
-            }
+                async with self._slot(user_id):
+                    async for text in self.client.stream(prompt):
+                        received.put_nowait(text)
+            finally:
+                received.put_nowait(None)
 
+        reader = asyncio.create_task(read_upstream())
+        try:
+            while (text := await received.get()) is not None:
+                chunks.append(text)
+                for kind, key, value in parser.feed(text):
+                    if kind == FIELD and key == "action":
+                        yield "action", {"action": value}
+                    elif kind == DELTA:
+                        yield "delta", {"text": value}
+            await reader
+        except LLMBusyError:
+            raise
+        except GeminiError as e:
+            if (busy := self._provider_busy(e)) and not chunks:
+                raise busy from e
+            yield "result", self._error_response(e)
+            return
         except Exception as e:
-            return {
-                "action": "error",
-                "message": f"AI Error: {str(e)}",
-                "component": None,
-            }
+            yield "result", self._error_response(e)
+            return
+        finally:
+            # A client that disconnected closes the generator; stop reading
+            reader.cancel()
+
+        result = self._parse_response("".join(chunks))
+        if self.cache is not None:
+            await self.cache.set(message, context, result)
+        yield "result", result
 
 
 # Singleton instance
-ai_service = AIService()
+ai_service = AIService(
+    cache=AIResponseCache() if settings.ai_cache_enabled else None,
+    scheduler=llm_scheduler,
+)
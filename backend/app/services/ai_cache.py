@@ -0,0 +1,106 @@
+"""Redis cache for AI responses to repeated, side-effect free prompts."""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from typing import Any
+
+import redis.asyncio as redis
+
+from app.config import settings
+from app.metrics import HitRatio, register
+from app.services.prompt_context import serialize_prompt_context
+
+logger = logging.getLogger(__name__)
+
+ai_cache_stats = register(HitRatio("ai_cache"))
+
+# How long responses are cached per action. Actions not listed here
+# (track, create/update/delete_routine, error) have side effects or are
+# failures and are never cached.
+CACHE_TTL_SECONDS = {
+    "show_routines": 24 * 3600,  # the routines themselves are loaded from the DB
+    "chat": 3600,
+    "query": 300,
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a message so trivially different phrasings share a cache entry."""
+    text = unicodedata.normalize("NFKC", message).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return " ".join(text.split())
+
+
+class AIResponseCache:
+    """Caches AI responses keyed on the normalized message and its prompt context.
+
+    Entries are shared between users: the key covers the compact context
+    exactly as it is sent to the model, so two requests only share an entry
+    if the model would see the same prompt.
+    """
+
+    KEY_PREFIX = "ai-cache:"
+
+    def __init__(self, redis_client: redis.Redis | None = None):  # type: ignore[type-arg]
+        if redis_client is not None:
+            self._redis: redis.Redis = redis_client  # type: ignore[type-arg]
+        else:
+            self._redis = redis.from_url(settings.redis_url, decode_responses=True)
+
+    def key(self, message: str, context: dict[str, Any] | None) -> str:
+        """Cache key for a message in a given context."""
+        material = json.dumps(
+            [normalize_message(message), serialize_prompt_context(message, context)],
+            ensure_ascii=False,
+        )
+        return self.KEY_PREFIX + hashlib.sha256(material.encode()).hexdigest()
+
+    async def get(
+        self, message: str, context: dict[str, Any] | None
+    ) -> dict[str, Any] | None:
+        """Cached response for the message, or None on a miss."""
+        try:
+            raw = await self._redis.get(self.key(message, context))
+        except redis.RedisError as e:
+            logger.warning(f"AI cache lookup failed: {e}")
+            raw = None
+
+        if raw is None:
+            ai_cache_stats.miss()
+            return None
+        ai_cache_stats.hit()
+        return json.loads(raw)
+
+    async def set(
+        self, message: str, context: dict[str, Any] | None, response: dict[str, Any]
+    ) -> None:
+        """Cache a response if its action is cacheable."""
+        ttl = CACHE_TTL_SECONDS.get(response.get("action", ""))
+        if ttl is None:
+            return
+        try:
+            await self._redis.set(
+                self.key(message, context),
+                json.dumps(response, ensure_ascii=False),
+                ex=ttl,
+            )
+        except redis.RedisError as e:
+            logger.warning(f"AI cache write failed: {e}")
+
+    async def purge(self) -> int:
+        """Delete all cached responses. Returns the number of deleted entries."""
+        deleted = 0
+        batch: list[str] = []
+        async for key in self._redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                deleted += await self._redis.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self._redis.unlink(*batch)
+        return deleted
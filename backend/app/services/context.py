@@ -1,67 +1,520 @@
+import asyncio
+import copy
 import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
 from datetime import date, datetime
 from typing import Any
 
 import redis.asyncio as redis
+from redis.typing import EncodableT, FieldT
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Server-side scripts
+# =============================================================================
+# Every public ContextEngine operation maps to exactly one script call, so a
+# voice command costs a single Redis round trip and concurrent workers can't
+# lose each other's updates (scripts run atomically on the server).
+#
+# A context is stored as a hash of JSON-encoded scalar fields plus one Redis
+# list per list field, so writes touch only the fields that change and their
+# cost doesn't grow with the length of a workout.
+#
+# KEYS = [hash key, planned exercises list, completed exercises list]
+# ARGV[1] = TTL in seconds
+# ARGV[2] = JSON object of default scalar fields (used when the hash is missing)
+# ARGV[3] = invalidation channel; writes publish the hash key there so other
+#           workers can drop their locally cached copy
+#
+# Every write also bumps the "_version" field, which ContextSession uses for
+# compare-and-set flushes.
+
+_PRELUDE_LUA = """
+local hash, planned, completed = KEYS[1], KEYS[2], KEYS[3]
+local ttl = ARGV[1]
+
+local function hset_all(fields)
+    local args = {}
+    for field, value in pairs(fields) do
+        table.insert(args, field)
+        table.insert(args, value)
+    end
+    if #args > 0 then
+        redis.call('HSET', hash, unpack(args))
+    end
+end
+
+local function ensure()
+    if redis.call('EXISTS', hash) == 0 then
+        redis.call('DEL', planned, completed)
+        hset_all(cjson.decode(ARGV[2]))
+    end
+end
+
+local function replace_list(key, items)
+    redis.call('DEL', key)
+    if items and #items > 0 then
+        redis.call('RPUSH', key, unpack(items))
+    end
+end
+
+local function touch()
+    redis.call('EXPIRE', hash, ttl)
+    redis.call('EXPIRE', planned, ttl)
+    redis.call('EXPIRE', completed, ttl)
+end
+
+local function commit()
+    redis.call('HINCRBY', hash, '_version', 1)
+    redis.call('PUBLISH', ARGV[3], hash)
+end
+
+ensure()
+"""
+
+# Returns {hash fields, planned items, completed items}.
+_GET_SCRIPT = _PRELUDE_LUA + """
+touch()
+return {
+    redis.call('HGETALL', hash),
+    redis.call('LRANGE', planned, 0, -1),
+    redis.call('LRANGE', completed, 0, -1),
+}
+"""
+
+# ARGV[4] = JSON object of encoded scalar fields to set.
+# ARGV[5] = JSON object of list replacements ({"planned": [...], ...}).
+_UPDATE_SCRIPT = _PRELUDE_LUA + """
+hset_all(cjson.decode(ARGV[4]))
+local lists = cjson.decode(ARGV[5])
+if lists['planned'] then replace_list(planned, lists['planned']) end
+if lists['completed'] then replace_list(completed, lists['completed']) end
+touch()
+commit()
+"""
+
+# ARGV[4] = encoded last weight, ARGV[5] = encoded last_updated.
+_RECORD_SET_SCRIPT = _PRELUDE_LUA + """
+redis.call('HSET', hash, 'last_weight', ARGV[4], 'last_updated', ARGV[5])
+redis.call('HINCRBY', hash, 'current_set', 1)
+touch()
+commit()
+"""
+
+# Returns the encoded current exercise, or nil if there is none.
+_CURRENT_EXERCISE_SCRIPT = _PRELUDE_LUA + """
+touch()
+local state = redis.call('HMGET', hash, 'workout_active', 'current_exercise_index')
+if state[1] ~= 'true' then
+    return false
+end
+return redis.call('LINDEX', planned, tonumber(state[2]) or 0)
+"""
+
+# ARGV[4] = encoded last_updated.
+# Moves the current exercise to the completed list if one is active and
+# returns the new current exercise (or nil).
+_NEXT_EXERCISE_SCRIPT = _PRELUDE_LUA + """
+touch()
+local state = redis.call('HMGET', hash, 'workout_active', 'current_exercise_index')
+if state[1] ~= 'true' then
+    return false
+end
+local index = tonumber(state[2]) or 0
+local current = redis.call('LINDEX', planned, index)
+if not current then
+    return false
+end
+redis.call('RPUSH', completed, current)
+redis.call('EXPIRE', completed, ttl)
+redis.call('HINCRBY', hash, 'current_exercise_index', 1)
+redis.call('HSET', hash, 'current_set', 1, 'last_weight', 'null', 'last_updated', ARGV[4])
+commit()
+return redis.call('LINDEX', planned, index + 1)
+"""
+
+# ARGV[4] = JSON object of encoded reset fields.
+# Returns {encoded workout_started, completed items} from before the reset.
+_END_WORKOUT_SCRIPT = _PRELUDE_LUA + """
+local started = redis.call('HGET', hash, 'workout_started') or 'null'
+local done = redis.call('LRANGE', completed, 0, -1)
+hset_all(cjson.decode(ARGV[4]))
+redis.call('DEL', planned, completed)
+touch()
+commit()
+return {started, done}
+"""
+
+# ARGV[4] = version the session was loaded at.
+# ARGV[5] = JSON object of encoded scalar fields to set.
+# ARGV[6] = JSON object of list changes per list key suffix, each either
+#           {"replace": [...]} or {"append": [...]}.
+# Returns the new version, or false if the context changed since it was loaded.
+_FLUSH_SCRIPT = _PRELUDE_LUA + """
+local version = tonumber(redis.call('HGET', hash, '_version')) or 0
+if version ~= tonumber(ARGV[4]) then
+    return false
+end
+hset_all(cjson.decode(ARGV[5]))
+local keys = {planned = planned, completed = completed}
+for suffix, change in pairs(cjson.decode(ARGV[6])) do
+    if change['replace'] then
+        replace_list(keys[suffix], change['replace'])
+    elseif #change['append'] > 0 then
+        redis.call('RPUSH', keys[suffix], unpack(change['append']))
+    end
+end
+touch()
+commit()
+return version + 1
+"""
+
+# Context fields stored as Redis lists, mapped to their key suffix.
+_LIST_FIELDS = {
+    "planned_exercises": "planned",
+    "completed_exercises": "completed",
+}
+
+# Hash field holding the write counter used for compare-and-set.
+_VERSION_FIELD = "_version"
+
+# Fields reset when a workout ends.
+_WORKOUT_RESET = {
+    "workout_active": False,
+    "workout_started": None,
+    "current_routine": None,
+    "planned_exercises": [],
+    "current_exercise_index": 0,
+    "current_set": 1,
+    "last_weight": None,
+    "completed_exercises": [],
+}
+
+
+class _LocalContextCache:
+    """Bounded LRU of contexts kept in a single worker's memory.
+
+    Entries expire after a short TTL so Redis TTLs still get refreshed for
+    hot users. Reads that are in flight while their user is invalidated are
+    not stored, so a stale Redis reply can't repopulate the cache.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        # user_id -> (generation, reads in flight)
+        self._pending: dict[str, tuple[int, int]] = {}
+
+    def get(self, user_id: str) -> dict[str, Any] | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, ctx = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return copy.deepcopy(ctx)
+
+    def begin_read(self, user_id: str) -> int:
+        """Register a read from Redis and return its generation token."""
+        generation, readers = self._pending.get(user_id, (0, 0))
+        self._pending[user_id] = (generation, readers + 1)
+        return generation
+
+    def finish_read(
+        self, user_id: str, token: int, ctx: dict[str, Any] | None
+    ) -> None:
+        """Store the result of a read unless the user was invalidated meanwhile."""
+        generation, readers = self._pending[user_id]
+        if readers == 1:
+            del self._pending[user_id]
+        else:
+            self._pending[user_id] = (generation, readers - 1)
+
+        if ctx is None or generation != token:
+            return
+        self._entries[user_id] = (time.monotonic() + self._ttl, copy.deepcopy(ctx))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+        if user_id in self._pending:
+            generation, readers = self._pending[user_id]
+            self._pending[user_id] = (generation + 1, readers)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._pending = {
+            user_id: (generation + 1, readers)
+            for user_id, (generation, readers) in self._pending.items()
+        }
+
 
 class ContextEngine:
     """Manages conversation and workout context for smart AI interactions.
 
     Uses Redis as a shared store to support multi-worker deployments.
     Contexts automatically expire after a configurable TTL.
+    Each public operation is a single atomic script call (one round trip).
+
+    Optionally keeps a per-worker LRU of contexts. Every write publishes an
+    invalidation message, and each worker listening on the channel drops its
+    cached copy, so cached reads stay consistent across workers.
     """
 
     CONTEXT_KEY_PREFIX = "context:"
 
-    def __init__(self, redis_client: redis.Redis | None = None):  # type: ignore[type-arg]
+    def __init__(
+        self,
+        redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
+        local_cache_size: int | None = None,
+    ):
         """Initialize the context engine.
 
         Args:
             redis_client: Optional async Redis client for dependency injection (testing).
                          If not provided, creates a client from settings.
+            local_cache_size: Max contexts kept in this worker's memory.
+                              Defaults to settings; 0 disables the cache.
         """
         if redis_client is not None:
             self._redis: redis.Redis = redis_client  # type: ignore[type-arg]
         else:
             self._redis = redis.from_url(settings.redis_url, decode_responses=True)
         self._ttl = settings.context_ttl_seconds
+        self._channel = settings.context_invalidation_channel
+
+        if local_cache_size is None:
+            local_cache_size = settings.context_local_cache_size
+        self._cache = (
+            _LocalContextCache(
+                local_cache_size, settings.context_local_cache_ttl_seconds
+            )
+            if local_cache_size > 0
+            else None
+        )
+        self._listener: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+
+        self._get_script = self._redis.register_script(_GET_SCRIPT)
+        self._update_script = self._redis.register_script(_UPDATE_SCRIPT)
+        self._record_set_script = self._redis.register_script(_RECORD_SET_SCRIPT)
+        self._current_exercise_script = self._redis.register_script(
+            _CURRENT_EXERCISE_SCRIPT
+        )
+        self._next_exercise_script = self._redis.register_script(
+            _NEXT_EXERCISE_SCRIPT
+        )
+        self._end_workout_script = self._redis.register_script(_END_WORKOUT_SCRIPT)
+        self._flush_script = self._redis.register_script(_FLUSH_SCRIPT)
 
     def _key(self, user_id: str) -> str:
         """Generate Redis key for a user's context."""
         return f"{self.CONTEXT_KEY_PREFIX}{user_id}"
 
+    def _keys(self, user_id: str) -> list[str]:
+        """All Redis keys holding a user's context (hash first, then lists)."""
+        key = self._key(user_id)
+        return [key, *(f"{key}:{suffix}" for suffix in _LIST_FIELDS.values())]
+
+    async def _run(self, script: Any, user_id: str, *args: Any) -> Any:
+        """Run a context script for a user."""
+        defaults = {
+            field: value
+            for field, value in self._default_context().items()
+            if field not in _LIST_FIELDS
+        }
+        return await script(
+            keys=self._keys(user_id),
+            args=[
+                self._ttl,
+                json.dumps(self._encode_fields(defaults)),
+                self._channel,
+                *args,
+            ],
+        )
+
+    async def _write(self, script: Any, user_id: str, *args: Any) -> Any:
+        """Run a script that modifies a user's context."""
+        try:
+            return await self._run(script, user_id, *args)
+        finally:
+            if self._cache is not None:
+                self._cache.invalidate(user_id)
+
+    def _cache_active(self) -> bool:
+        """The local cache is only used while invalidations are being received."""
+        return self._cache is not None and self._subscribed.is_set()
+
+    # =========================================================================
+    # Local cache invalidation
+    # =========================================================================
+
+    async def start_invalidation_listener(self, timeout: float = 5.0) -> None:
+        """Subscribe to the invalidation channel so the local cache can be used.
+
+        No-op if the local cache is disabled. Until the subscription is
+        confirmed, all reads go to Redis.
+        """
+        if self._cache is None or self._listener is not None:
+            return
+        self._listener = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout)
+        except TimeoutError:
+            logger.warning("Context invalidation channel not subscribed yet")
+
+    async def stop_invalidation_listener(self) -> None:
+        """Stop listening for invalidations and disable the local cache."""
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+    async def _listen(self) -> None:
+        """Evict cached contexts named on the invalidation channel.
+
+        If the subscription drops, messages may have been missed, so the
+        whole cache is cleared before reconnecting.
+        """
+        assert self._cache is not None
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self._channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "subscribe":
+                            self._subscribed.set()
+                        elif message["type"] == "message":
+                            self._cache.invalidate(
+                                message["data"].removeprefix(self.CONTEXT_KEY_PREFIX)
+                            )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Context invalidation listener failed: {e}")
+            finally:
+                self._subscribed.clear()
+                self._cache.clear()
+            await asyncio.sleep(1)
+
+    @staticmethod
+    def _encode_fields(fields: dict[str, Any]) -> dict[str, str]:
+        """JSON-encode each scalar field value for storage in the hash."""
+        return {field: json.dumps(value) for field, value in fields.items()}
+
+    @staticmethod
+    def _decode_item(raw: str | None) -> Any:
+        """Decode a single JSON-encoded value returned by a script."""
+        return None if raw is None else json.loads(raw)
+
     async def get_context(self, user_id: str) -> dict[str, Any]:
         """Get current context for a user.
 
         If no context exists, creates and stores a default one.
-        Refreshes TTL on each access.
+        Refreshes TTL on each access (served from the local cache if enabled).
         """
-        key = self._key(user_id)
-        data = await self._redis.get(key)
+        ctx = await self._read(user_id)
+        ctx.pop(_VERSION_FIELD, None)
+        return ctx
+
+    async def _read(self, user_id: str) -> dict[str, Any]:
+        """Read a context including its version, using the local cache if active."""
+        if not self._cache_active():
+            return await self._load_context(user_id)
 
-        if data is None:
-            ctx = self._default_context()
-            await self._save_context(user_id, ctx)
+        assert self._cache is not None
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        token = self._cache.begin_read(user_id)
+        ctx = None
+        try:
+            ctx = await self._load_context(user_id)
             return ctx
+        finally:
+            self._cache.finish_read(user_id, token, ctx)
+
+    async def _load_context(self, user_id: str) -> dict[str, Any]:
+        """Read a user's full context from Redis."""
+        flat, planned, completed = await self._run(self._get_script, user_id)
+        ctx = {
+            flat[i]: json.loads(flat[i + 1]) for i in range(0, len(flat), 2)
+        }
+        ctx["planned_exercises"] = [json.loads(item) for item in planned]
+        ctx["completed_exercises"] = [json.loads(item) for item in completed]
+        ctx.setdefault(_VERSION_FIELD, 0)
+        return ctx
+
+    async def load_session(self, user_id: str) -> "ContextSession":
+        """Load a user's context once for in-memory use during a request.
+
+        Changes made through the session are written back in a single
+        compare-and-set when it is flushed.
+        """
+        ctx = await self._read(user_id)
+        return ContextSession(self, user_id, ctx)
 
-        # Refresh TTL on access
-        await self._redis.expire(key, self._ttl)
-        return json.loads(str(data))
+    async def _flush_session(
+        self,
+        user_id: str,
+        version: int,
+        scalars: dict[str, Any],
+        lists: dict[str, dict[str, list[Any]]],
+    ) -> int | None:
+        """Write session changes if the stored version still matches.
+
+        Returns the new version, or None on a version conflict.
+        """
+        encoded_lists = {
+            _LIST_FIELDS[field]: {
+                op: [json.dumps(item) for item in items]
+                for op, items in change.items()
+            }
+            for field, change in lists.items()
+        }
+        new_version = await self._write(
+            self._flush_script,
+            user_id,
+            version,
+            json.dumps(self._encode_fields(scalars)),
+            json.dumps(encoded_lists),
+        )
+        return new_version if new_version else None
 
     async def update_context(self, user_id: str, updates: dict[str, Any]) -> None:
-        """Update context for a user."""
-        ctx = await self.get_context(user_id)
-        ctx.update(updates)
-        ctx["last_updated"] = datetime.utcnow().isoformat()
-        await self._save_context(user_id, ctx)
-
-    async def _save_context(self, user_id: str, ctx: dict[str, Any]) -> None:
-        """Save context to Redis with TTL."""
-        key = self._key(user_id)
-        await self._redis.setex(key, self._ttl, json.dumps(ctx))
+        """Update context for a user.
+
+        Only the given fields are written; list fields are replaced as a whole.
+        """
+        updates = {**updates, "last_updated": datetime.utcnow().isoformat()}
+        scalars = {k: v for k, v in updates.items() if k not in _LIST_FIELDS}
+        lists = {
+            suffix: [json.dumps(item) for item in updates[field]]
+            for field, suffix in _LIST_FIELDS.items()
+            if field in updates
+        }
+        await self._write(
+            self._update_script,
+            user_id,
+            json.dumps(self._encode_fields(scalars)),
+            json.dumps(lists),
+        )
 
     async def start_workout(
         self,
@@ -71,42 +524,101 @@ class ContextEngine:
     ) -> None:
         """Start a workout session."""
         await self.update_context(user_id, {
+            **_WORKOUT_RESET,
             "workout_active": True,
             "workout_started": datetime.utcnow().isoformat(),
             "current_routine": routine_name,
             "planned_exercises": exercises or [],
-            "current_exercise_index": 0,
-            "current_set": 1,
-            "last_weight": None,
-            "completed_exercises": [],
         })
 
     async def end_workout(self, user_id: str) -> dict[str, Any]:
         """End workout and return summary."""
-        ctx = await self.get_context(user_id)
-        summary = {
-            "duration": self._calculate_duration(ctx.get("workout_started")),
-            "exercises_completed": len(ctx.get("completed_exercises", [])),
-            "completed_exercises": ctx.get("completed_exercises", []),
+        reset = {
+            field: value
+            for field, value in _WORKOUT_RESET.items()
+            if field not in _LIST_FIELDS
         }
+        reset["last_updated"] = datetime.utcnow().isoformat()
+        started, done = await self._write(
+            self._end_workout_script,
+            user_id,
+            json.dumps(self._encode_fields(reset)),
+        )
+        completed = [json.loads(item) for item in done]
 
-        # Reset workout context
-        await self.update_context(user_id, {
-            "workout_active": False,
-            "workout_started": None,
-            "current_routine": None,
-            "planned_exercises": [],
-            "current_exercise_index": 0,
-            "current_set": 1,
-            "last_weight": None,
-            "completed_exercises": [],
-        })
-
-        return summary
+        return {
+            "duration": self._calculate_duration(json.loads(started)),
+            "exercises_completed": len(completed),
+            "completed_exercises": completed,
+        }
 
     async def get_current_exercise(self, user_id: str) -> dict[str, Any] | None:
         """Get current exercise in active workout."""
-        ctx = await self.get_context(user_id)
+        if self._cache_active():
+            return self._current_exercise(await self.get_context(user_id))
+        return self._decode_item(
+            await self._run(self._current_exercise_script, user_id)
+        )
+
+    async def next_exercise(self, user_id: str) -> dict[str, Any] | None:
+        """Move to next exercise."""
+        return self._decode_item(
+            await self._write(
+                self._next_exercise_script,
+                user_id,
+                json.dumps(datetime.utcnow().isoformat()),
+            )
+        )
+
+    async def record_set(self, user_id: str, weight: float, reps: int) -> None:
+        """Record a set and update context."""
+        await self._write(
+            self._record_set_script,
+            user_id,
+            json.dumps(weight),
+            json.dumps(datetime.utcnow().isoformat()),
+        )
+
+    async def migrate_legacy_contexts(self) -> int:
+        """Convert contexts stored as a single JSON string to the hash layout.
+
+        One-shot migration for keys written before contexts were stored as
+        hashes. Keeps the remaining TTL of each key. Returns the number of
+        migrated contexts.
+        """
+        migrated = 0
+        async for key in self._redis.scan_iter(match=f"{self.CONTEXT_KEY_PREFIX}*"):
+            if await self._redis.type(key) != "string":
+                continue
+
+            raw = await self._redis.get(key)
+            ttl = await self._redis.ttl(key)
+            if raw is None:
+                continue
+            ctx = json.loads(raw)
+
+            user_id = key.removeprefix(self.CONTEXT_KEY_PREFIX)
+            hash_key, *list_keys = self._keys(user_id)
+            scalars = {k: v for k, v in ctx.items() if k not in _LIST_FIELDS}
+
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.delete(hash_key, *list_keys)
+                if scalars:
+                    encoded: dict[FieldT, EncodableT] = {**self._encode_fields(scalars)}
+                    pipe.hset(hash_key, mapping=encoded)
+                for field, list_key in zip(_LIST_FIELDS, list_keys, strict=True):
+                    items = ctx.get(field) or []
+                    if items:
+                        pipe.rpush(list_key, *(json.dumps(item) for item in items))
+                for k in (hash_key, *list_keys):
+                    pipe.expire(k, ttl if ttl > 0 else self._ttl)
+                await pipe.execute()
+            migrated += 1
+
+        return migrated
+
+    def _current_exercise(self, ctx: dict[str, Any]) -> dict[str, Any] | None:
+        """Pick the current exercise out of a loaded context."""
         if not ctx.get("workout_active"):
             return None
 
@@ -117,31 +629,6 @@ class ContextEngine:
             return exercises[index]
         return None
 
-    async def next_exercise(self, user_id: str) -> dict[str, Any] | None:
-        """Move to next exercise."""
-        ctx = await self.get_context(user_id)
-        current = await self.get_current_exercise(user_id)
-
-        if current:
-            completed = ctx.get("completed_exercises", [])
-            completed.append(current)
-            await self.update_context(user_id, {
-                "completed_exercises": completed,
-                "current_exercise_index": ctx.get("current_exercise_index", 0) + 1,
-                "current_set": 1,
-                "last_weight": None,
-            })
-
-        return await self.get_current_exercise(user_id)
-
-    async def record_set(self, user_id: str, weight: float, reps: int) -> None:
-        """Record a set and update context."""
-        ctx = await self.get_context(user_id)
-        await self.update_context(user_id, {
-            "last_weight": weight,
-            "current_set": ctx.get("current_set", 1) + 1,
-        })
-
     def _default_context(self) -> dict[str, Any]:
         """Default context for new users."""
         return {
@@ -165,5 +652,133 @@ class ContextEngine:
         return int((datetime.utcnow() - start).total_seconds() / 60)
 
 
+class ContextConflictError(Exception):
+    """A context session couldn't be flushed because of concurrent writes."""
+
+
+class ContextSession:
+    """Request-scoped, in-memory view of a user's context.
+
+    Loaded once at the start of a request; the handler and services mutate it
+    in memory and it is written back once by flush(). The write is a
+    compare-and-set on the context version. If another worker wrote in the
+    meantime, the context is reloaded, the recorded changes are replayed on
+    top of it and the write is retried.
+    """
+
+    MAX_FLUSH_ATTEMPTS = 5
+
+    def __init__(self, engine: ContextEngine, user_id: str, ctx: dict[str, Any]):
+        self._engine = engine
+        self.user_id = user_id
+        self._load(ctx)
+        self._changes: list[Callable[[dict[str, Any]], Any]] = []
+
+    def _load(self, ctx: dict[str, Any]) -> None:
+        self._version: int = ctx.pop(_VERSION_FIELD, 0)
+        self._base = copy.deepcopy(ctx)
+        self._ctx = ctx
+
+    @property
+    def context(self) -> dict[str, Any]:
+        """Current in-memory context. Treat as read-only; use the methods to change it."""
+        return self._ctx
+
+    def _apply(self, change: Callable[[dict[str, Any]], Any]) -> Any:
+        """Apply a change now and remember it for replay on conflict."""
+        self._changes.append(change)
+        return change(self._ctx)
+
+    def update(self, updates: dict[str, Any]) -> None:
+        """Update context fields."""
+        updates = copy.deepcopy(updates)
+
+        def change(ctx: dict[str, Any]) -> None:
+            ctx.update(copy.deepcopy(updates))
+            ctx["last_updated"] = datetime.utcnow().isoformat()
+
+        self._apply(change)
+
+    def record_set(self, weight: float, reps: int) -> None:
+        """Record a set."""
+
+        def change(ctx: dict[str, Any]) -> None:
+            ctx["last_weight"] = weight
+            ctx["current_set"] = ctx.get("current_set", 1) + 1
+            ctx["last_updated"] = datetime.utcnow().isoformat()
+
+        self._apply(change)
+
+    def current_exercise(self) -> dict[str, Any] | None:
+        """Current exercise in the active workout."""
+        return self._engine._current_exercise(self._ctx)
+
+    def next_exercise(self) -> dict[str, Any] | None:
+        """Move to the next exercise and return it."""
+
+        def change(ctx: dict[str, Any]) -> dict[str, Any] | None:
+            current = self._engine._current_exercise(ctx)
+            if current:
+                ctx["completed_exercises"].append(current)
+                ctx["current_exercise_index"] = ctx.get("current_exercise_index", 0) + 1
+                ctx["current_set"] = 1
+                ctx["last_weight"] = None
+                ctx["last_updated"] = datetime.utcnow().isoformat()
+            return self._engine._current_exercise(ctx)
+
+        return self._apply(change)
+
+    def _diff(
+        self,
+    ) -> tuple[dict[str, Any], dict[str, dict[str, list[Any]]]]:
+        """Changed scalar fields and list operations since the context was loaded."""
+        scalars = {
+            field: value
+            for field, value in self._ctx.items()
+            if field not in _LIST_FIELDS and self._base.get(field, None) != value
+        }
+        lists: dict[str, dict[str, list[Any]]] = {}
+        for field in _LIST_FIELDS:
+            before = self._base.get(field, [])
+            after = self._ctx.get(field, [])
+            if after == before:
+                continue
+            if after[: len(before)] == before:
+                lists[field] = {"append": after[len(before):]}
+            else:
+                lists[field] = {"replace": after}
+        return scalars, lists
+
+    async def flush(self) -> None:
+        """Write all changes back in one round trip (none if nothing changed).
+
+        Raises:
+            ContextConflictError: If the context kept changing concurrently.
+        """
+        for _ in range(self.MAX_FLUSH_ATTEMPTS):
+            scalars, lists = self._diff()
+            if not scalars and not lists:
+                return
+
+            version = await self._engine._flush_session(
+                self.user_id, self._version, scalars, lists
+            )
+            if version is not None:
+                self._version = version
+                self._base = copy.deepcopy(self._ctx)
+                self._changes.clear()
+                return
+
+            # Someone else wrote first: replay our changes on the fresh state
+            self._load(await self._engine._load_context(self.user_id))
+            for change in self._changes:
+                change(self._ctx)
+
+        raise ContextConflictError(
+            f"Context for {self.user_id} changed concurrently, giving up after "
+            f"{self.MAX_FLUSH_ATTEMPTS} attempts"
+        )
+
+
 # Singleton instance - uses Redis from settings
 context_engine = ContextEngine()
@@ -1,14 +1,40 @@
 """Entry service for saving tracked data to database."""
 
-from datetime import datetime
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Text,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    type_coerce,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.metrics import HitRatio, register
 from app.models.entry import Entry
 from app.models.tracker import Tracker
-from app.services.user import get_or_create_user
+from app.models.user import User
+from app.services.pagination import fetch_entry_page
+from app.services.stats import entry_volume, numeric_field, refresh_daily_stats
+from app.services.user import ensure_user, known_users
+
+logger = logging.getLogger(__name__)
+
+tracker_cache_stats = register(HitRatio("tracker_cache"))
 
 # Default categories for common tracker types
 TRACKER_CATEGORIES = {
@@ -57,6 +83,70 @@ def get_category_for_tracker(name: str) -> str:
     return "general"
 
 
+# Entries per INSERT of a batch (the size of one insertmanyvalues statement)
+ENTRY_INSERT_CHUNK = 1000
+
+
+def normalize_tracker_name(name: str) -> str:
+    """Tracker name as it is stored and cached ("bankdrücken " -> "Bankdrücken")."""
+    return name.strip().title()
+
+
+class TrackerIdCache:
+    """Tracker IDs by (user_id, tracker name), per worker (TTL + LRU).
+
+    Filled when trackers are looked up or created and invalidated by the
+    tracker PUT/DELETE routes. Other workers only notice a rename or delete
+    after the TTL; a stale ID that breaks an insert is dropped and the
+    insert retried (see save_entry).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        # (user_id, name) -> (expires_at, tracker_id)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, uuid.UUID]] = OrderedDict()
+
+    def get(self, user_id: str, name: str) -> uuid.UUID | None:
+        """The cached tracker ID for a normalized name, if any."""
+        key = (user_id, name)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            tracker_cache_stats.miss()
+            return None
+        self._entries.move_to_end(key)
+        tracker_cache_stats.hit()
+        return entry[1]
+
+    def set(self, user_id: str, name: str, tracker_id: uuid.UUID) -> None:
+        """Record the ID of a tracker as it is stored in the database."""
+        if self._max_size <= 0:
+            return
+        key = (user_id, name)
+        self._entries[key] = (time.monotonic() + self._ttl, tracker_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, *names: str) -> None:
+        """Forget trackers, e.g. after a rename or delete."""
+        for name in names:
+            self._entries.pop((user_id, name), None)
+
+    def clear(self) -> None:
+        """Forget all trackers known to this worker."""
+        self._entries.clear()
+
+
+tracker_id_cache = TrackerIdCache(
+    max_size=settings.tracker_cache_size,
+    ttl_seconds=settings.tracker_cache_ttl_seconds,
+)
+
+
 async def get_or_create_tracker(
     db: AsyncSession,
     user_id: str,
@@ -66,7 +156,7 @@ async def get_or_create_tracker(
     """Get existing tracker or create new one."""
 
     # Normalize tracker name
-    normalized_name = tracker_name.strip().title()
+    normalized_name = normalize_tracker_name(tracker_name)
 
     # Try to find existing tracker
     result = await db.execute(
@@ -78,6 +168,7 @@ async def get_or_create_tracker(
     tracker = result.scalar_one_or_none()
 
     if tracker:
+        tracker_id_cache.set(user_id, normalized_name, tracker.id)
         return tracker
 
     # Create new tracker
@@ -92,9 +183,106 @@ async def get_or_create_tracker(
     db.add(new_tracker)
     await db.commit()
     await db.refresh(new_tracker)
+    tracker_id_cache.set(user_id, normalized_name, new_tracker.id)
     return new_tracker
 
 
+def _dialect_insert(dialect: str) -> Any:
+    return postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+
+def _insert_user_if_missing(dialect: str, user_id: str, email: str | None, now: datetime):
+    """INSERT ... ON CONFLICT DO NOTHING for the user row."""
+    return _dialect_insert(dialect)(User).values(
+        id=user_id,
+        email=email or f"{user_id}@clerk.user",
+        created_at=now,
+        updated_at=now,
+    ).on_conflict_do_nothing()
+
+
+def _insert_trackers_if_missing(
+    dialect: str, user_id: str, names: list[str], now: datetime
+):
+    """INSERT ... ON CONFLICT (user_id, name) DO NOTHING for new trackers."""
+    return _dialect_insert(dialect)(Tracker).values([
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "name": name,
+            "category": get_category_for_tracker(name),
+            "schema": {},  # Schema can be populated later based on entries
+            "created_at": now,
+            "updated_at": now,
+        }
+        for name in names
+    ]).on_conflict_do_nothing(index_elements=["user_id", "name"])
+
+
+def _insert_entry(entry: Entry, tracker_id: Any):
+    return insert(Entry).from_select(
+        ["id", "user_id", "tracker_id", "data", "notes", "timestamp", "created_at"],
+        select(
+            literal(entry.id, Entry.id.type),
+            literal(entry.user_id),
+            tracker_id,
+            literal(entry.data, Entry.data.type),
+            literal(entry.notes, Text()),
+            literal(entry.timestamp, DateTime()),
+            literal(entry.created_at, DateTime()),
+        ),
+    ).returning(Entry.tracker_id)
+
+
+async def _insert_entry_with_tracker(
+    db: AsyncSession,
+    entry: Entry,
+    tracker_name: str,
+    user_email: str | None,
+    now: datetime,
+    insert_user: bool,
+) -> uuid.UUID:
+    """Insert the entry, creating user and tracker as needed. Returns the tracker ID."""
+    dialect = db.get_bind().dialect.name
+    user_id = entry.user_id
+
+    prelude = []
+    if insert_user:
+        prelude.append(_insert_user_if_missing(dialect, user_id, user_email, now))
+
+    cached_id = tracker_id_cache.get(user_id, tracker_name)
+    if cached_id is not None:
+        tracker_id: Any = literal(cached_id, Tracker.id.type)
+    else:
+        tracker_insert = _insert_trackers_if_missing(dialect, user_id, [tracker_name], now)
+        lookup = select(Tracker.id).where(
+            Tracker.user_id == user_id, Tracker.name == tracker_name
+        )
+        if dialect == "postgresql":
+            # ON CONFLICT DO NOTHING returns no row for an existing tracker,
+            # and the lookup can't see a tracker inserted by the same statement
+            new_tracker = tracker_insert.returning(Tracker.id).cte("new_tracker")
+            tracker_id = func.coalesce(
+                select(new_tracker.c.id).scalar_subquery(), lookup.scalar_subquery()
+            )
+        else:
+            prelude.append(tracker_insert)
+            tracker_id = lookup.scalar_subquery()
+
+    statement = _insert_entry(entry, tracker_id)
+    if dialect == "postgresql":
+        # Unreferenced CTEs (the user insert) have to be attached explicitly
+        ctes = [insert.cte(f"prelude_{i}") for i, insert in enumerate(prelude)]
+        if ctes:
+            statement = statement.add_cte(*ctes)
+    else:
+        for insert_statement in prelude:
+            await db.execute(insert_statement)
+
+    result = await db.execute(statement)
+    return result.scalar_one()
+
+
 async def save_entry(
     db: AsyncSession,
     user_id: str,
@@ -104,35 +292,258 @@ async def save_entry(
     notes: str | None = None,
     timestamp: datetime | None = None,
 ) -> Entry:
-    """Save a tracking entry to the database.
-    
-    This will:
-    1. Ensure user exists in DB
-    2. Get or create the tracker
-    3. Save the entry
-    """
-
-    # Ensure user exists
-    await get_or_create_user(db, user_id, user_email)
+    """Save a tracking entry to the database in one transaction.
 
-    # Get or create tracker
-    tracker = await get_or_create_tracker(db, user_id, tracker_name)
+    Creates the user and the tracker if they don't exist yet and inserts the
+    entry. On PostgreSQL this is a single statement (the user and tracker
+    inserts are CTEs of the entry INSERT), so one set costs that statement,
+    the daily rollup's lock and update and the commit. Other databases (SQLite in
+    tests) run the same INSERTs one after another. IDs and timestamps are
+    generated here, so nothing needs to be read back.
 
-    # Create entry
+    Users and trackers already known to this worker (KnownUserCache,
+    TrackerIdCache) are not inserted again. If an insert still fails, e.g.
+    because a cached tracker was deleted or another request created the same
+    tracker concurrently, the caches are dropped and the insert is retried
+    once. Unlike ensure_user, an existing user's email is not updated.
+    """
+    normalized_name = normalize_tracker_name(tracker_name)
+    now = datetime.utcnow()
     entry = Entry(
+        id=uuid.uuid4(),
         user_id=user_id,
-        tracker_id=tracker.id,
         data=data,
         notes=notes,
-        timestamp=timestamp or datetime.utcnow(),
+        timestamp=timestamp or now,
+        created_at=now,
     )
-    db.add(entry)
+
+    insert_user = not await known_users.contains(user_id)
+    try:
+        entry.tracker_id = await _insert_entry_with_tracker(
+            db, entry, normalized_name, user_email, now, insert_user
+        )
+    except IntegrityError:
+        await db.rollback()
+        tracker_id_cache.invalidate(user_id, normalized_name)
+        await known_users.invalidate(user_id)
+        insert_user = True
+        entry.tracker_id = await _insert_entry_with_tracker(
+            db, entry, normalized_name, user_email, now, insert_user
+        )
+    await refresh_daily_stats(db, [(entry.tracker_id, entry.timestamp.date())])
+    await db.commit()
+
+    if insert_user:
+        # The row may predate this request, so only its existence is known;
+        # with empty claims ensure_user still checks email and name
+        await known_users.add(user_id, "", None)
+    tracker_id_cache.set(user_id, normalized_name, entry.tracker_id)
+    return entry
+
+
+async def save_entries(
+    db: AsyncSession,
+    user_id: str,
+    user_email: str | None,
+    entries: list[dict[str, Any]],
+) -> list[uuid.UUID | str]:
+    """Save many entries in one transaction.
+
+    Each entry names its tracker either by "tracker_id" (must belong to the
+    user) or by "tracker" name (created if missing). Names are resolved
+    from the TrackerIdCache where possible and otherwise with one SELECT,
+    missing ones are created with one multi-row INSERT, and the entries are
+    inserted with multi-row INSERT ... RETURNING statements instead of one
+    commit and refresh per row. Each chunk of ENTRY_INSERT_CHUNK entries is
+    inserted in a savepoint; if one fails (e.g. its tracker was deleted in
+    the meantime), its entries are reported as failed and the rest is kept.
+
+    Args:
+        db: Database session
+        user_id: Owner of the entries
+        user_email: Email to create the user with if needed
+        entries: Dicts with tracker_id or tracker, data, notes, timestamp
+
+    Returns:
+        For each entry, in order, the new entry ID or an error message.
+    """
+    await ensure_user(db, user_id, user_email)
+
+    tracker_ids = {entry["tracker_id"] for entry in entries if entry.get("tracker_id")}
+    tracker_names = {
+        normalize_tracker_name(entry["tracker"])
+        for entry in entries
+        if not entry.get("tracker_id") and entry.get("tracker")
+    }
+
+    owned_ids: set[uuid.UUID] = set()
+    ids_by_name: dict[str, uuid.UUID] = {}
+    for name in tracker_names:
+        if (cached_id := tracker_id_cache.get(user_id, name)) is not None:
+            ids_by_name[name] = cached_id
+
+    async def select_trackers(ids: set[uuid.UUID], names: set[str]) -> None:
+        conditions = []
+        if ids:
+            conditions.append(Tracker.id.in_(ids))
+        if names:
+            conditions.append(Tracker.name.in_(names))
+        if not conditions:
+            return
+        result = await db.execute(
+            select(Tracker.id, Tracker.name).where(
+                Tracker.user_id == user_id, or_(*conditions)
+            )
+        )
+        for tracker_id, name in result:
+            owned_ids.add(tracker_id)
+            if name in names:
+                ids_by_name[name] = tracker_id
+
+    await select_trackers(tracker_ids, tracker_names - ids_by_name.keys())
+
+    missing = sorted(tracker_names - ids_by_name.keys())
+    if missing:
+        dialect = db.get_bind().dialect.name
+        result = await db.execute(
+            _insert_trackers_if_missing(dialect, user_id, missing, datetime.utcnow())
+            .returning(Tracker.id, Tracker.name)
+        )
+        ids_by_name.update((row.name, row.id) for row in result)
+        # Created concurrently by another request since the SELECT
+        await select_trackers(set(), tracker_names - ids_by_name.keys())
+    for name in tracker_names:
+        tracker_id_cache.set(user_id, name, ids_by_name[name])
+
+    results: list[uuid.UUID | str] = []
+    rows: list[dict[str, Any]] = []
+    positions: list[int] = []
+    now = datetime.utcnow()
+    for position, entry in enumerate(entries):
+        if entry.get("tracker_id"):
+            tracker_id = entry["tracker_id"]
+            if tracker_id not in owned_ids:
+                results.append("Tracker not found")
+                continue
+        else:
+            tracker_id = ids_by_name[normalize_tracker_name(entry["tracker"])]
+        results.append("")
+        positions.append(position)
+        rows.append({
+            "user_id": user_id,
+            "tracker_id": tracker_id,
+            "data": entry["data"],
+            "notes": entry.get("notes"),
+            "timestamp": entry.get("timestamp") or now,
+        })
+
+    saved: list[dict[str, Any]] = []
+    for start in range(0, len(rows), ENTRY_INSERT_CHUNK):
+        chunk = rows[start:start + ENTRY_INSERT_CHUNK]
+        chunk_positions = positions[start:start + ENTRY_INSERT_CHUNK]
+        try:
+            async with db.begin_nested():
+                result = await db.execute(
+                    insert(Entry).returning(Entry.id, sort_by_parameter_order=True), chunk
+                )
+                entry_ids = result.scalars().all()
+        except IntegrityError as e:
+            logger.warning(f"Saving {len(chunk)} entries of a batch failed: {e}")
+            # Most likely a tracker that was deleted since it was resolved
+            tracker_id_cache.invalidate(user_id, *tracker_names)
+            for position in chunk_positions:
+                results[position] = "Tracker not found"
+            continue
+        for position, entry_id in zip(chunk_positions, entry_ids, strict=True):
+            results[position] = entry_id
+        saved.extend(chunk)
+
+    if saved:
+        await refresh_daily_stats(
+            db, {(row["tracker_id"], row["timestamp"].date()) for row in saved}
+        )
+
     await db.commit()
-    await db.refresh(entry)
+    return results
 
+
+async def _get_owned_entry(
+    db: AsyncSession, user_id: str, tracker_id: uuid.UUID, entry_id: uuid.UUID
+) -> Entry | None:
+    entry = await db.get(Entry, entry_id)
+    if entry is None or entry.user_id != user_id or entry.tracker_id != tracker_id:
+        return None
     return entry
 
 
+async def update_entry(
+    db: AsyncSession,
+    user_id: str,
+    tracker_id: uuid.UUID,
+    entry_id: uuid.UUID,
+    changes: dict[str, Any],
+) -> Entry | None:
+    """Update data, notes or timestamp of an entry and its daily rollups.
+
+    Args:
+        db: Database session
+        user_id: Owner of the entry
+        tracker_id: Tracker the entry belongs to
+        entry_id: Entry UUID
+        changes: New values by field name (data, notes, timestamp)
+
+    Returns:
+        Updated Entry or None if the user has no such entry in the tracker
+    """
+    entry = await _get_owned_entry(db, user_id, tracker_id, entry_id)
+    if entry is None:
+        return None
+
+    old_day = (entry.tracker_id, entry.timestamp.date())
+    for field, value in changes.items():
+        setattr(entry, field, value)
+    await db.flush()
+
+    await refresh_daily_stats(
+        db, {old_day, (entry.tracker_id, entry.timestamp.date())}, entries_removed=True
+    )
+    await db.commit()
+    return entry
+
+
+async def delete_entry(
+    db: AsyncSession, user_id: str, tracker_id: uuid.UUID, entry_id: uuid.UUID
+) -> bool:
+    """Delete an entry and update its daily rollup.
+
+    Returns:
+        False if the user has no such entry in the tracker
+    """
+    entry = await _get_owned_entry(db, user_id, tracker_id, entry_id)
+    if entry is None:
+        return False
+
+    await db.delete(entry)
+    await db.flush()
+    await refresh_daily_stats(
+        db, [(entry.tracker_id, entry.timestamp.date())], entries_removed=True
+    )
+    await db.commit()
+    return True
+
+
+def _tracker_id_by_name(user_id: str, tracker_name: str):
+    # Filter entries by the tracker's ID (not a join on its name) so the
+    # newest entries come straight from ix_entries_tracker_id_timestamp
+    normalized_name = normalize_tracker_name(tracker_name)
+    return (
+        select(Tracker.id)
+        .where(Tracker.user_id == user_id, Tracker.name == normalized_name)
+        .scalar_subquery()
+    )
+
+
 async def get_recent_entries(
     db: AsyncSession,
     user_id: str,
@@ -141,36 +552,246 @@ async def get_recent_entries(
 ) -> list[Entry]:
     """Get recent entries for a user, optionally filtered by tracker."""
 
-    query = select(Entry).where(Entry.user_id == user_id)
+    entries, _ = await get_entry_page(db, user_id, tracker_name, limit)
+    return entries
+
+
+async def get_entry_page(
+    db: AsyncSession,
+    user_id: str,
+    tracker_name: str | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> tuple[list[Entry], str | None]:
+    """Get one page of a user's entries, newest first.
 
+    Args:
+        db: Database session
+        user_id: Owner of the entries
+        tracker_name: Only entries of this tracker
+        limit: Page size
+        cursor: next_cursor of the previous page, None for the first page
+
+    Returns:
+        The entries and the cursor of the next page (None on the last page).
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
     if tracker_name:
-        # Join with tracker to filter by name
-        normalized_name = tracker_name.strip().title()
-        query = query.join(Tracker).where(Tracker.name == normalized_name)
+        # The tracker lookup is scoped to the user already; a second
+        # user_id filter would only tempt the planner into the wrong index
+        query = select(Entry).where(
+            Entry.tracker_id == _tracker_id_by_name(user_id, tracker_name)
+        )
+    else:
+        query = select(Entry).where(Entry.user_id == user_id)
+
+    return await fetch_entry_page(db, query, limit, cursor)
+
+
+FIELD_AGGREGATES = {
+    "max": func.max,
+    "min": func.min,
+    "avg": func.avg,
+    "sum": func.sum,
+    "count": func.count,
+}
 
-    query = query.order_by(Entry.timestamp.desc()).limit(limit)
 
-    result = await db.execute(query)
+def _field_equals(dialect: str, field: str, expected: Any) -> ColumnElement[bool]:
+    if dialect == "postgresql":
+        # data @> '{"field": value}', answered from the GIN index ix_entries_data
+        return type_coerce(Entry.data, postgresql.JSONB).contains({field: expected})
+    value = Entry.data[field]
+    if isinstance(expected, bool):
+        return value.as_boolean() == expected
+    if isinstance(expected, int | float):
+        return numeric_field(dialect, field) == expected
+    return value.as_string() == expected
+
+
+def _entry_conditions(
+    dialect: str,
+    user_id: str,
+    tracker_name: str | None,
+    equals: dict[str, Any] | None = None,
+    at_least: dict[str, float] | None = None,
+    at_most: dict[str, float] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[ColumnElement[bool]]:
+    if tracker_name:
+        # Scoped to the user through the tracker lookup (see get_entry_page)
+        conditions = [Entry.tracker_id == _tracker_id_by_name(user_id, tracker_name)]
+    else:
+        conditions = [Entry.user_id == user_id]
+    if since:
+        conditions.append(Entry.timestamp >= since)
+    if until:
+        conditions.append(Entry.timestamp < until)
+    for field, expected in (equals or {}).items():
+        conditions.append(_field_equals(dialect, field, expected))
+    for field, minimum in (at_least or {}).items():
+        conditions.append(numeric_field(dialect, field) >= minimum)
+    for field, maximum in (at_most or {}).items():
+        conditions.append(numeric_field(dialect, field) <= maximum)
+    return conditions
+
+
+async def find_entries(
+    db: AsyncSession,
+    user_id: str,
+    tracker_name: str | None = None,
+    *,
+    equals: dict[str, Any] | None = None,
+    at_least: dict[str, float] | None = None,
+    at_most: dict[str, float] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 100,
+) -> list[Entry]:
+    """Find entries by the values in their data, newest first.
+
+    The filters run in the database, e.g. all Bankdrücken sets with at
+    least 100 kg:
+
+        await find_entries(db, user_id, "Bankdrücken", at_least={"weight": 100})
+
+    Args:
+        db: Database session
+        user_id: Owner of the entries
+        tracker_name: Only entries of this tracker
+        equals: Fields that must have exactly these values
+        at_least: Numeric fields with a lower bound (inclusive)
+        at_most: Numeric fields with an upper bound (inclusive)
+        since: Only entries at or after this time
+        until: Only entries before this time
+        limit: Maximum number of entries
+
+    Returns:
+        Matching entries, newest first. Entries where a bounded field is
+        missing or not a number don't match.
+    """
+    conditions = _entry_conditions(
+        db.get_bind().dialect.name, user_id, tracker_name, equals, at_least, at_most, since, until
+    )
+    result = await db.execute(
+        select(Entry)
+        .where(*conditions)
+        .order_by(Entry.timestamp.desc(), Entry.id.desc())
+        .limit(limit)
+    )
     return list(result.scalars().all())
 
 
+async def aggregate_entry_field(
+    db: AsyncSession,
+    user_id: str,
+    tracker_name: str,
+    field: str,
+    function: str = "max",
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> float | None:
+    """Aggregate a numeric data field in the database, e.g. max weight in March.
+
+    Args:
+        db: Database session
+        user_id: Owner of the entries
+        tracker_name: Tracker whose entries are aggregated
+        field: Key in Entry.data, e.g. "weight"
+        function: One of FIELD_AGGREGATES (max, min, avg, sum, count)
+        since: Only entries at or after this time
+        until: Only entries before this time
+
+    Returns:
+        The aggregate over entries where the field is a number, or None if
+        there are none (count returns 0).
+    """
+    if function not in FIELD_AGGREGATES:
+        raise ValueError(f"Unknown aggregate: {function}")
+    dialect = db.get_bind().dialect.name
+    conditions = _entry_conditions(
+        dialect, user_id, tracker_name, since=since, until=until
+    )
+    value = FIELD_AGGREGATES[function](numeric_field(dialect, field))
+    result = await db.execute(select(value).where(*conditions))
+    return result.scalar_one()
+
+
 async def get_tracker_stats(
     db: AsyncSession,
     user_id: str,
     tracker_name: str,
+    weeks: int = 8,
 ) -> dict[str, Any]:
-    """Get statistics for a tracker (last value, count, etc.)."""
+    """Get statistics for a tracker (last value, count, etc.).
+
+    Everything is computed by one aggregate query, so the result is the same
+    size (and costs the same memory) however long the history is.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tracker
+        tracker_name: Tracker name (normalized like everywhere else)
+        weeks: Number of weeks in weekly_counts, including the current one
 
-    entries = await get_recent_entries(db, user_id, tracker_name, limit=100)
+    Returns:
+        count, first_entry_date, last_entry (data and timestamp), max_weight,
+        total_volume (sets × reps × weight, sets defaulting to 1) and
+        weekly_counts (oldest first, weeks starting on Monday). Aggregates
+        over fields no entry has as a number are None.
+    """
+    dialect = db.get_bind().dialect.name
+    conditions = _entry_conditions(dialect, user_id, tracker_name)
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    this_week = today - timedelta(days=today.weekday())
+    week_starts = [this_week - timedelta(weeks=i) for i in reversed(range(weeks))]
 
-    if not entries:
-        return {"count": 0, "last_entry": None}
+    volume = entry_volume(dialect)
+    stats = select(
+        func.count().label("entry_count"),
+        func.min(Entry.timestamp).label("first_timestamp"),
+        func.max(numeric_field(dialect, "weight")).label("max_weight"),
+        func.sum(volume).label("total_volume"),
+        *(
+            func.count()
+            .filter(Entry.timestamp >= start, Entry.timestamp < start + timedelta(weeks=1))
+            .label(f"week_{i}")
+            for i, start in enumerate(week_starts)
+        ),
+    ).where(*conditions).subquery("stats")
+    last = (
+        select(Entry.data, Entry.timestamp)
+        .where(*conditions)
+        .order_by(Entry.timestamp.desc(), Entry.id.desc())
+        .limit(1)
+        .subquery("last")
+    )
+    # The aggregate row plus the newest entry, which comes straight from
+    # ix_entries_tracker_id_timestamp; the join is empty-safe (LEFT ... ON true)
+    row = (
+        await db.execute(
+            select(stats, last.c.data, last.c.timestamp).select_from(
+                stats.outerjoin(last, true())
+            )
+        )
+    ).one()
 
     return {
-        "count": len(entries),
-        "last_entry": {
-            "data": entries[0].data,
-            "timestamp": entries[0].timestamp.isoformat(),
-        },
-        "first_entry_date": entries[-1].timestamp.isoformat() if entries else None,
+        "count": row.entry_count,
+        "first_entry_date": row.first_timestamp.isoformat() if row.first_timestamp else None,
+        "last_entry": (
+            {"data": row.data, "timestamp": row.timestamp.isoformat()}
+            if row.timestamp
+            else None
+        ),
+        "max_weight": row.max_weight,
+        "total_volume": row.total_volume,
+        "weekly_counts": [
+            {"week": start.date().isoformat(), "count": row._mapping[f"week_{i}"]}
+            for i, start in enumerate(week_starts)
+        ],
     }
@@ -0,0 +1,168 @@
+"""Deterministic parser for common workout inputs that don't need the LLM.
+
+During a workout most messages are short and formulaic ("12", "95, 12",
+"3x10 Bankdrücken mit 80kg", "nächste"). These are resolved locally into the
+same {action, tracker, data, message, component} structure the AI returns.
+Only messages that match a rule completely and can be resolved against the
+current context are handled; everything else returns None and goes to the
+LLM.
+"""
+
+import re
+from typing import Any
+
+from app.metrics import HitRatio, register
+from app.services.entry import TRACKER_CATEGORIES
+
+fast_path_stats = register(HitRatio("fast_path"))
+
+_NUMBER = r"\d{1,4}(?:[.,]\d{1,2})?"
+_WEIGHT_UNIT = r"(?:kg|kilo)"
+_REPS_UNIT = r"(?:wdh\.?|wiederholungen|reps)"
+
+# "12", "12 Wdh"
+_REPS_ONLY = re.compile(rf"^(?P<reps>\d{{1,3}})\s*{_REPS_UNIT}?$")
+
+# "95, 12", "95 12", "95kg 12", "95 kg x 12", "95kg, 12 Wdh"
+# A bare "AxB" without unit is ambiguous (sets×reps or weight×reps) and is
+# left to the LLM.
+_WEIGHT_REPS = re.compile(
+    rf"^(?P<weight>{_NUMBER})\s*"
+    rf"(?:{_WEIGHT_UNIT}\s*(?:,|x|×|mal)?|,)?\s*"
+    rf"(?P<reps>\d{{1,3}})\s*{_REPS_UNIT}?$"
+)
+
+# "3x10", "3 × 10"
+_SETS_REPS = re.compile(
+    r"(?<![\d.,])(?P<sets>\d{1,2})\s*[x×]\s*(?P<reps>\d{1,3})(?![\d.,])"
+)
+# "80kg", "82,5 kg"
+_WEIGHT = re.compile(rf"(?<![\d.,])(?P<weight>{_NUMBER})\s*{_WEIGHT_UNIT}\b")
+# Words that may surround the exercise name
+_FILLER = re.compile(r"\b(?:mit|bei|à|je|sätze|saetze|sets)\b")
+
+# "nächste", "weiter", "nächste Übung", "next"
+_NEXT = re.compile(
+    r"^(?:nächste|naechste|weiter|next)(?:\s+(?:übung|uebung|exercise))?$"
+)
+
+_KNOWN_EXERCISES = {
+    name for name, category in TRACKER_CATEGORIES.items() if category == "fitness"
+}
+
+
+def _number(text: str) -> int | float:
+    value = float(text.replace(",", "."))
+    return int(value) if value.is_integer() else value
+
+
+def _normalize(message: str) -> str:
+    return " ".join(message.lower().strip().rstrip(".!").split())
+
+
+def _track(
+    tracker: str,
+    data: dict[str, Any],
+    message: str,
+) -> dict[str, Any]:
+    return {
+        "action": "track",
+        "tracker": tracker,
+        "data": data,
+        "message": message,
+        "component": "confirmation",
+    }
+
+
+def _parse_set(
+    text: str, context: dict[str, Any], current_exercise: dict[str, Any] | None
+) -> dict[str, Any] | None:
+    """Minimal input during a workout: reps, optionally with weight."""
+    if not context.get("workout_active") or not current_exercise:
+        return None
+    tracker = current_exercise.get("name")
+    if not tracker:
+        return None
+
+    if match := _REPS_ONLY.match(text):
+        weight = context.get("last_weight")
+        if weight is None:
+            return None
+    elif match := _WEIGHT_REPS.match(text):
+        weight = _number(match["weight"])
+    else:
+        return None
+
+    reps = int(match["reps"])
+    return _track(
+        tracker,
+        {"reps": reps, "weight": weight, "unit": "kg"},
+        f"Satz: {weight}kg × {reps}",
+    )
+
+
+def _parse_full_entry(text: str) -> dict[str, Any] | None:
+    """Complete entry with a known exercise name, e.g. "3x10 Bankdrücken mit 80kg"."""
+    sets_reps = _SETS_REPS.search(text)
+    if not sets_reps:
+        return None
+    weight = _WEIGHT.search(text)
+
+    rest = _SETS_REPS.sub(" ", text)
+    rest = _WEIGHT.sub(" ", rest)
+    rest = _FILLER.sub(" ", rest)
+    name = " ".join(rest.replace(",", " ").split())
+    if name not in _KNOWN_EXERCISES:
+        return None
+
+    tracker = name.title()
+    sets, reps = int(sets_reps["sets"]), int(sets_reps["reps"])
+    data: dict[str, Any] = {"sets": sets, "reps": reps}
+    message = f"Gespeichert: {tracker} {sets}×{reps}"
+    if weight:
+        data["weight"] = _number(weight["weight"])
+        data["unit"] = "kg"
+        message += f" mit {data['weight']}kg"
+
+    return _track(tracker, data, message)
+
+
+def _parse_next(text: str, context: dict[str, Any]) -> dict[str, Any] | None:
+    if not context.get("workout_active") or not _NEXT.match(text):
+        return None
+    return {
+        "action": "next_exercise",
+        "data": {},
+        "message": "",
+        "component": "confirmation",
+    }
+
+
+def parse_fast_path(
+    message: str,
+    context: dict[str, Any],
+    current_exercise: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """Resolve a message without the LLM if it matches a known pattern.
+
+    Args:
+        message: Raw user message
+        context: Current user context (workout state, last weight, ...)
+        current_exercise: Current exercise of the active workout, if any
+
+    Returns:
+        Structured response like AIService.process_message, or None if the
+        message should go to the LLM.
+    """
+    text = _normalize(message)
+    result = (
+        _parse_set(text, context, current_exercise)
+        or _parse_full_entry(text)
+        or _parse_next(text, context)
+    )
+
+    if result is None:
+        fast_path_stats.miss()
+    else:
+        fast_path_stats.hit()
+    return result
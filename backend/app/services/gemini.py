@@ -0,0 +1,356 @@
+"""Async client for the Gemini REST API.
+
+Uses one pooled httpx client per worker (keep-alive, HTTP/2 where the server
+supports it) instead of the blocking SDK in a threadpool, so a worker can
+have hundreds of LLM calls in flight. How many calls actually run at once is
+decided by the LLMScheduler in front of the client.
+
+The system instruction can be kept in Gemini's context cache
+(cachedContents) so its tokens are not prefilled again on every call; see
+SystemInstructionCache. That needs an instruction of at least the model's
+minimum cacheable size, so it is off by default.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import httpx
+
+from app.config import settings
+from app.metrics import register
+from app.services.prompt_context import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiError(Exception):
+    """The Gemini API returned an error or an unusable response."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        # Seconds from the Retry-After header of rate limited responses
+        self.retry_after = retry_after
+
+
+class PrefillStats:
+    """Prompt tokens per call and how many of them were served from the context cache."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.cache_creates = 0
+        self.cache_refreshes = 0
+
+    def record(self, usage: dict[str, Any] | None) -> None:
+        """Add the usageMetadata of one response."""
+        if not usage:
+            return
+        self.calls += 1
+        self.prompt_tokens += usage.get("promptTokenCount", 0)
+        self.cached_tokens += usage.get("cachedContentTokenCount", 0)
+
+    @property
+    def saved_ratio(self) -> float:
+        """Share of prompt tokens that did not need to be prefilled."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "saved_ratio": self.saved_ratio,
+            "cache_creates": self.cache_creates,
+            "cache_refreshes": self.cache_refreshes,
+        }
+
+
+prefill_stats = register(PrefillStats("gemini_prefill"))
+
+
+class SystemInstructionCache:
+    """Keeps a client's system instruction in Gemini's context cache.
+
+    The cached content is created on first use and its TTL is extended
+    shortly before it runs out. If the API refuses to cache it (e.g. the
+    instruction is below the model's minimum size for caching), the
+    instruction is sent inline and caching is tried again after
+    RETRY_SECONDS.
+    """
+
+    RETRY_SECONDS = 300.0
+
+    def __init__(
+        self,
+        client: "GeminiClient",
+        ttl_seconds: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._client = client
+        self._ttl = ttl_seconds
+        # Refresh when less than a tenth of the TTL is left
+        self._margin = ttl_seconds / 10
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._name: str | None = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+
+    def _fresh(self, now: float) -> bool:
+        return self._name is not None and now < self._expires_at - self._margin
+
+    async def name(self) -> str | None:
+        """Name of the cached content to reference, or None to send inline."""
+        now = self._clock()
+        if self._fresh(now):
+            return self._name
+        if self._name is None and now < self._retry_at:
+            return None
+
+        async with self._lock:
+            now = self._clock()
+            if self._fresh(now):
+                return self._name
+            # Another caller may have failed to create it while we waited
+            if self._name is None and now < self._retry_at:
+                return None
+            if self._name is not None and now < self._expires_at:
+                try:
+                    await self._client.update_cached_content(self._name, self._ttl)
+                    prefill_stats.cache_refreshes += 1
+                    self._expires_at = now + self._ttl
+                    return self._name
+                except GeminiError as e:
+                    logger.warning(f"Refreshing cached system instruction failed: {e}")
+            try:
+                self._name = await self._client.create_cached_content(self._ttl)
+                prefill_stats.cache_creates += 1
+                self._expires_at = now + self._ttl
+            except GeminiError as e:
+                logger.warning(
+                    f"Caching system instruction failed, sending it inline: {e}"
+                )
+                self._name = None
+                self._retry_at = now + self.RETRY_SECONDS
+            return self._name
+
+    def invalidate(self) -> None:
+        """Forget the cached content, e.g. after the API reported it missing."""
+        self._name = None
+        self._expires_at = 0.0
+
+
+class GeminiClient:
+    """Minimal async client for generateContent / streamGenerateContent."""
+
+    def __init__(
+        self,
+        model: str | None = None,
+        system_instruction: str | None = None,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache_system_instruction: bool | None = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            model: Model name, defaults to settings.
+            system_instruction: System prompt sent with every request.
+            api_key: API key, defaults to settings.
+            base_url: API base URL, defaults to settings (e.g. a local stub).
+            transport: Optional httpx transport for dependency injection (testing).
+            cache_system_instruction: Keep the system prompt in Gemini's
+                context cache, defaults to settings.
+        """
+        self.model = model or settings.gemini_model
+        self.system_instruction = system_instruction
+        self._api_key = api_key if api_key is not None else settings.gemini_api_key
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.gemini_base_url,
+            http2=settings.gemini_http2,
+            timeout=httpx.Timeout(
+                settings.gemini_timeout_seconds,
+                connect=settings.gemini_connect_timeout_seconds,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.gemini_max_connections,
+                max_keepalive_connections=settings.gemini_max_connections,
+            ),
+            transport=transport,
+        )
+
+        if cache_system_instruction is None:
+            cache_system_instruction = settings.gemini_context_cache_enabled
+        self.instruction_cache: SystemInstructionCache | None = None
+        if cache_system_instruction and system_instruction:
+            tokens = estimate_tokens(system_instruction)
+            if tokens >= settings.gemini_context_cache_min_tokens:
+                self.instruction_cache = SystemInstructionCache(
+                    self, settings.gemini_context_cache_ttl_seconds
+                )
+            else:
+                logger.warning(
+                    f"System instruction (~{tokens} tokens) is below the "
+                    f"{settings.gemini_context_cache_min_tokens} token minimum "
+                    "for context caching, sending it inline"
+                )
+
+    def _system_instruction(self) -> dict[str, Any]:
+        return {"parts": [{"text": self.system_instruction}]}
+
+    def _body(self, prompt: str, cached_content: str | None) -> dict[str, Any]:
+        body: dict[str, Any] = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        }
+        if cached_content:
+            body["cachedContent"] = cached_content
+        elif self.system_instruction:
+            body["systemInstruction"] = self._system_instruction()
+        return body
+
+    async def _cached_content(self) -> str | None:
+        if self.instruction_cache is None:
+            return None
+        return await self.instruction_cache.name()
+
+    def _cache_rejected(self, error: GeminiError, cached_content: str | None) -> bool:
+        """Whether a request failed because its cached content is gone."""
+        if cached_content is None or error.status_code not in (400, 403, 404):
+            return False
+        if "cache" not in str(error).lower():
+            return False
+        if self.instruction_cache is not None:
+            self.instruction_cache.invalidate()
+        return True
+
+    def _url(self, method: str) -> str:
+        return f"/v1beta/models/{self.model}:{method}"
+
+    @staticmethod
+    def _text(payload: dict[str, Any]) -> str:
+        """Concatenate the text parts of the first candidate."""
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    async def _raise_for_status(response: httpx.Response) -> None:
+        if response.status_code < 400:
+            return
+        await response.aread()
+        try:
+            message = response.json()["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            message = response.text or response.reason_phrase
+        try:
+            retry_after = float(response.headers["retry-after"])
+        except (KeyError, ValueError):
+            retry_after = None
+        raise GeminiError(
+            message, status_code=response.status_code, retry_after=retry_after
+        )
+
+    async def _request(
+        self, method: str, url: str, body: dict[str, Any]
+    ) -> dict[str, Any]:
+        try:
+            response = await self._client.request(
+                method, url, params={"key": self._api_key}, json=body
+            )
+        except httpx.HTTPError as e:
+            raise GeminiError(f"Request failed: {e}") from e
+        await self._raise_for_status(response)
+        return response.json()
+
+    async def create_cached_content(self, ttl_seconds: int) -> str:
+        """Put the system instruction into the context cache and return its name."""
+        payload = await self._request(
+            "POST",
+            "/v1beta/cachedContents",
+            {
+                "model": f"models/{self.model}",
+                "systemInstruction": self._system_instruction(),
+                "ttl": f"{ttl_seconds}s",
+            },
+        )
+        if not payload.get("name"):
+            raise GeminiError("Cached content has no name")
+        return payload["name"]
+
+    async def update_cached_content(self, name: str, ttl_seconds: int) -> None:
+        """Extend the TTL of cached content."""
+        await self._request(
+            "PATCH", f"/v1beta/{name}?updateMask=ttl", {"ttl": f"{ttl_seconds}s"}
+        )
+
+    async def generate(self, prompt: str) -> str:
+        """Generate a complete response and return its text."""
+        cached_content = await self._cached_content()
+        try:
+            payload = await self._request(
+                "POST", self._url("generateContent"), self._body(prompt, cached_content)
+            )
+        except GeminiError as e:
+            if not self._cache_rejected(e, cached_content):
+                raise
+            payload = await self._request(
+                "POST", self._url("generateContent"), self._body(prompt, None)
+            )
+        prefill_stats.record(payload.get("usageMetadata"))
+        return self._text(payload)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Generate a response, yielding its text as it arrives."""
+        cached_content = await self._cached_content()
+        try:
+            async for text in self._stream(prompt, cached_content):
+                yield text
+        except GeminiError as e:
+            # HTTP errors are raised before the first chunk, so nothing was yielded
+            if not self._cache_rejected(e, cached_content):
+                raise
+            async for text in self._stream(prompt, None):
+                yield text
+
+    async def _stream(
+        self, prompt: str, cached_content: str | None
+    ) -> AsyncIterator[str]:
+        usage = None
+        try:
+            async with self._client.stream(
+                "POST",
+                self._url("streamGenerateContent"),
+                params={"key": self._api_key, "alt": "sse"},
+                json=self._body(prompt, cached_content),
+            ) as response:
+                await self._raise_for_status(response)
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = json.loads(line[len("data:") :])
+                    usage = payload.get("usageMetadata", usage)
+                    text = self._text(payload)
+                    if text:
+                        yield text
+        except httpx.HTTPError as e:
+            raise GeminiError(f"Request failed: {e}") from e
+        prefill_stats.record(usage)
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
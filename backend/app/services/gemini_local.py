@@ -0,0 +1,156 @@
+"""In-process stand-in for the Gemini API, for offline tests and benchmarks.
+
+Pass a LocalGeminiTransport to GeminiClient(transport=...). It implements the
+parts of the API the client uses: generateContent, streamGenerateContent
+(SSE) and cachedContents with TTLs. Responses report usageMetadata like the
+real API, so prefill savings can be measured without network access.
+Token counts are estimates (about 4 characters per token).
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+
+from app.services.prompt_context import estimate_tokens
+
+DEFAULT_REPLY = '{"action": "chat", "message": "Hallo!", "component": null}'
+
+_GENERATE = re.compile(
+    r"^/v1beta/models/[^/:]+:(generateContent|streamGenerateContent)$"
+)
+_CACHED = re.compile(r"^/v1beta/(cachedContents/[^/]+)$")
+
+
+def _parse_ttl(ttl: str) -> float:
+    return float(ttl.rstrip("s"))
+
+
+class LocalGeminiTransport(httpx.AsyncBaseTransport):
+    """Answers Gemini API requests from memory."""
+
+    def __init__(
+        self,
+        reply: Callable[[str], str] = lambda prompt: DEFAULT_REPLY,
+        min_cache_tokens: int = 0,
+        prefill_seconds_per_token: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the stand-in.
+
+        Args:
+            reply: Model output for a prompt.
+            min_cache_tokens: Smallest content that may be cached (the real
+                API rejects smaller content).
+            prefill_seconds_per_token: Simulated latency per uncached prompt token.
+            clock: Time source for cache expiry.
+        """
+        self.reply = reply
+        self.min_cache_tokens = min_cache_tokens
+        self.prefill_seconds_per_token = prefill_seconds_per_token
+        self.clock = clock
+        # name -> (tokens, expires_at)
+        self.cached: dict[str, tuple[int, float]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self._next_id = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        path = request.url.path
+        self.requests.append((request.method, path))
+        body = json.loads(request.content or b"{}")
+
+        if path == "/v1beta/cachedContents" and request.method == "POST":
+            return self._create_cache(body)
+        if (match := _CACHED.match(path)) and request.method == "PATCH":
+            return self._update_cache(match[1], body)
+        if match := _GENERATE.match(path):
+            return await self._generate(
+                body, stream=match[1] == "streamGenerateContent"
+            )
+        return self._error(404, f"Unknown method {request.method} {path}")
+
+    @staticmethod
+    def _error(status: int, message: str) -> httpx.Response:
+        return httpx.Response(
+            status, json={"error": {"code": status, "message": message}}
+        )
+
+    @staticmethod
+    def _text(content: dict[str, Any] | None) -> str:
+        return "".join(
+            part.get("text", "") for part in (content or {}).get("parts", [])
+        )
+
+    def _live(self, name: str) -> bool:
+        entry = self.cached.get(name)
+        if entry is None or entry[1] <= self.clock():
+            self.cached.pop(name, None)
+            return False
+        return True
+
+    def _create_cache(self, body: dict[str, Any]) -> httpx.Response:
+        tokens = estimate_tokens(self._text(body.get("systemInstruction")))
+        if tokens < self.min_cache_tokens:
+            return self._error(
+                400,
+                f"Cached content is too small. total_token_count={tokens}, "
+                f"min_total_token_count={self.min_cache_tokens}",
+            )
+        self._next_id += 1
+        name = f"cachedContents/local-{self._next_id}"
+        self.cached[name] = (
+            tokens,
+            self.clock() + _parse_ttl(body.get("ttl", "3600s")),
+        )
+        return httpx.Response(
+            200, json={"name": name, "usageMetadata": {"totalTokenCount": tokens}}
+        )
+
+    def _update_cache(self, name: str, body: dict[str, Any]) -> httpx.Response:
+        if not self._live(name):
+            return self._error(404, f"CachedContent not found: {name}")
+        tokens, _ = self.cached[name]
+        self.cached[name] = (
+            tokens,
+            self.clock() + _parse_ttl(body.get("ttl", "3600s")),
+        )
+        return httpx.Response(200, json={"name": name})
+
+    async def _generate(self, body: dict[str, Any], stream: bool) -> httpx.Response:
+        prompt = "".join(self._text(content) for content in body.get("contents", []))
+        prompt_tokens = estimate_tokens(prompt)
+
+        cached_tokens = 0
+        if name := body.get("cachedContent"):
+            if not self._live(name):
+                return self._error(
+                    403, f"CachedContent not found (or permission denied): {name}"
+                )
+            cached_tokens = self.cached[name][0]
+        else:
+            prompt_tokens += estimate_tokens(self._text(body.get("systemInstruction")))
+
+        if self.prefill_seconds_per_token:
+            await asyncio.sleep(prompt_tokens * self.prefill_seconds_per_token)
+
+        usage = {"promptTokenCount": prompt_tokens + cached_tokens}
+        if cached_tokens:
+            usage["cachedContentTokenCount"] = cached_tokens
+        payload = {
+            "candidates": [
+                {"content": {"role": "model", "parts": [{"text": self.reply(prompt)}]}}
+            ],
+            "usageMetadata": usage,
+        }
+        if not stream:
+            return httpx.Response(200, json=payload)
+        return httpx.Response(
+            200,
+            content=f"data: {json.dumps(payload)}\r\n\r\n".encode(),
+            headers={"content-type": "text/event-stream"},
+        )
@@ -0,0 +1,210 @@
+"""Admission control for LLM calls.
+
+Every Gemini call goes through LLMScheduler, which enforces
+
+- a global cap on concurrent calls per worker,
+- a per-user token bucket, so one user sending bursts of voice input
+  can't crowd out everyone else, and
+- a bounded wait queue that is served round-robin across users.
+
+When the bucket is empty or the queue is full, the call is rejected right
+away with LLMBusyError. The API turns that into 429 with a Retry-After
+header, so clients back off instead of piling up timeouts.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.config import settings
+from app.metrics import Summary, register
+
+
+class LLMBusyError(Exception):
+    """An LLM call was rejected because of rate or capacity limits."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+
+
+class LLMScheduler:
+    """Global concurrency cap, per-user token buckets and a fair wait queue."""
+
+    # Buckets are pruned once there are more than this many users tracked
+    MAX_BUCKETS = 10_000
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        queue_timeout: float | None = None,
+        user_rate: float | None = None,
+        user_burst: int | None = None,
+        name: str = "llm_scheduler",
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Calls running at once, defaults to settings.
+            max_queue: Calls waiting for a slot before new ones are rejected.
+            queue_timeout: Seconds a call may wait for a slot.
+            user_rate: Calls per second a user may sustain.
+            user_burst: Calls a user may make in a burst.
+            name: Metric name.
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency or settings.llm_max_concurrency
+        self.max_queue = max_queue if max_queue is not None else settings.llm_max_queue
+        self.queue_timeout = queue_timeout or settings.llm_queue_timeout_seconds
+        self.user_rate = user_rate or settings.llm_user_rate_per_second
+        self.user_burst = user_burst or settings.llm_user_burst
+
+        self.wait_times = Summary(f"{name}_wait_seconds")
+        self.rejected = 0
+
+        self._active = 0
+        self._queued = 0
+        # user_id -> waiters; the first user is served next, then moves to the end
+        self._waiters: OrderedDict[str, deque[asyncio.Future[None]]] = OrderedDict()
+        self._buckets: dict[str, _TokenBucket] = {}
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "active": self._active,
+            "queue_depth": self._queued,
+            "rejected": self.rejected,
+            "wait_seconds": self.wait_times.snapshot(),
+        }
+
+    @asynccontextmanager
+    async def slot(self, user_id: str | None) -> AsyncIterator[None]:
+        """Hold one of the concurrent LLM slots for the duration of the block.
+
+        Raises:
+            LLMBusyError: If the user is over their rate, the queue is full
+                or no slot became free within the queue timeout.
+        """
+        await self._acquire(user_id or "")
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _take_token(self, user_id: str, now: float) -> None:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_BUCKETS:
+                self._prune_buckets(now)
+            bucket = self._buckets[user_id] = _TokenBucket(self.user_burst, now)
+        else:
+            bucket.tokens = min(
+                self.user_burst, bucket.tokens + (now - bucket.updated) * self.user_rate
+            )
+            bucket.updated = now
+
+        if bucket.tokens < 1:
+            self.rejected += 1
+            raise LLMBusyError(
+                "Zu viele Anfragen, bitte kurz warten",
+                retry_after=(1 - bucket.tokens) / self.user_rate,
+            )
+        bucket.tokens -= 1
+
+    def _prune_buckets(self, now: float) -> None:
+        """Drop buckets that have refilled completely; they behave like new ones."""
+        full_after = self.user_burst / self.user_rate
+        self._buckets = {
+            user_id: bucket
+            for user_id, bucket in self._buckets.items()
+            if now - bucket.updated < full_after
+        }
+
+    async def _acquire(self, user_id: str) -> None:
+        started = time.monotonic()
+
+        if self._queued >= self.max_queue and self._active >= self.max_concurrency:
+            self.rejected += 1
+            raise LLMBusyError(
+                "KI ist gerade ausgelastet, bitte gleich nochmal versuchen",
+                retry_after=max(1.0, self.wait_times.mean),
+            )
+        self._take_token(user_id, started)
+
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            self.wait_times.observe(0.0)
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append(future)
+        self._queued += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                self._remove_waiter(user_id, future)
+            if isinstance(e, TimeoutError):
+                self.rejected += 1
+                raise LLMBusyError(
+                    "KI ist gerade ausgelastet, bitte gleich nochmal versuchen",
+                    retry_after=self.queue_timeout,
+                ) from None
+            raise
+
+        self.wait_times.observe(time.monotonic() - started)
+
+    def _remove_waiter(self, user_id: str, future: asyncio.Future[None]) -> None:
+        waiters = self._waiters.get(user_id)
+        if waiters is None or future not in waiters:
+            return
+        waiters.remove(future)
+        self._queued -= 1
+        if not waiters:
+            del self._waiters[user_id]
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiting user, or free it."""
+        while self._waiters:
+            user_id, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            self._queued -= 1
+            if waiters:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+
+llm_scheduler = register(LLMScheduler())
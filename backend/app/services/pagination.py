@@ -0,0 +1,64 @@
+"""Keyset pagination over entries, newest first.
+
+Pages are delimited by the (timestamp, id) of the last entry returned, so
+every page is a range scan on the composite timestamp indexes and costs the
+same however far back the client has scrolled (unlike OFFSET).
+"""
+
+import base64
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.entry import Entry
+
+
+def encode_cursor(entry: Entry) -> str:
+    """Opaque cursor pointing just past the given entry."""
+    raw = f"{entry.timestamp.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Parse a cursor from encode_cursor. Raises ValueError if it is invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, entry_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), uuid.UUID(entry_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def fetch_entry_page(
+    db: AsyncSession,
+    query: Select,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[Entry], str | None]:
+    """Run an entry query one page at a time, newest first.
+
+    Args:
+        db: Database session
+        query: select(Entry) with the filters applied but no ordering
+        limit: Page size
+        cursor: next_cursor of the previous page, None for the first page
+
+    Returns:
+        The entries of the page and the cursor of the next page (None on
+        the last page).
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    if cursor:
+        query = query.where(tuple_(Entry.timestamp, Entry.id) < decode_cursor(cursor))
+    # One extra row tells whether there is a next page
+    query = query.order_by(Entry.timestamp.desc(), Entry.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    entries = list(result.scalars().all())
+    if len(entries) <= limit:
+        return entries, None
+    return entries[:limit], encode_cursor(entries[limit - 1])
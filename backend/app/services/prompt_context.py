@@ -0,0 +1,213 @@
+"""Compact serialization of the user context for the LLM prompt.
+
+Sending the whole context with every message makes prompts grow over a
+workout: the planned and completed exercise lists and the active routine's
+config are repeated each time. Instead, only the fields relevant to the
+likely intent of the message are sent, with short keys (explained once in
+the system prompt, see CONTEXT_KEY_LEGEND), and within a token budget.
+
+Workout progress is encoded relative to the plan: completed exercises are
+the planned ones before the current index, so they are sent as a short
+list of names instead of a second copy of the plan.
+"""
+
+import json
+import math
+import re
+from datetime import datetime
+from typing import Any
+
+from app.config import settings
+
+# Appended to the system prompt so the model can read the short keys
+CONTEXT_KEY_LEGEND = """## Kontext
+Der Kontext kommt als kompaktes JSON mit diesen Schlüsseln:
+d=heutiges Datum, w=1 wenn ein Workout läuft, r=Routine des Workouts,
+min=Minuten seit Workoutbeginn, ex=aktuelle Übung, s=aktueller Satz,
+lw=letztes Gewicht in kg, done=erledigte Übungen, next=nächste Übungen
+("+n" = n weitere), ar=aktive Routine (n=Name, c=Konfiguration),
+x=weitere Angaben der App.
+"""
+
+# Fields that are either encoded above or not useful to the model
+_ENCODED_FIELDS = {
+    "today",
+    "workout_active",
+    "workout_started",
+    "current_routine",
+    "planned_exercises",
+    "current_exercise_index",
+    "current_set",
+    "last_weight",
+    "completed_exercises",
+    "last_updated",
+    "active_routine",
+}
+
+_ROUTINE_INTENT = re.compile(
+    r"routine|plan|trainier|immer|jeden|täglich|wöchentlich|statt|lösch|änder"
+    r"|montag|dienstag|mittwoch|donnerstag|freitag|samstag|sonntag"
+    r"|morgens|abends",
+    re.IGNORECASE,
+)
+
+# Names of upcoming/completed exercises listed before summarizing as "+n"
+_MAX_LISTED = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for Gemini)."""
+    return math.ceil(len(text) / 4)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _exercise(item: Any) -> str:
+    """One exercise as "Bankdrücken 4×10 80kg"."""
+    if not isinstance(item, dict):
+        return str(item)
+    text = str(item.get("name", "?"))
+    if item.get("sets") and item.get("reps"):
+        text += f" {item['sets']}×{item['reps']}"
+    elif item.get("reps"):
+        text += f" ×{item['reps']}"
+    if item.get("weight") is not None:
+        text += f" {item['weight']}{item.get('unit', 'kg')}"
+    return text
+
+
+def _names(items: list[Any], limit: int) -> list[str]:
+    """Exercise names, the rest summarized as "+n"."""
+    names = [
+        str(item.get("name", "?")) if isinstance(item, dict) else str(item)
+        for item in items[:limit]
+    ]
+    if len(items) > limit:
+        names.append(f"+{len(items) - limit}")
+    return names
+
+
+def _strip_empty(value: Any) -> Any:
+    """Drop None, empty strings and empty containers from nested config."""
+    if isinstance(value, dict):
+        stripped = {k: _strip_empty(v) for k, v in value.items()}
+        return {k: v for k, v in stripped.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [_strip_empty(v) for v in value if v not in (None, "", [], {})]
+    return value
+
+
+def _minutes_since(started: Any) -> int | None:
+    try:
+        return int(
+            (datetime.utcnow() - datetime.fromisoformat(started)).total_seconds() // 60
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _workout_entries(context: dict[str, Any]) -> list[tuple[str, list[Any]]]:
+    planned = context.get("planned_exercises") or []
+    index = context.get("current_exercise_index") or 0
+    done = planned[:index] if planned else context.get("completed_exercises") or []
+    upcoming = planned[index + 1 :]
+
+    entries: list[tuple[str, list[Any]]] = [("w", [1])]
+    if index < len(planned):
+        current = planned[index]
+        entries.append(("ex", [_exercise(current), _names([current], 1)[0]]))
+    entries.append(("s", [context.get("current_set")]))
+    entries.append(("lw", [context.get("last_weight")]))
+    entries.append(("r", [context.get("current_routine")]))
+    if upcoming:
+        entries.append(
+            (
+                "next",
+                [
+                    [_exercise(upcoming[0]), *_names(upcoming[1:], _MAX_LISTED - 1)],
+                    _names(upcoming, 1),
+                ],
+            )
+        )
+    if done:
+        entries.append(("done", [_names(done, _MAX_LISTED), [f"+{len(done)}"]]))
+    entries.append(("min", [_minutes_since(context.get("workout_started"))]))
+    return entries
+
+
+def _routine_entry(routine: Any, detailed: bool) -> tuple[str, list[Any]]:
+    if not isinstance(routine, dict):
+        return "ar", [routine]
+    name_only = {"n": routine.get("name")}
+    if not detailed:
+        return "ar", [name_only]
+    config = _strip_empty(routine.get("config") or {})
+    # The name is already sent once
+    if isinstance(config, dict) and config.get("name") == routine.get("name"):
+        config.pop("name")
+    return "ar", [{**name_only, "c": config}, name_only]
+
+
+def build_prompt_context(
+    message: str,
+    context: dict[str, Any] | None,
+    budget_tokens: int | None = None,
+) -> dict[str, Any]:
+    """Select and compact the context fields relevant to a message.
+
+    Fields are added in order of relevance. Each field has variants from most
+    to least detailed; the most detailed one that still fits the budget is
+    used, and fields that don't fit at all are left out.
+
+    Args:
+        message: The user's message, used to guess its intent.
+        context: Full user context (as built by the chat router).
+        budget_tokens: Maximum estimated tokens, defaults to settings.
+
+    Returns:
+        Compact context with short keys (see CONTEXT_KEY_LEGEND).
+    """
+    if not context:
+        return {}
+    if budget_tokens is None:
+        budget_tokens = settings.prompt_context_token_budget
+
+    routine_intent = bool(_ROUTINE_INTENT.search(message))
+    entries: list[tuple[str, list[Any]]] = [("d", [context.get("today")])]
+    if routine_intent:
+        entries.append(_routine_entry(context.get("active_routine"), detailed=True))
+    if context.get("workout_active"):
+        entries.extend(_workout_entries(context))
+    if not routine_intent:
+        entries.append(_routine_entry(context.get("active_routine"), detailed=False))
+
+    extra = {
+        key: value
+        for key, value in context.items()
+        if key not in _ENCODED_FIELDS and value not in (None, "", [], {})
+    }
+    if extra:
+        entries.append(("x", [extra]))
+
+    compact: dict[str, Any] = {}
+    for key, variants in entries:
+        for value in variants:
+            if value in (None, "", [], {}, {"n": None}):
+                break
+            candidate = {**compact, key: value}
+            if estimate_tokens(_dumps(candidate)) <= budget_tokens:
+                compact = candidate
+                break
+    return compact
+
+
+def serialize_prompt_context(
+    message: str,
+    context: dict[str, Any] | None,
+    budget_tokens: int | None = None,
+) -> str:
+    """Compact context for a message as a JSON string ("" if there is none)."""
+    compact = build_prompt_context(message, context, budget_tokens)
+    return _dumps(compact) if compact else ""
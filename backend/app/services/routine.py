@@ -5,6 +5,7 @@ from uuid import UUID
 
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from app.models.routine import Routine
 
@@ -146,6 +147,7 @@ async def get_user_routines(
     db: AsyncSession,
     user_id: str,
     active_only: bool = False,
+    summary: bool = False,
 ) -> list[Routine]:
     """Get all routines for a user.
     
@@ -153,14 +155,18 @@ async def get_user_routines(
         db: Database session
         user_id: User ID
         active_only: If True, only return active routines
+        summary: If True, the config JSON is not loaded; accessing it raises
     
     Returns:
         List of Routine objects
     """
     query = select(Routine).where(Routine.user_id == user_id)
 
+    if summary:
+        query = query.options(defer(Routine.config, raiseload=True))
+
     if active_only:
-        query = query.where(Routine.is_active == True)
+        query = query.where(Routine.is_active.is_(True))
 
     query = query.order_by(Routine.created_at.desc())
 
@@ -251,11 +257,21 @@ async def activate_routine(
     if not routine:
         return None
 
+    # Serialize activations per user: a concurrent one would otherwise also
+    # see no other active routine and violate ix_routines_user_id_active
+    await db.execute(
+        select(Routine.id)
+        .where(Routine.user_id == routine.user_id)
+        .order_by(Routine.id)
+        .with_for_update()
+    )
+
     # Deactivate all other routines for this user
     await db.execute(
         update(Routine)
         .where(Routine.user_id == routine.user_id)
         .where(Routine.id != routine_id)
+        .where(Routine.is_active.is_(True))
         .values(is_active=False)
     )
 
@@ -310,6 +326,6 @@ async def get_active_routine(
     result = await db.execute(
         select(Routine)
         .where(Routine.user_id == user_id)
-        .where(Routine.is_active == True)
+        .where(Routine.is_active.is_(True))
     )
     return result.scalar_one_or_none()
@@ -0,0 +1,356 @@
+"""Daily per-tracker rollups of entries (tracker_daily_stats).
+
+The rollup rows are kept up to date by the entry service: every write
+recomputes the affected tracker-days, in the same transaction, from that
+day's entries only (an index range scan). Charts and range questions like
+"Wieviel kg im März bewegt?" then read one row per day instead of every
+entry. Run scripts/backfill_daily_stats.py after deploying the table.
+"""
+
+import hashlib
+import json
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    Float,
+    and_,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import JSONData
+from app.models.entry import Entry
+from app.models.stats import TrackerDailyStats
+from app.models.tracker import Tracker
+
+# (tracker_id, day) of a rollup row
+DayKey = tuple[uuid.UUID, date]
+
+
+def numeric_field(dialect: str, field: str) -> ColumnElement[float]:
+    """A field of Entry.data as a number, NULL where it holds something else."""
+    value = Entry.data[field]
+    if dialect == "postgresql":
+        # Casting "80kg" or {} to a number would fail the whole query
+        is_number = func.jsonb_typeof(value) == "number"
+    else:
+        # SQLite compares text greater than any number instead
+        path = f"$.{json.dumps(field)}"
+        is_number = func.json_type(Entry.data, path).in_(("integer", "real"))
+    return case((is_number, value.as_float()))
+
+
+def entry_volume(dialect: str) -> ColumnElement[float]:
+    """sets × reps × weight of an entry, sets defaulting to 1."""
+    sets = func.coalesce(numeric_field(dialect, "sets"), 1)
+    return sets * numeric_field(dialect, "reps") * numeric_field(dialect, "weight")
+
+
+def _day(dialect: str) -> ColumnElement[date]:
+    if dialect == "postgresql":
+        return cast(Entry.timestamp, Date)
+    return type_coerce(func.date(Entry.timestamp), Date)
+
+
+def _rollup(dialect: str, conditions: list[ColumnElement[bool]]):
+    """SELECT of the rollup rows for the entries matching conditions."""
+    day = _day(dialect).label("day")
+    totals = (
+        select(
+            Entry.tracker_id,
+            Entry.user_id,
+            day,
+            func.count().label("entry_count"),
+            func.sum(entry_volume(dialect)).label("volume"),
+            func.max(numeric_field(dialect, "weight")).label("max_weight"),
+        )
+        .where(*conditions)
+        .group_by(Entry.tracker_id, Entry.user_id, day)
+        .subquery("totals")
+    )
+
+    # One row per (tracker, day, numeric field), folded into a JSON object
+    if dialect == "postgresql":
+        pair = func.jsonb_each(Entry.data).table_valued("key", "value").alias("kv")
+        is_number = func.jsonb_typeof(pair.c.value) == "number"
+        number = case((is_number, cast(pair.c.value, Float)))
+        build_object, object_agg = func.jsonb_build_object, func.jsonb_object_agg
+    else:
+        pair = (
+            func.json_each(Entry.data).table_valued("key", "value", "type").alias("kv")
+        )
+        is_number = pair.c.type.in_(("integer", "real"))
+        number = case((is_number, pair.c.value))
+        build_object, object_agg = func.json_object, func.json_group_object
+    per_field = (
+        select(
+            Entry.tracker_id,
+            day,
+            pair.c.key,
+            func.min(number).label("min"),
+            func.max(number).label("max"),
+            func.sum(number).label("sum"),
+        )
+        .select_from(Entry)
+        .join(pair, true())
+        .where(*conditions, is_number)
+        .group_by(Entry.tracker_id, day, pair.c.key)
+        .subquery("per_field")
+    )
+    fields = (
+        select(
+            per_field.c.tracker_id,
+            per_field.c.day,
+            object_agg(
+                per_field.c.key,
+                build_object(
+                    "min",
+                    per_field.c.min,
+                    "max",
+                    per_field.c.max,
+                    "sum",
+                    per_field.c.sum,
+                ),
+            ).label("fields"),
+        )
+        .group_by(per_field.c.tracker_id, per_field.c.day)
+        .subquery("fields")
+    )
+
+    return (
+        select(
+            totals.c.tracker_id,
+            totals.c.day,
+            totals.c.user_id,
+            totals.c.entry_count,
+            totals.c.volume,
+            totals.c.max_weight,
+            type_coerce(
+                func.coalesce(fields.c.fields, type_coerce({}, JSONData)), JSONData
+            ).label("fields"),
+            literal(datetime.utcnow(), DateTime()).label("updated_at"),
+        )
+        .select_from(
+            totals.outerjoin(
+                fields,
+                and_(
+                    fields.c.tracker_id == totals.c.tracker_id,
+                    fields.c.day == totals.c.day,
+                ),
+            )
+        )
+        # SQLite needs a WHERE to tell ON CONFLICT from a join constraint
+        .where(true())
+    )
+
+
+def _upsert(dialect: str, conditions: list[ColumnElement[bool]]):
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(TrackerDailyStats).from_select(
+        [
+            "tracker_id",
+            "day",
+            "user_id",
+            "entry_count",
+            "volume",
+            "max_weight",
+            "fields",
+            "updated_at",
+        ],
+        _rollup(dialect, conditions),
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["tracker_id", "day"],
+        set_={
+            column: statement.excluded[column]
+            for column in (
+                "entry_count",
+                "volume",
+                "max_weight",
+                "fields",
+                "updated_at",
+            )
+        },
+    )
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+# Locks are taken in key order so two writers can't deadlock
+_LOCK_DAYS = text(
+    "SELECT pg_advisory_xact_lock(key) "
+    "FROM (SELECT unnest(CAST(:keys AS bigint[])) AS key ORDER BY key) AS ordered"
+)
+
+
+def _lock_key(tracker_id: uuid.UUID, day: date) -> int:
+    """Advisory lock key of a tracker-day, a signed 64-bit integer."""
+    digest = hashlib.blake2b(f"{tracker_id}:{day}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+async def refresh_daily_stats(
+    db: AsyncSession, keys: Iterable[DayKey], entries_removed: bool = False
+) -> None:
+    """Recompute the rollup rows of the given tracker-days.
+
+    Call after inserting, updating or deleting entries and before the
+    commit, with the (tracker_id, day) of every entry touched (old and new
+    day for moved entries). With entries_removed, days left without entries
+    lose their row; inserts can skip that extra statement.
+
+    On PostgreSQL the tracker-days are locked (transaction-level advisory
+    locks) before they are recomputed, so a concurrent writer's entries are
+    committed and visible before its totals can be overwritten.
+    """
+    days_by_tracker: dict[uuid.UUID, set[date]] = defaultdict(set)
+    for tracker_id, day in keys:
+        days_by_tracker[tracker_id].add(day)
+    if not days_by_tracker:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        lock_keys = {
+            _lock_key(tracker_id, day)
+            for tracker_id, days in days_by_tracker.items()
+            for day in days
+        }
+        await db.execute(_LOCK_DAYS, {"keys": sorted(lock_keys)})
+
+    # One timestamp range per tracker keeps this an index range scan on
+    # ix_entries_tracker_id_timestamp; only the locked days are written
+    ranges = [
+        and_(
+            Entry.tracker_id == tracker_id,
+            Entry.timestamp >= _day_start(min(days)),
+            Entry.timestamp < _day_start(max(days) + timedelta(days=1)),
+            _day(dialect).in_(days),
+        )
+        for tracker_id, days in days_by_tracker.items()
+    ]
+    await db.execute(_upsert(dialect, [or_(*ranges)]))
+    if not entries_removed:
+        return
+
+    keys = [
+        (tracker_id, day)
+        for tracker_id, days in days_by_tracker.items()
+        for day in days
+    ]
+    has_entries = exists().where(
+        Entry.tracker_id == TrackerDailyStats.tracker_id,
+        _day(dialect) == TrackerDailyStats.day,
+    )
+    await db.execute(
+        delete(TrackerDailyStats).where(
+            tuple_(TrackerDailyStats.tracker_id, TrackerDailyStats.day).in_(keys),
+            ~has_entries,
+        )
+    )
+
+
+async def backfill_daily_stats(db: AsyncSession, user_id: str) -> int:
+    """Rebuild all rollup rows of a user from their entries and commit.
+
+    Returns:
+        Number of rollup rows written.
+    """
+    await db.execute(
+        delete(TrackerDailyStats).where(TrackerDailyStats.user_id == user_id)
+    )
+    result = await db.execute(
+        _upsert(db.get_bind().dialect.name, [Entry.user_id == user_id])
+    )
+    await db.commit()
+    assert isinstance(result, CursorResult)
+    return result.rowcount
+
+
+async def get_daily_stats(
+    db: AsyncSession,
+    user_id: str,
+    tracker_id: uuid.UUID,
+    since: date,
+    until: date,
+) -> list[TrackerDailyStats]:
+    """Rollup rows of a tracker for since <= day < until, oldest first."""
+    result = await db.execute(
+        select(TrackerDailyStats)
+        .where(
+            TrackerDailyStats.tracker_id == tracker_id,
+            TrackerDailyStats.user_id == user_id,
+            TrackerDailyStats.day >= since,
+            TrackerDailyStats.day < until,
+        )
+        .order_by(TrackerDailyStats.day)
+    )
+    return list(result.scalars().all())
+
+
+async def summarize_daily_stats(
+    db: AsyncSession,
+    user_id: str,
+    tracker_name: str,
+    since: date,
+    until: date,
+) -> dict[str, Any]:
+    """Totals of a tracker over a date range from the rollups.
+
+    Answers questions like "Wieviel kg im März bewegt?" from one row per
+    day instead of every entry.
+
+    Returns:
+        count, volume and max_weight for since <= day < until.
+    """
+    # Imported here, the entry service imports this module
+    from app.services.entry import normalize_tracker_name
+
+    normalized_name = normalize_tracker_name(tracker_name)
+    tracker_id = (
+        select(Tracker.id)
+        .where(Tracker.user_id == user_id, Tracker.name == normalized_name)
+        .scalar_subquery()
+    )
+    row = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(TrackerDailyStats.entry_count), 0).label(
+                    "entry_count"
+                ),
+                func.sum(TrackerDailyStats.volume).label("volume"),
+                func.max(TrackerDailyStats.max_weight).label("max_weight"),
+            ).where(
+                TrackerDailyStats.tracker_id == tracker_id,
+                TrackerDailyStats.day >= since,
+                TrackerDailyStats.day < until,
+            )
+        )
+    ).one()
+    return {
+        "count": row.entry_count,
+        "volume": row.volume,
+        "max_weight": row.max_weight,
+    }
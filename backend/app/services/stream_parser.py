@@ -0,0 +1,127 @@
+"""Incremental parser for JSON objects streamed token by token from the LLM."""
+
+import json
+
+# Event kinds returned by IncrementalJSONParser.feed()
+FIELD = "field"  # a top-level string field is complete: (FIELD, key, value)
+DELTA = "delta"  # more text of a streamed field arrived: (DELTA, key, text)
+
+Event = tuple[str, str, str]
+
+
+class IncrementalJSONParser:
+    """Scans a partially received JSON object for its top-level string fields.
+
+    The model answers with a single JSON object, possibly wrapped in a code
+    fence. Fields such as "action" are reported as soon as their value is
+    complete, long before the whole document has arrived, and the text of
+    streamed fields (e.g. "message") is reported as it comes in.
+
+    Nested values are skipped; use the full text once the stream is done to
+    get them.
+    """
+
+    def __init__(self, stream_fields: tuple[str, ...] = ("message",)):
+        self.fields: dict[str, str] = {}
+        self._stream_fields = stream_fields
+
+        self._depth = 0
+        self._expect = "key"  # at depth 1: "key", "colon", "value" or "next"
+        self._key: str | None = None
+
+        self._in_string = False
+        self._string_role: str | None = None  # "key", "value" or None (nested)
+        self._chars: list[str] = []
+        self._escape = ""
+
+    def feed(self, chunk: str) -> list[Event]:
+        """Consume the next chunk of model output and return new events."""
+        events: list[Event] = []
+        delta: list[str] = []
+
+        for char in chunk:
+            if self._in_string:
+                self._feed_string_char(char, delta, events)
+            else:
+                self._feed_structural_char(char)
+
+        if delta and self._key is not None:
+            events.append((DELTA, self._key, "".join(delta)))
+        return events
+
+    def _streaming(self) -> bool:
+        return self._string_role == "value" and self._key in self._stream_fields
+
+    def _feed_string_char(
+        self, char: str, delta: list[str], events: list[Event]
+    ) -> None:
+        if self._escape:
+            self._escape += char
+            # \uXXXX needs four hex digits, every other escape is one char
+            if self._escape.startswith("\\u") and len(self._escape) < 6:
+                return
+            try:
+                decoded = json.loads(f'"{self._escape}"')
+            except json.JSONDecodeError:
+                decoded = self._escape
+            self._escape = ""
+            self._append(decoded, delta)
+        elif char == "\\":
+            self._escape = char
+        elif char == '"':
+            self._end_string(delta, events)
+        else:
+            self._append(char, delta)
+
+    def _append(self, text: str, delta: list[str]) -> None:
+        if self._string_role is None:
+            return
+        self._chars.append(text)
+        if self._streaming():
+            delta.append(text)
+
+    def _end_string(self, delta: list[str], events: list[Event]) -> None:
+        value = "".join(self._chars)
+        if self._string_role == "key":
+            self._key = value
+            self._expect = "colon"
+        elif self._string_role == "value" and self._key is not None:
+            if delta:
+                events.append((DELTA, self._key, "".join(delta)))
+                delta.clear()
+            self.fields[self._key] = value
+            events.append((FIELD, self._key, value))
+            self._expect = "next"
+
+        self._in_string = False
+        self._string_role = None
+        self._chars = []
+
+    def _feed_structural_char(self, char: str) -> None:
+        top_level = self._depth == 1
+
+        if char == '"':
+            if self._depth == 0:
+                return
+            self._in_string = True
+            if top_level and self._expect == "key":
+                self._string_role = "key"
+            elif top_level and self._expect == "value":
+                self._string_role = "value"
+        elif char in "{[":
+            if self._depth == 0 and char == "[":
+                return
+            if top_level and self._expect == "value":
+                self._expect = "next"
+            self._depth += 1
+        elif char in "}]":
+            if self._depth > 0:
+                self._depth -= 1
+        elif top_level:
+            if char == ":":
+                self._expect = "value"
+            elif char == ",":
+                self._expect = "key"
+            elif self._expect == "value" and not char.isspace():
+                # number, true, false or null
+                self._expect = "next"
@@ -1,10 +1,136 @@
 """User service for syncing Clerk users to database."""
 
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import redis.asyncio as redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.metrics import HitRatio, register
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
+user_cache_stats = register(HitRatio("user_cache"))
+
+
+class KnownUserCache:
+    """Users known to exist in the database, with their email and name.
+
+    Kept per worker as a TTL + LRU map and optionally shared through Redis,
+    so a user seen by one worker is known to all. A lookup only hits if the
+    Clerk claims of the request match what was stored; changed claims go to
+    the database, which updates the row.
+    """
+
+    KEY_PREFIX = "known-user:"
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        redis_client: redis.Redis | None = None,  # type: ignore[type-arg]
+    ):
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._redis = redis_client
+        # user_id -> (expires_at, email, name)
+        self._entries: OrderedDict[str, tuple[float, str, str | None]] = OrderedDict()
+
+    @staticmethod
+    def _matches(
+        known: tuple[str, str | None], email: str | None, name: str | None
+    ) -> bool:
+        # Same rule as get_or_create_user: only given claims are compared
+        return (not email or known[0] == email) and (not name or known[1] == name)
+
+    def _remember(self, user_id: str, email: str, name: str | None) -> None:
+        if self._max_size <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self._ttl, email, name)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def _get_shared(self, user_id: str) -> tuple[str, str | None] | None:
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(self.KEY_PREFIX + user_id)
+        except redis.RedisError as e:
+            logger.warning(f"Known user lookup failed: {e}")
+            return None
+        if raw is None:
+            return None
+        email, name = json.loads(raw)
+        return email, name
+
+    async def contains(
+        self, user_id: str, email: str | None = None, name: str | None = None
+    ) -> bool:
+        """Whether the user exists with these claims, without a DB query."""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[user_id]
+            entry = None
+
+        if entry is not None:
+            self._entries.move_to_end(user_id)
+            known = entry[1], entry[2]
+        else:
+            known = await self._get_shared(user_id)
+            if known is not None:
+                self._remember(user_id, *known)
+
+        if known is not None and self._matches(known, email, name):
+            user_cache_stats.hit()
+            return True
+        user_cache_stats.miss()
+        return False
+
+    async def add(self, user_id: str, email: str, name: str | None) -> None:
+        """Record the user as it is stored in the database."""
+        self._remember(user_id, email, name)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                self.KEY_PREFIX + user_id,
+                json.dumps([email, name]),
+                ex=max(1, int(self._ttl)),
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Known user write failed: {e}")
+
+    async def invalidate(self, user_id: str) -> None:
+        """Forget a user, e.g. after the row was changed or deleted."""
+        self._entries.pop(user_id, None)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.delete(self.KEY_PREFIX + user_id)
+        except redis.RedisError as e:
+            logger.warning(f"Known user invalidation failed: {e}")
+
+    def clear(self) -> None:
+        """Forget all users known to this worker."""
+        self._entries.clear()
+
+
+known_users = KnownUserCache(
+    max_size=settings.user_cache_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    redis_client=(
+        redis.from_url(settings.redis_url, decode_responses=True)
+        if settings.user_cache_redis_enabled
+        else None
+    ),
+)
+
 
 async def get_or_create_user(
     db: AsyncSession,
@@ -30,6 +156,7 @@ async def get_or_create_user(
         if updated:
             await db.commit()
             await db.refresh(user)
+        await known_users.add(user.id, user.email, user.name)
         return user
 
     # Create new user
@@ -44,4 +171,21 @@ async def get_or_create_user(
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    await known_users.add(new_user.id, new_user.email, new_user.name)
     return new_user
+
+
+async def ensure_user(
+    db: AsyncSession,
+    user_id: str,
+    email: str | None = None,
+    name: str | None = None,
+) -> None:
+    """Make sure the user exists and is up to date.
+
+    Skips the database entirely for users already known with the same
+    claims; use get_or_create_user when the User row itself is needed.
+    """
+    if await known_users.contains(user_id, email, name):
+        return
+    await get_or_create_user(db, user_id, email, name)
@@ -0,0 +1,87 @@
+"""Count Redis round trips and latency per ContextEngine operation.
+
+Usage:
+    python -m benchmarks.context_round_trips                 # fakeredis only
+    python -m benchmarks.context_round_trips --redis-url redis://localhost:6379/15
+
+A local redis-server is only used when --redis-url is given. The database
+behind that URL is flushed, so point it at a scratch DB.
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import fakeredis.aioredis
+import redis.asyncio as redis
+
+from app.services.context import ContextEngine
+
+USER_ID = "bench-user"
+ITERATIONS = 200
+
+Operation = Callable[[ContextEngine], Awaitable[Any]]
+
+OPERATIONS: dict[str, Operation] = {
+    "get_context": lambda e: e.get_context(USER_ID),
+    "update_context": lambda e: e.update_context(USER_ID, {"current_routine": "Push"}),
+    "start_workout": lambda e: e.start_workout(
+        USER_ID, "Push", [{"name": "Bankdrücken"}] * 50
+    ),
+    "record_set": lambda e: e.record_set(USER_ID, weight=80, reps=10),
+    "get_current_exercise": lambda e: e.get_current_exercise(USER_ID),
+    "next_exercise": lambda e: e.next_exercise(USER_ID),
+    "end_workout": lambda e: e.end_workout(USER_ID),
+}
+
+
+def _count_commands(client: Any) -> list[str]:
+    """Patch a client so every command it sends is recorded."""
+    commands: list[str] = []
+    original = client.execute_command
+
+    async def execute_command(*args: Any, **kwargs: Any) -> Any:
+        commands.append(args[0])
+        return await original(*args, **kwargs)
+
+    client.execute_command = execute_command
+    return commands
+
+
+async def run(label: str, client: Any) -> None:
+    await client.flushdb()
+    commands = _count_commands(client)
+    engine = ContextEngine(redis_client=client)
+
+    print(f"\n{label}")
+    print(f"{'operation':<22}{'round trips':>12}{'µs/op':>10}")
+    for name, operation in OPERATIONS.items():
+        await engine.start_workout(USER_ID, "Push", [{"name": "Bankdrücken"}] * 50)
+        await operation(engine)  # warm up script cache
+        commands.clear()
+
+        await operation(engine)
+        round_trips = len(commands)
+
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            await operation(engine)
+        elapsed = (time.perf_counter() - started) / ITERATIONS
+
+        print(f"{name:<22}{round_trips:>12}{elapsed * 1e6:>10.0f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--redis-url", help="Also benchmark against this Redis")
+    args = parser.parse_args()
+
+    await run("fakeredis", fakeredis.aioredis.FakeRedis(decode_responses=True))
+    if args.redis_url:
+        await run(args.redis_url, redis.from_url(args.redis_url, decode_responses=True))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""Hit rate, accuracy and latency of the fast path on a labelled corpus.
+
+Usage:
+    python -m benchmarks.fast_path_corpus
+
+Each corpus item is (message, in_workout, expected) where expected is the
+(action, tracker, data) the fast path should produce, or None if the
+message must go to the LLM.
+"""
+
+import time
+from typing import Any
+
+from app.services.fast_path import parse_fast_path
+
+WORKOUT = {"workout_active": True, "last_weight": 80}
+NO_WORKOUT = {"workout_active": False, "last_weight": None}
+CURRENT = {"name": "Bankdrücken", "sets": 3, "reps": 10}
+
+SET_80 = {"reps": 12, "weight": 80, "unit": "kg"}
+SET_95 = {"reps": 12, "weight": 95, "unit": "kg"}
+FULL = {"sets": 3, "reps": 10, "weight": 80, "unit": "kg"}
+
+CORPUS: list[tuple[str, bool, tuple[str, str | None, dict[str, Any]] | None]] = [
+    # Minimal input during a workout
+    ("12", True, ("track", "Bankdrücken", SET_80)),
+    ("12 Wdh", True, ("track", "Bankdrücken", SET_80)),
+    ("12 reps", True, ("track", "Bankdrücken", SET_80)),
+    ("95, 12", True, ("track", "Bankdrücken", SET_95)),
+    ("95 12", True, ("track", "Bankdrücken", SET_95)),
+    ("95kg 12", True, ("track", "Bankdrücken", SET_95)),
+    ("95 kg x 12", True, ("track", "Bankdrücken", SET_95)),
+    ("95kg, 12 Wdh.", True, ("track", "Bankdrücken", SET_95)),
+    (
+        "82,5 kg 12",
+        True,
+        ("track", "Bankdrücken", {"reps": 12, "weight": 82.5, "unit": "kg"}),
+    ),
+    # Full entries
+    ("3x10 Bankdrücken mit 80kg", False, ("track", "Bankdrücken", FULL)),
+    ("Bankdrücken 3x10 mit 80 kg", False, ("track", "Bankdrücken", FULL)),
+    ("Bankdrücken 80kg 3×10", False, ("track", "Bankdrücken", FULL)),
+    (
+        "5x5 Kniebeugen 100kg",
+        False,
+        ("track", "Kniebeugen", {"sets": 5, "reps": 5, "weight": 100, "unit": "kg"}),
+    ),
+    (
+        "Kreuzheben 1x5 mit 140 kg",
+        False,
+        ("track", "Kreuzheben", {"sets": 1, "reps": 5, "weight": 140, "unit": "kg"}),
+    ),
+    ("4x8 Klimmzüge", False, ("track", "Klimmzüge", {"sets": 4, "reps": 8})),
+    ("3x12 Dips", True, ("track", "Dips", {"sets": 3, "reps": 12})),
+    # Navigation
+    ("nächste", True, ("next_exercise", None, {})),
+    ("Weiter", True, ("next_exercise", None, {})),
+    ("nächste Übung", True, ("next_exercise", None, {})),
+    # Must go to the LLM
+    ("12", False, None),
+    ("3x10", True, None),
+    ("weiter", False, None),
+    ("3x10 Bizeps Curls am Kabel mit 20kg", False, None),
+    ("Zeig mir meine Routinen", False, None),
+    ("Was steht heute an?", False, None),
+    ("Ich trainiere immer Montag, Mittwoch und Freitag", False, None),
+    ("Wie viel habe ich letzte Woche gehoben?", True, None),
+    ("Ich habe 8 Stunden geschlafen", False, None),
+    ("Lösche meinen Trainingsplan", False, None),
+    ("Heute war anstrengend", True, None),
+]
+
+ITERATIONS = 1000
+
+
+def main() -> None:
+    hits = correct = 0
+    for message, in_workout, expected in CORPUS:
+        context = WORKOUT if in_workout else NO_WORKOUT
+        result = parse_fast_path(message, context, CURRENT if in_workout else None)
+
+        got = None
+        if result is not None:
+            hits += 1
+            got = (result["action"], result.get("tracker"), result["data"])
+        if got == expected:
+            correct += 1
+        else:
+            print(f"MISMATCH {message!r}: expected {expected}, got {got}")
+
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for message, in_workout, _expected in CORPUS:
+            parse_fast_path(message, WORKOUT if in_workout else NO_WORKOUT, CURRENT)
+    per_message = (time.perf_counter() - started) / (ITERATIONS * len(CORPUS))
+
+    expected_hits = sum(1 for *_, expected in CORPUS if expected is not None)
+    print(f"messages:  {len(CORPUS)}")
+    print(
+        f"hit rate:  {hits / len(CORPUS):.0%} (labelled: {expected_hits / len(CORPUS):.0%})"
+    )
+    print(f"accuracy:  {correct / len(CORPUS):.0%}")
+    print(f"latency:   {per_message * 1e6:.1f} µs/message")
+
+
+if __name__ == "__main__":
+    main()
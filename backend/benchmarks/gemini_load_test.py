@@ -0,0 +1,124 @@
+"""Load test of AIService against a local stub Gemini server.
+
+Starts a stub in a separate process that answers generateContent after a fixed delay, then fires
+many concurrent chat messages through AIService. With the async client the
+total time stays close to the stub delay instead of growing with the
+threadpool size.
+
+Usage:
+    python -m benchmarks.gemini_load_test --requests 500 --delay 0.5 --connections 500
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import statistics
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.config import settings
+from app.services.ai import AIService
+from app.services.gemini import GeminiClient
+
+RESPONSE = {
+    "candidates": [
+        {
+            "content": {
+                "parts": [
+                    {
+                        "text": '{"action": "chat", "message": "Hallo!", "component": null}'
+                    }
+                ]
+            }
+        }
+    ]
+}
+
+
+def stub_app(delay: float) -> Starlette:
+    async def generate_content(request: Request) -> JSONResponse:
+        await request.body()
+        await asyncio.sleep(delay)
+        return JSONResponse(RESPONSE)
+
+    return Starlette(
+        routes=[
+            Route(
+                "/v1beta/models/{model}:generateContent",
+                generate_content,
+                methods=["POST"],
+            )
+        ]
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_stub(port: int, delay: float) -> None:
+    uvicorn.run(stub_app(delay), port=port, log_level="warning", backlog=4096)
+
+
+async def wait_for_port(port: int) -> None:
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--delay", type=float, default=0.5, help="stub latency in seconds"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=settings.gemini_max_connections
+    )
+    args = parser.parse_args()
+
+    # The stub runs in its own process so it doesn't compete for the event loop
+    port = free_port()
+    stub = multiprocessing.Process(
+        target=run_stub, args=(port, args.delay), daemon=True
+    )
+    stub.start()
+    await wait_for_port(port)
+
+    settings.gemini_max_connections = args.connections
+    client = GeminiClient(base_url=f"http://127.0.0.1:{port}", api_key="stub")
+    service = AIService(client=client)
+
+    async def one(i: int) -> float:
+        started = time.perf_counter()
+        result = await service.process_message(f"Nachricht {i}")
+        assert result["action"] == "chat", result
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(one(i) for i in range(args.requests))))
+    elapsed = time.perf_counter() - started
+
+    await client.aclose()
+    stub.terminate()
+
+    print(f"requests:     {args.requests} concurrent, stub delay {args.delay:.2f}s")
+    print(f"total:        {elapsed:.2f}s ({args.requests / elapsed:.0f} req/s)")
+    print(f"latency p50:  {statistics.median(latencies):.3f}s")
+    print(f"latency p99:  {latencies[int(len(latencies) * 0.99) - 1]:.3f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
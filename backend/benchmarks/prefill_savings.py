@@ -0,0 +1,78 @@
+"""Prefill tokens and latency with and without the cached system instruction.
+
+Usage:
+    python -m benchmarks.prefill_savings --messages 50 --prefill-ms-per-1k 200
+
+Runs workout messages through AIService against the local Gemini stand-in,
+which sleeps for every uncached prompt token to simulate prefill. Reports
+tokens prefilled per message and mean latency, once with the system prompt
+sent inline and once referenced from the context cache.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import app.services.gemini as gemini
+from app.services.ai import SYSTEM_PROMPT, AIService
+from app.services.gemini import GeminiClient, PrefillStats
+from app.services.gemini_local import LocalGeminiTransport
+
+CONTEXT = {
+    "workout_active": True,
+    "current_routine": "Push",
+    "planned_exercises": [{"name": "Bankdrücken", "sets": 4, "reps": 10, "weight": 80}],
+    "current_exercise_index": 0,
+    "current_set": 2,
+    "last_weight": 80,
+    "today": "2026-01-05",
+}
+
+
+async def run(
+    cached: bool, messages: int, seconds_per_token: float
+) -> tuple[PrefillStats, float]:
+    # Fresh counters per mode
+    stats = gemini.prefill_stats = PrefillStats("bench")
+    client = GeminiClient(
+        system_instruction=SYSTEM_PROMPT,
+        api_key="local",
+        transport=LocalGeminiTransport(prefill_seconds_per_token=seconds_per_token),
+        cache_system_instruction=cached,
+    )
+    service = AIService(client=client)
+
+    latencies = []
+    for i in range(messages):
+        started = time.perf_counter()
+        await service.process_message(f"Wie war mein letzter Satz? ({i})", CONTEXT)
+        latencies.append(time.perf_counter() - started)
+    await client.aclose()
+    return stats, statistics.mean(latencies)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument(
+        "--prefill-ms-per-1k",
+        type=float,
+        default=200.0,
+        help="simulated prefill time per 1000 uncached prompt tokens",
+    )
+    args = parser.parse_args()
+    seconds_per_token = args.prefill_ms_per_1k / 1000 / 1000
+
+    print(f"{'mode':<8}{'prompt tok':>12}{'prefilled':>12}{'saved':>8}{'mean ms':>10}")
+    for mode, cached in (("inline", False), ("cached", True)):
+        stats, latency = await run(cached, args.messages, seconds_per_token)
+        prefilled = (stats.prompt_tokens - stats.cached_tokens) / stats.calls
+        print(
+            f"{mode:<8}{stats.prompt_tokens / stats.calls:>12.0f}{prefilled:>12.0f}"
+            f"{stats.saved_ratio:>8.0%}{latency * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""Prompt context size over a simulated 60-minute workout.
+
+Usage:
+    python -m benchmarks.prompt_context_tokens
+
+Replays a workout (8 exercises, 4 sets each, one message every ~50 s, a
+routine question now and then) and compares the estimated tokens of the
+context sent with each message: the full context as JSON (previous
+behaviour) against the compact, intent-based context.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any
+
+from app.services.prompt_context import estimate_tokens, serialize_prompt_context
+
+SESSION_MINUTES = 60
+SETS_PER_EXERCISE = 4
+EXERCISES = [
+    {
+        "name": name,
+        "sets": SETS_PER_EXERCISE,
+        "reps": reps,
+        "weight": weight,
+        "unit": "kg",
+    }
+    for name, reps, weight in [
+        ("Bankdrücken", 10, 80),
+        ("Schrägbankdrücken", 10, 60),
+        ("Schulterdrücken", 10, 45),
+        ("Seitheben", 15, 12),
+        ("Dips", 12, 0),
+        ("Trizepsdrücken", 12, 25),
+        ("Butterfly", 12, 40),
+        ("Liegestütze", 20, 0),
+    ]
+]
+ROUTINE = {
+    "id": "7d9f4c1e-0000-4000-8000-000000000000",
+    "name": "Push/Pull/Legs",
+    "config": {
+        "name": "Push/Pull/Legs",
+        "schedule": "Montag, Mittwoch, Freitag",
+        "days": [
+            {
+                "day": "Montag",
+                "name": "Push",
+                "exercises": [e["name"] for e in EXERCISES],
+            },
+            {
+                "day": "Mittwoch",
+                "name": "Pull",
+                "exercises": ["Klimmzüge", "Rudern", "Bizepscurls"],
+            },
+            {
+                "day": "Freitag",
+                "name": "Beine",
+                "exercises": ["Kniebeugen", "Beinpresse", "Wadenheben"],
+            },
+        ],
+    },
+}
+
+
+def simulate() -> list[tuple[int, str, dict[str, Any]]]:
+    """(minute, message, context) for every message of the session."""
+    started = datetime.utcnow() - timedelta(minutes=SESSION_MINUTES)
+    context: dict[str, Any] = {
+        "workout_active": True,
+        "workout_started": started.isoformat(),
+        "current_routine": "Push",
+        "planned_exercises": EXERCISES,
+        "current_exercise_index": 0,
+        "current_set": 1,
+        "last_weight": None,
+        "completed_exercises": [],
+        "today": started.date().isoformat(),
+        "last_updated": started.isoformat(),
+        "active_routine": ROUTINE,
+    }
+
+    messages = []
+    total_sets = len(EXERCISES) * SETS_PER_EXERCISE
+    for i in range(total_sets + total_sets // 8):
+        minute = i * SESSION_MINUTES // (total_sets + total_sets // 8)
+        if i % 9 == 8:
+            messages.append(
+                (minute, "Freitags mache ich jetzt Yoga statt Beine", dict(context))
+            )
+            continue
+        exercise = EXERCISES[context["current_exercise_index"]]
+        messages.append(
+            (minute, f"{exercise['weight']}kg {exercise['reps']} Wdh", dict(context))
+        )
+
+        context["last_weight"] = exercise["weight"]
+        context["current_set"] += 1
+        if context["current_set"] > SETS_PER_EXERCISE and (
+            context["current_exercise_index"] + 1 < len(EXERCISES)
+        ):
+            context["completed_exercises"] = [*context["completed_exercises"], exercise]
+            context["current_exercise_index"] += 1
+            context["current_set"] = 1
+            context["last_weight"] = None
+    return messages
+
+
+def main() -> None:
+    print(f"{'min':>4}  {'full':>6}  {'compact':>8}  message")
+    full_total = compact_total = 0
+    for minute, message, context in simulate():
+        full = estimate_tokens(json.dumps(context, ensure_ascii=False))
+        compact = estimate_tokens(serialize_prompt_context(message, context))
+        full_total += full
+        compact_total += compact
+        print(f"{minute:>4}  {full:>6}  {compact:>8}  {message}")
+
+    print(
+        f"\ntotal context tokens: full {full_total}, compact {compact_total} "
+        f"({100 * (1 - compact_total / full_total):.0f}% less)"
+    )
+
+
+if __name__ == "__main__":
+    main()
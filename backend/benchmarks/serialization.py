@@ -0,0 +1,97 @@
+"""Time to serialize a page of entries to JSON bytes, per 1,000 entries.
+
+Usage:
+    python -m benchmarks.serialization --entries 1000 --repeat 50
+
+Compares FastAPI's stdlib path (jsonable_encoder + json.dumps), orjson on
+the jsonable output (ORJSONResponse), a TypeAdapter handing UUIDs and
+datetimes to orjson untouched, and a TypeAdapter writing the JSON itself
+(model_response, used by the list endpoints).
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models import Entry
+from app.responses import dumps, model_response
+from app.schemas.tracker import EntryPage
+
+ENTRY_PAGE = TypeAdapter(EntryPage)
+
+
+def make_entries(count: int) -> list[Entry]:
+    tracker_id = uuid.uuid4()
+    start = datetime(2024, 1, 1)
+    return [
+        Entry(
+            id=uuid.uuid4(),
+            user_id="bench-user",
+            tracker_id=tracker_id,
+            data={"weight": 80 + i % 20, "reps": 8, "sets": 3, "unit": "kg"},
+            notes="Gut gelaufen" if i % 3 == 0 else None,
+            timestamp=start + timedelta(minutes=i),
+            created_at=start + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def stdlib(entries: list[Entry]) -> bytes:
+    page = EntryPage.model_validate(
+        {"items": entries, "next_cursor": None}, from_attributes=True
+    )
+    return json.dumps(jsonable_encoder(page)).encode()
+
+
+def orjson_encoded(entries: list[Entry]) -> bytes:
+    page = EntryPage.model_validate(
+        {"items": entries, "next_cursor": None}, from_attributes=True
+    )
+    return dumps(jsonable_encoder(page))
+
+
+def type_adapter_orjson(entries: list[Entry]) -> bytes:
+    value = ENTRY_PAGE.validate_python(
+        {"items": entries, "next_cursor": None}, from_attributes=True
+    )
+    return dumps(ENTRY_PAGE.dump_python(value))
+
+
+def type_adapter_json(entries: list[Entry]) -> bytes:
+    return bytes(
+        model_response(ENTRY_PAGE, {"items": entries, "next_cursor": None}).body
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries)
+    expected = json.loads(stdlib(entries))
+
+    for label, serialize in (
+        ("jsonable_encoder + json", stdlib),
+        ("jsonable_encoder + orjson", orjson_encoded),
+        ("TypeAdapter + orjson", type_adapter_orjson),
+        ("model_response", type_adapter_json),
+    ):
+        assert json.loads(serialize(entries)) == expected, label
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            serialize(entries)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        per_thousand = elapsed * 1000 / args.entries * 1000
+        print(f"{label:<28}{per_thousand:>8.2f} ms per 1,000 entries")
+
+
+if __name__ == "__main__":
+    main()
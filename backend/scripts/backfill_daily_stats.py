@@ -0,0 +1,45 @@
+"""Rebuild the per-tracker daily rollups (tracker_daily_stats) from entries.
+
+Run once after the migration that creates the table, and whenever the
+rollups need rebuilding (e.g. after changing how they are computed):
+
+    python -m scripts.backfill_daily_stats
+    python -m scripts.backfill_daily_stats --user user_2abc
+
+Users are processed one at a time in their own transaction, so the rollups
+of other users stay readable and the entry service keeps them current.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.database import async_session, engine
+from app.models import User
+from app.services.stats import backfill_daily_stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user", help="only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    async with async_session() as db:
+        if args.user:
+            user_ids = [args.user]
+        else:
+            user_ids = list(
+                (await db.execute(select(User.id).order_by(User.id))).scalars()
+            )
+
+        rows = 0
+        for user_id in user_ids:
+            rows += await backfill_daily_stats(db, user_id)
+        print(f"Wrote {rows} daily rollup row(s) for {len(user_ids)} user(s)")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+"""One-shot migration of workout contexts from JSON strings to Redis hashes.
+
+Run once per Redis instance when deploying the hash-backed ContextEngine,
+before the new workers start serving traffic:
+
+    python -m scripts.migrate_context_to_hash
+"""
+
+import asyncio
+
+from app.services.context import context_engine
+
+
+async def main() -> None:
+    migrated = await context_engine.migrate_legacy_contexts()
+    print(f"Migrated {migrated} context(s) to the hash layout")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""Tests for the AI response cache."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.ai import AIService
+from app.services.ai_cache import AIResponseCache, ai_cache_stats, normalize_message
+
+
+@pytest.fixture
+def ai_cache(fake_redis) -> AIResponseCache:
+    """AIResponseCache backed by FakeRedis."""
+    return AIResponseCache(redis_client=fake_redis)
+
+
+def client_answering(text: str) -> MagicMock:
+    """Mock Gemini client that always returns the given text."""
+    client = MagicMock()
+    client.generate = AsyncMock(return_value=text)
+    return client
+
+
+SHOW_ROUTINES = '{"action": "show_routines", "data": {}, "message": "Hier sind deine Routinen:", "component": "list"}'
+TRACK = '{"action": "track", "tracker": "Bankdrücken", "data": {"reps": 10}, "message": "Gespeichert"}'
+
+
+class TestMessageNormalization:
+    """Tests for normalizing messages before they are used as keys."""
+
+    def test_case_whitespace_and_punctuation_are_ignored(self):
+        """Trivially different phrasings should share a cache entry."""
+        assert normalize_message("  Zeig mir   meine Routinen! ") == normalize_message(
+            "zeig mir meine routinen"
+        )
+
+    def test_umlauts_are_preserved(self):
+        """Umlauts carry meaning in German and must not be stripped."""
+        assert normalize_message("Übungen für Müller") == "übungen für müller"
+
+
+class TestCacheKey:
+    """Tests for which context fields affect the cache key."""
+
+    WORKOUT = {
+        "today": "2024-01-15",
+        "workout_active": True,
+        "current_routine": "Push Day",
+        "planned_exercises": [{"name": "Bankdrücken"}, {"name": "Schulterdrücken"}],
+        "current_exercise_index": 0,
+        "current_set": 2,
+        "last_weight": 60,
+    }
+
+    def test_fields_left_out_of_the_prompt_do_not_change_the_key(
+        self, ai_cache: AIResponseCache
+    ):
+        """Workout progress is only sent to the model during a workout."""
+        key_a = ai_cache.key(
+            "Was steht heute an?", {"today": "2024-01-15", "current_set": 1}
+        )
+        key_b = ai_cache.key(
+            "Was steht heute an?", {"today": "2024-01-15", "current_set": 4}
+        )
+
+        assert key_a == key_b
+
+    def test_last_weight_changes_the_key(self, ai_cache: AIResponseCache):
+        """An answer about the last weight must not be reused for another weight."""
+        key_a = ai_cache.key("Wie viel soll ich nehmen?", self.WORKOUT)
+        key_b = ai_cache.key(
+            "Wie viel soll ich nehmen?", {**self.WORKOUT, "last_weight": 80}
+        )
+
+        assert key_a != key_b
+
+    def test_current_exercise_changes_the_key(self, ai_cache: AIResponseCache):
+        """The same question about a different exercise needs its own answer."""
+        key_a = ai_cache.key("Wie viel soll ich nehmen?", self.WORKOUT)
+        key_b = ai_cache.key(
+            "Wie viel soll ich nehmen?", {**self.WORKOUT, "current_exercise_index": 1}
+        )
+
+        assert key_a != key_b
+
+    def test_date_changes_the_key(self, ai_cache: AIResponseCache):
+        """ "Was steht heute an" has a different answer every day."""
+        key_a = ai_cache.key("Was steht heute an?", {"today": "2024-01-15"})
+        key_b = ai_cache.key("Was steht heute an?", {"today": "2024-01-16"})
+
+        assert key_a != key_b
+
+
+class TestCachedProcessing:
+    """Tests for AIService with a response cache."""
+
+    async def test_repeated_prompt_is_answered_from_cache(
+        self, ai_cache: AIResponseCache
+    ):
+        """The model should only be called once for an identical prompt."""
+        service = AIService(cache=ai_cache)
+        service.client = client_answering(SHOW_ROUTINES)
+
+        first = await service.process_message("Zeig mir meine Routinen", {})
+        second = await service.process_message("zeig mir meine Routinen!", {})
+
+        assert first == second
+        assert service.client.generate.call_count == 1
+
+    async def test_track_actions_are_never_cached(self, ai_cache: AIResponseCache):
+        """Tracking has side effects and must always reach the model."""
+        service = AIService(cache=ai_cache)
+        service.client = client_answering(TRACK)
+
+        await service.process_message("3x10 Bankdrücken", {})
+        await service.process_message("3x10 Bankdrücken", {})
+
+        assert service.client.generate.call_count == 2
+
+    async def test_errors_are_not_cached(self, ai_cache: AIResponseCache):
+        """A failed model call should be retried on the next request."""
+        service = AIService(cache=ai_cache)
+        service.client = MagicMock()
+        service.client.generate = AsyncMock(
+            side_effect=[RuntimeError("timeout"), SHOW_ROUTINES]
+        )
+
+        await service.process_message("Zeig mir meine Routinen", {})
+        result = await service.process_message("Zeig mir meine Routinen", {})
+
+        assert result["action"] == "show_routines"
+
+    async def test_hits_and_misses_are_counted(self, ai_cache: AIResponseCache):
+        """Each lookup should count as a hit or a miss."""
+        service = AIService(cache=ai_cache)
+        service.client = client_answering(SHOW_ROUTINES)
+        hits, misses = ai_cache_stats.hits, ai_cache_stats.misses
+
+        await service.process_message("Zeig mir meine Routinen", {})
+        await service.process_message("Zeig mir meine Routinen", {})
+
+        assert ai_cache_stats.hits == hits + 1
+        assert ai_cache_stats.misses == misses + 1
+
+    async def test_purge_removes_all_cached_responses(self, ai_cache: AIResponseCache):
+        """After a purge the model should be asked again."""
+        service = AIService(cache=ai_cache)
+        service.client = client_answering(SHOW_ROUTINES)
+        await service.process_message("Zeig mir meine Routinen", {})
+
+        deleted = await ai_cache.purge()
+        await service.process_message("Zeig mir meine Routinen", {})
+
+        assert deleted == 1
+        assert service.client.generate.call_count == 2
@@ -1,10 +1,12 @@
 """Tests for the ContextEngine - Workout session management."""
 
+import asyncio
+import json
 import pytest
 from datetime import datetime
 from unittest.mock import patch
 
-from app.services.context import ContextEngine
+from app.services.context import ContextConflictError, ContextEngine
 
 
 class TestWorkoutLifecycle:
@@ -157,3 +159,338 @@ class TestDurationCalculation:
             duration = context_engine._calculate_duration("2024-01-15T10:30:00")
             
             assert duration == 45
+
+
+class TestRoundTrips:
+    """Tests that each context operation costs a single Redis round trip."""
+
+    @pytest.fixture
+    def counted_engine(self, fake_redis) -> tuple[ContextEngine, list[str]]:
+        """ContextEngine whose Redis client records every command it sends."""
+        commands: list[str] = []
+        original = fake_redis.execute_command
+
+        async def counting_execute_command(*args, **kwargs):
+            commands.append(args[0])
+            return await original(*args, **kwargs)
+
+        fake_redis.execute_command = counting_execute_command
+        return ContextEngine(redis_client=fake_redis), commands
+
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            lambda engine, uid: engine.get_context(uid),
+            lambda engine, uid: engine.update_context(uid, {"current_routine": "Legs"}),
+            lambda engine, uid: engine.start_workout(uid, routine_name="Legs"),
+            lambda engine, uid: engine.record_set(uid, weight=80, reps=10),
+            lambda engine, uid: engine.next_exercise(uid),
+            lambda engine, uid: engine.get_current_exercise(uid),
+            lambda engine, uid: engine.end_workout(uid),
+        ],
+    )
+    async def test_each_operation_is_a_single_round_trip(
+        self, counted_engine: tuple[ContextEngine, list[str]], user_id: str, operation
+    ):
+        """Every public operation should send exactly one command to Redis."""
+        engine, commands = counted_engine
+        await engine.start_workout(user_id, exercises=[{"name": "Kniebeugen"}])
+        await operation(engine, user_id)  # first call loads the script
+        commands.clear()
+
+        await operation(engine, user_id)
+
+        assert commands == ["EVALSHA"]
+
+
+class TestConcurrentUpdates:
+    """Tests that concurrent writers don't lose each other's updates."""
+
+    async def test_concurrent_record_set_calls_are_all_counted(
+        self, context_engine: ContextEngine, user_with_active_workout: str
+    ):
+        """Sets recorded concurrently (e.g. by two workers) must all be applied."""
+        await asyncio.gather(*[
+            context_engine.record_set(user_with_active_workout, weight=80, reps=10)
+            for _ in range(10)
+        ])
+
+        ctx = await context_engine.get_context(user_with_active_workout)
+        assert ctx["current_set"] == 11
+
+    async def test_next_exercise_after_last_exercise_keeps_completed_list(
+        self, context_engine: ContextEngine, user_with_active_workout: str
+    ):
+        """Advancing past the last exercise should not duplicate completed entries."""
+        await context_engine.next_exercise(user_with_active_workout)
+        await context_engine.next_exercise(user_with_active_workout)
+
+        exercise = await context_engine.next_exercise(user_with_active_workout)
+
+        ctx = await context_engine.get_context(user_with_active_workout)
+        assert exercise is None
+        assert [e["name"] for e in ctx["completed_exercises"]] == ["Bankdrücken", "Rudern"]
+
+
+class TestHashStorage:
+    """Tests for the field-level hash storage layout."""
+
+    async def test_record_set_payload_does_not_grow_with_workout_length(
+        self, fake_redis, user_id: str
+    ):
+        """Recording a set should send the same amount of data, however long the workout."""
+        payload_sizes: list[int] = []
+        original = fake_redis.execute_command
+
+        async def measuring_execute_command(*args, **kwargs):
+            payload_sizes.append(sum(len(str(arg)) for arg in args))
+            return await original(*args, **kwargs)
+
+        engine = ContextEngine(redis_client=fake_redis)
+        exercises = [{"name": f"Übung {i}", "sets": 3, "reps": 10} for i in range(20)]
+        await engine.start_workout(user_id, exercises=exercises)
+        await engine.record_set(user_id, weight=80, reps=10)  # loads the script
+        fake_redis.execute_command = measuring_execute_command
+
+        await engine.record_set(user_id, weight=80, reps=10)
+        early_payload = payload_sizes[-1]
+        for _ in range(15):
+            await engine.next_exercise(user_id)
+        await engine.record_set(user_id, weight=80, reps=10)
+        late_payload = payload_sizes[-1]
+
+        assert late_payload == early_payload
+
+    async def test_context_fields_keep_their_types(
+        self, context_engine: ContextEngine, user_id: str
+    ):
+        """Values should round-trip through Redis with their original types."""
+        await context_engine.update_context(user_id, {
+            "last_weight": 82.5,
+            "current_routine": None,
+            "workout_active": True,
+        })
+
+        ctx = await context_engine.get_context(user_id)
+        assert ctx["last_weight"] == 82.5
+        assert ctx["current_routine"] is None
+        assert ctx["workout_active"] is True
+
+
+class TestLegacyMigration:
+    """Tests for converting old JSON-string contexts to the hash layout."""
+
+    async def test_legacy_json_context_is_readable_after_migration(
+        self, fake_redis, context_engine: ContextEngine, user_id: str
+    ):
+        """A context stored as one JSON string should keep its values."""
+        legacy = {
+            "workout_active": True,
+            "current_set": 3,
+            "last_weight": 80,
+            "current_exercise_index": 1,
+            "planned_exercises": [{"name": "Bankdrücken"}, {"name": "Rudern"}],
+            "completed_exercises": [{"name": "Bankdrücken"}],
+        }
+        await fake_redis.set(f"context:{user_id}", json.dumps(legacy), ex=600)
+
+        migrated = await context_engine.migrate_legacy_contexts()
+
+        ctx = await context_engine.get_context(user_id)
+        assert migrated == 1
+        assert ctx["current_set"] == 3
+        assert ctx["completed_exercises"] == [{"name": "Bankdrücken"}]
+        assert (await context_engine.get_current_exercise(user_id)) == {"name": "Rudern"}
+
+    async def test_migration_skips_contexts_already_stored_as_hashes(
+        self, context_engine: ContextEngine, user_with_active_workout: str
+    ):
+        """Running the migration again should leave hash contexts untouched."""
+        migrated = await context_engine.migrate_legacy_contexts()
+
+        ctx = await context_engine.get_context(user_with_active_workout)
+        assert migrated == 0
+        assert ctx["workout_active"] is True
+
+
+class TestLocalCache:
+    """Tests for the opt-in per-worker context cache."""
+
+    @pytest.fixture
+    async def cached_engine(self, fake_redis):
+        """ContextEngine with a local cache and an active invalidation listener."""
+        engine = ContextEngine(redis_client=fake_redis, local_cache_size=100)
+        await engine.start_invalidation_listener()
+        yield engine
+        await engine.stop_invalidation_listener()
+
+    @staticmethod
+    async def _wait_for(predicate, timeout: float = 1.0) -> None:
+        """Poll an async predicate until it holds (invalidation is asynchronous)."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not await predicate():
+            assert asyncio.get_running_loop().time() < deadline, "condition never met"
+            await asyncio.sleep(0.01)
+
+    async def test_repeated_reads_are_served_without_redis(
+        self, fake_redis, cached_engine: ContextEngine, user_id: str
+    ):
+        """A hot user's context should be read from memory after the first load."""
+        await cached_engine.get_context(user_id)
+        commands: list[str] = []
+        original = fake_redis.execute_command
+
+        async def counting_execute_command(*args, **kwargs):
+            commands.append(args[0])
+            return await original(*args, **kwargs)
+
+        fake_redis.execute_command = counting_execute_command
+
+        await cached_engine.get_context(user_id)
+        await cached_engine.get_current_exercise(user_id)
+
+        assert commands == []
+
+    async def test_own_writes_are_visible_immediately(
+        self, cached_engine: ContextEngine, user_id: str
+    ):
+        """A worker should never read its own stale cached context."""
+        await cached_engine.get_context(user_id)
+
+        await cached_engine.start_workout(user_id, routine_name="Pull")
+
+        ctx = await cached_engine.get_context(user_id)
+        assert ctx["current_routine"] == "Pull"
+
+    async def test_writes_from_another_worker_invalidate_the_cache(
+        self, fake_redis, cached_engine: ContextEngine, user_id: str
+    ):
+        """A write through a different worker should evict the cached copy."""
+        other_worker = ContextEngine(redis_client=fake_redis)
+        await cached_engine.get_context(user_id)
+
+        await other_worker.start_workout(user_id, routine_name="Legs")
+
+        async def sees_new_routine() -> bool:
+            ctx = await cached_engine.get_context(user_id)
+            return ctx["current_routine"] == "Legs"
+
+        await self._wait_for(sees_new_routine)
+
+    async def test_mutating_a_returned_context_does_not_affect_the_cache(
+        self, cached_engine: ContextEngine, user_id: str
+    ):
+        """Callers enrich the context per request; that must not leak into the cache."""
+        ctx = await cached_engine.get_context(user_id)
+        ctx["active_routine"] = {"name": "Push"}
+
+        again = await cached_engine.get_context(user_id)
+        assert "active_routine" not in again
+
+    async def test_cache_is_disabled_by_default(
+        self, context_engine: ContextEngine, fake_redis, user_id: str
+    ):
+        """Without opting in, every read should go to Redis."""
+        await context_engine.start_invalidation_listener()
+        await context_engine.get_context(user_id)
+        await fake_redis.hset(f"context:{user_id}", "current_routine", '"Direct"')
+
+        ctx = await context_engine.get_context(user_id)
+        assert ctx["current_routine"] == "Direct"
+
+
+class TestContextSession:
+    """Tests for request-scoped context sessions."""
+
+    async def test_session_changes_are_persisted_on_flush(
+        self, context_engine: ContextEngine, user_with_active_workout: str
+    ):
+        """Changes made in memory should be visible after flushing."""
+        session = await context_engine.load_session(user_with_active_workout)
+        session.record_set(weight=80, reps=10)
+        session.next_exercise()
+
+        await session.flush()
+
+        ctx = await context_engine.get_context(user_with_active_workout)
+        assert ctx["current_exercise_index"] == 1
+        assert ctx["current_set"] == 1
+        assert [e["name"] for e in ctx["completed_exercises"]] == ["Bankdrücken"]
+
+    async def test_session_changes_are_not_persisted_before_flush(
+        self, context_engine: ContextEngine, user_with_active_workout: str
+    ):
+        """Other readers should not see unflushed session changes."""
+        session = await context_engine.load_session(user_with_active_workout)
+
+        session.record_set(weight=80, reps=10)
+
+        ctx = await context_engine.get_context(user_with_active_workout)
+        assert ctx["current_set"] == 1
+        assert session.context["current_set"] == 2
+
+    async def test_session_costs_one_read_and_one_write(
+        self, fake_redis, context_engine: ContextEngine, user_with_active_workout: str
+    ):
+        """A chat message should cost one Redis read and one Redis write."""
+        warm_up = await context_engine.load_session(user_with_active_workout)
+        warm_up.record_set(weight=80, reps=10)
+        await warm_up.flush()
+        commands: list[str] = []
+        original = fake_redis.execute_command
+
+        async def counting_execute_command(*args, **kwargs):
+            commands.append(args[0])
+            return await original(*args, **kwargs)
+
+        fake_redis.execute_command = counting_execute_command
+
+        session = await context_engine.load_session(user_with_active_workout)
+        session.record_set(weight=80, reps=10)
+        session.record_set(weight=82.5, reps=8)
+        await session.flush()
+
+        assert commands == ["EVALSHA", "EVALSHA"]
+
+    async def test_concurrent_write_is_detected_and_changes_are_replayed(
+        self, context_engine: ContextEngine, user_with_active_workout: str
+    ):
+        """A conflicting write from another worker must not be overwritten."""
+        session = await context_engine.load_session(user_with_active_workout)
+        session.record_set(weight=80, reps=10)
+
+        await context_engine.record_set(user_with_active_workout, weight=70, reps=12)
+        await session.flush()
+
+        ctx = await context_engine.get_context(user_with_active_workout)
+        assert ctx["current_set"] == 3
+        assert ctx["last_weight"] == 80
+
+    async def test_flush_without_changes_does_not_write(
+        self, context_engine: ContextEngine, user_id: str
+    ):
+        """A read-only request should not bump the stored context."""
+        session = await context_engine.load_session(user_id)
+        await context_engine.update_context(user_id, {"current_routine": "Legs"})
+
+        await session.flush()
+
+        ctx = await context_engine.get_context(user_id)
+        assert ctx["current_routine"] == "Legs"
+
+    async def test_flush_gives_up_when_context_keeps_changing(
+        self, context_engine: ContextEngine, user_id: str
+    ):
+        """Endless conflicts should surface as an error instead of looping forever."""
+        session = await context_engine.load_session(user_id)
+        session.update({"current_routine": "Push"})
+        original_flush = context_engine._flush_session
+
+        async def always_conflicting(*args, **kwargs):
+            await context_engine.record_set(user_id, weight=60, reps=5)
+            return await original_flush(*args, **kwargs)
+
+        context_engine._flush_session = always_conflicting
+
+        with pytest.raises(ContextConflictError):
+            await session.flush()
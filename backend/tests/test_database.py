@@ -0,0 +1,224 @@
+"""Tests for the engines, their connection pools and read routing."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import database
+from app.config import settings
+from app.database import (
+    Base,
+    PoolStats,
+    PrimarySession,
+    RecentWrites,
+    TimedNullPool,
+    TimedQueuePool,
+    build_engine,
+    has_read_replica,
+    read_sessions_for,
+)
+from app.models import User
+
+
+@pytest.fixture
+async def pool_engine(tmp_path):
+    stats = PoolStats("test_pool")
+    engine = build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        stats,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    yield engine, stats
+    await engine.dispose()
+
+
+class TestPoolStats:
+    """Tests for checkout wait, in-use and overflow metrics."""
+
+    async def test_checkouts_are_timed(self, pool_engine):
+        """Every checkout should add a wait time."""
+        engine, stats = pool_engine
+
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        assert stats.checkout_wait.count == 3
+
+    async def test_in_use_counts_checked_out_connections(self, pool_engine):
+        """Connections held by a session should show as in use."""
+        engine, stats = pool_engine
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            in_use = stats.snapshot()["in_use"]
+
+        assert in_use == 1
+        assert stats.snapshot()["in_use"] == 0
+
+    async def test_exhausted_pool_counts_timeouts(self, pool_engine):
+        """A checkout that times out should be counted and still raise."""
+        engine, stats = pool_engine
+
+        async with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+
+        assert stats.timeouts == 1
+        assert stats.checkout_wait.max >= 0.1
+
+    async def test_waiter_gets_connection_once_released(self, pool_engine):
+        """A waiting checkout should be served when a connection comes back."""
+        engine, stats = pool_engine
+
+        async def hold() -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(hold(), hold())
+
+        assert stats.timeouts == 0
+        assert stats.snapshot()["overflow"] == 0
+
+    async def test_stats_survive_dispose(self, pool_engine):
+        """Disposing recreates the pool, which should keep reporting."""
+        engine, stats = pool_engine
+
+        await engine.dispose()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        assert isinstance(engine.pool, TimedQueuePool)
+        assert engine.pool.stats is stats
+        assert stats.checkout_wait.count == 1
+
+
+class TestBuildEngine:
+    """Tests for the engine options taken from settings."""
+
+    def test_echo_is_independent_of_env(self, monkeypatch):
+        """Development mode alone should not log every statement."""
+        monkeypatch.setattr(settings, "env", "development")
+        monkeypatch.setattr(settings, "db_echo", False)
+
+        engine = build_engine("sqlite+aiosqlite://")
+
+        assert engine.echo is False
+
+    def test_pool_settings_are_applied(self, monkeypatch):
+        """Pool size should come from settings."""
+        monkeypatch.setattr(settings, "db_pool_size", 7)
+
+        engine = build_engine("sqlite+aiosqlite://")
+
+        assert isinstance(engine.pool, TimedQueuePool)
+        assert engine.pool.size() == 7
+
+    def test_external_pooler_uses_no_pool(self):
+        """Behind PgBouncer every checkout should open a fresh connection."""
+        engine = build_engine("sqlite+aiosqlite://", external_pooler=True)
+
+        assert isinstance(engine.pool, TimedNullPool)
+
+
+@pytest.fixture
+def replica(monkeypatch) -> RecentWrites:
+    """Route reads to a (pretend) replica and record writes in a fresh tracker."""
+    writes = RecentWrites(window_seconds=60)
+    monkeypatch.setattr(database, "async_read_session", MagicMock(name="replica"))
+    monkeypatch.setattr(database, "recent_writes", writes)
+    return writes
+
+
+@pytest.fixture
+async def primary_sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=PrimarySession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestReadRouting:
+    """Tests for sending reads to the replica except right after a write."""
+
+    async def test_reads_go_to_the_replica(self, replica):
+        """A user without recent writes should read from the replica."""
+        sessions = await read_sessions_for("user-1")
+
+        assert sessions is database.async_read_session
+
+    async def test_recent_writer_reads_from_the_primary(self, replica):
+        """Right after a write the user should read their own data from the primary."""
+        await replica.mark("user-1")
+
+        assert await read_sessions_for("user-1") is database.async_session
+        assert await read_sessions_for("user-2") is database.async_read_session
+
+    async def test_without_replica_everything_uses_the_primary(self):
+        """With no read URL configured reads should use the primary engine."""
+        assert not has_read_replica()
+        assert await read_sessions_for("user-1") is database.async_session
+
+    async def test_commit_with_writes_marks_the_user(self, replica, primary_sessions):
+        """Committing a flushed change should start the user's window."""
+        async with primary_sessions(info={"user_id": "user-1"}) as db:
+            db.add(User(id="user-1", email="a@example.com"))
+            await db.commit()
+
+        assert await replica.contains("user-1")
+
+    async def test_bulk_insert_marks_the_user(self, replica, primary_sessions):
+        """Insert statements bypass the flush but are writes all the same."""
+        async with primary_sessions(info={"user_id": "user-1"}) as db:
+            await db.execute(insert(User).values(id="user-1", email="a@example.com"))
+            await db.commit()
+
+        assert await replica.contains("user-1")
+
+    async def test_read_only_commit_does_not_mark(self, replica, primary_sessions):
+        """Ending a transaction that only read should keep reads on the replica."""
+        async with primary_sessions(info={"user_id": "user-1"}) as db:
+            await db.execute(select(User))
+            await db.commit()
+
+        assert not await replica.contains("user-1")
+
+    async def test_rolled_back_writes_do_not_mark(self, replica, primary_sessions):
+        """Writes that were rolled back should not count."""
+        async with primary_sessions(info={"user_id": "user-1"}) as db:
+            db.add(User(id="user-1", email="a@example.com"))
+            await db.flush()
+            await db.rollback()
+            await db.commit()
+
+        assert not await replica.contains("user-1")
+
+
+class TestRecentWrites:
+    """Tests for the read-your-writes window."""
+
+    async def test_window_expires(self):
+        """Once the window has passed the user should read from the replica again."""
+        writes = RecentWrites(window_seconds=-1)
+        await writes.mark("user-1")
+
+        assert not await writes.contains("user-1")
+
+    async def test_redis_shares_writes_between_workers(self, fake_redis):
+        """A write on one worker should affect reads on another."""
+        worker_a = RecentWrites(window_seconds=60, redis_client=fake_redis)
+        worker_b = RecentWrites(window_seconds=60, redis_client=fake_redis)
+
+        await worker_a.mark("user-1")
+
+        assert await worker_b.contains("user-1")
+        assert not await worker_b.contains("user-2")
@@ -1,8 +1,31 @@
 """Tests for the Entry Service - Tracker categorization and data management."""
 
-import pytest
+import asyncio
+import uuid
+from datetime import datetime, timedelta
 
-from app.services.entry import get_category_for_tracker, TRACKER_CATEGORIES
+import pytest
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models import Entry, Tracker, User
+from app.services.entry import (
+    ENTRY_INSERT_CHUNK,
+    TRACKER_CATEGORIES,
+    TrackerIdCache,
+    aggregate_entry_field,
+    find_entries,
+    get_category_for_tracker,
+    get_entry_page,
+    get_or_create_tracker,
+    get_tracker_stats,
+    save_entries,
+    save_entry,
+    tracker_cache_stats,
+    tracker_id_cache,
+)
+from app.services.user import ensure_user, known_users
 
 
 class TestTrackerCategorization:
@@ -130,3 +153,439 @@ class TestTrackerCategoriesMapping:
         """Verify default fallback category exists."""
         assert "default" in TRACKER_CATEGORIES
         assert TRACKER_CATEGORIES["default"] == "general"
+
+
+class TestSaveEntries:
+    """Tests for saving many entries in one transaction."""
+
+    async def test_entries_are_saved_with_trackers_resolved_by_name(self, db_session):
+        """Trackers named in the batch should be created once and reused."""
+        results = await save_entries(db_session, "user-1", "a@example.com", [
+            {"tracker": "bankdrücken", "data": {"reps": 10}},
+            {"tracker": "Bankdrücken ", "data": {"reps": 8}},
+            {"tracker": "Schlaf", "data": {"hours": 7}},
+        ])
+
+        assert all(isinstance(result, uuid.UUID) for result in results)
+        trackers = (await db_session.execute(select(Tracker))).scalars().all()
+        assert sorted((t.name, t.category) for t in trackers) == [
+            ("Bankdrücken", "fitness"),
+            ("Schlaf", "health"),
+        ]
+        assert len((await db_session.execute(select(Entry))).scalars().all()) == 3
+
+    async def test_unknown_tracker_id_is_reported_per_item(self, db_session):
+        """An entry for someone else's tracker should fail alone."""
+        [existing] = await save_entries(db_session, "user-2", None, [
+            {"tracker": "Lesen", "data": {"pages": 20}},
+        ])
+        other_tracker = (await db_session.execute(select(Tracker.id))).scalar_one()
+
+        results = await save_entries(db_session, "user-1", None, [
+            {"tracker_id": other_tracker, "data": {"pages": 5}},
+            {"tracker": "Lesen", "data": {"pages": 10}},
+        ])
+
+        assert results[0] == "Tracker not found"
+        assert isinstance(results[1], uuid.UUID)
+
+    async def test_entries_keep_their_order_and_timestamps(self, db_session):
+        """Returned IDs should match the input order; given timestamps are kept."""
+        timestamp = datetime(2024, 1, 15, 10, 30)
+        results = await save_entries(db_session, "user-1", None, [
+            {"tracker": "Wasser", "data": {"ml": ml}, "timestamp": timestamp}
+            for ml in range(50)
+        ])
+
+        entries = {
+            entry.id: entry
+            for entry in (await db_session.execute(select(Entry))).scalars()
+        }
+        assert [entries[entry_id].data["ml"] for entry_id in results] == list(range(50))
+        assert {entry.timestamp for entry in entries.values()} == {timestamp}
+
+    async def test_failed_chunk_does_not_fail_the_batch(self, pg_db_session):
+        """Entries of a chunk whose tracker is gone should fail alone."""
+        await ensure_user(pg_db_session, "user-1", None)
+        await get_or_create_tracker(pg_db_session, "user-1", "Schlaf")
+        await pg_db_session.execute(delete(Tracker).where(Tracker.name == "Schlaf"))
+        await pg_db_session.commit()
+        # Another worker deleted the tracker; this one still has it cached
+        batch = [{"tracker": "Wasser", "data": {"ml": 250}}] * ENTRY_INSERT_CHUNK
+        batch.append({"tracker": "Schlaf", "data": {"hours": 7}})
+
+        results = await save_entries(pg_db_session, "user-1", None, batch)
+
+        assert all(isinstance(result, uuid.UUID) for result in results[:-1])
+        assert results[-1] == "Tracker not found"
+        assert tracker_id_cache.get("user-1", "Schlaf") is None
+        saved = await pg_db_session.execute(select(func.count()).select_from(Entry))
+        assert saved.scalar_one() == ENTRY_INSERT_CHUNK
+
+
+class TestSaveEntry:
+    """Tests for saving a single tracked entry."""
+
+    async def test_first_entry_creates_user_and_tracker(self, db_session):
+        """A new user's first set should create the user and the tracker."""
+        entry = await save_entry(db_session, "user-1", "a@example.com", "bankdrücken", {"reps": 10})
+
+        user = (await db_session.execute(select(User))).scalar_one()
+        tracker = (await db_session.execute(select(Tracker))).scalar_one()
+        assert user.email == "a@example.com"
+        assert (tracker.name, tracker.category) == ("Bankdrücken", "fitness")
+        assert entry.tracker_id == tracker.id
+        assert entry.created_at is not None
+
+    async def test_existing_tracker_is_reused(self, db_session):
+        """Later sets should go to the same tracker."""
+        first = await save_entry(db_session, "user-1", None, "Bankdrücken", {"reps": 10})
+        second = await save_entry(db_session, "user-1", None, " bankdrücken", {"reps": 8})
+
+        assert first.tracker_id == second.tracker_id
+        assert len((await db_session.execute(select(Entry))).scalars().all()) == 2
+
+    async def test_no_reads_or_refreshes(self, db_session, count_statements):
+        """Saving should only INSERT; nothing is read back with extra queries."""
+        statements = count_statements(db_session)
+
+        await save_entry(db_session, "user-1", None, "Bankdrücken", {"reps": 10})
+
+        # User, tracker, entry and the daily rollup
+        assert len(statements) == 4
+        assert all(statement.startswith("INSERT") for statement in statements)
+
+    async def test_known_tracker_only_inserts_the_entry(self, db_session, count_statements):
+        """With user and tracker cached, a set costs the entry and rollup INSERTs."""
+        await ensure_user(db_session, "user-1")
+        await save_entry(db_session, "user-1", None, "Bankdrücken", {"reps": 10})
+        statements = count_statements(db_session)
+
+        await save_entry(db_session, "user-1", None, "bankdrücken ", {"reps": 8})
+
+        assert len(statements) == 2
+        assert statements[0].startswith("INSERT INTO entries")
+        assert statements[1].startswith("INSERT INTO tracker_daily_stats")
+
+    async def test_created_user_is_remembered(self, db_session, count_statements):
+        """After the first set, the user should not be inserted again."""
+        await save_entry(db_session, "user-1", "a@example.com", "Bankdrücken", {"reps": 10})
+        statements = count_statements(db_session)
+
+        await save_entry(db_session, "user-1", "a@example.com", "Bankdrücken", {"reps": 8})
+
+        assert await known_users.contains("user-1")
+        assert not any("INSERT INTO users" in statement for statement in statements)
+
+    async def test_stale_cached_tracker_is_recreated(self, db_session):
+        """A tracker deleted behind the cache's back should be created again."""
+        first = await save_entry(db_session, "user-1", None, "Bankdrücken", {"reps": 10})
+        await db_session.execute(delete(Entry))
+        await db_session.execute(delete(Tracker))
+        await db_session.commit()
+        await db_session.execute(text("PRAGMA foreign_keys = ON"))
+
+        second = await save_entry(db_session, "user-1", None, "Bankdrücken", {"reps": 8})
+
+        tracker = (await db_session.execute(select(Tracker))).scalar_one()
+        assert second.tracker_id == tracker.id != first.tracker_id
+
+    async def test_postgres_saves_in_one_statement(self, pg_db_session, count_statements):
+        """On PostgreSQL user, tracker and entry are written by one statement (plus the rollup's lock and upsert)."""
+        statements = count_statements(pg_db_session)
+
+        first = await save_entry(pg_db_session, "user-1", None, "Bankdrücken", {"reps": 10})
+        second = await save_entry(pg_db_session, "user-1", None, "Bankdrücken", {"reps": 8})
+
+        assert first.tracker_id == second.tracker_id
+        writes = [s for s in statements if not s.startswith(("BEGIN", "COMMIT"))]
+        assert len(writes) == 6
+        assert [s.startswith("INSERT INTO tracker_daily_stats") for s in writes] == [
+            False, False, True,
+        ] * 2
+
+
+class TestTrackerIdCache:
+    """Tests for resolving tracker names through the per-worker cache."""
+
+    async def test_get_or_create_tracker_writes_through(self, db_session):
+        """A created tracker should be cached under its normalized name."""
+        tracker = await get_or_create_tracker(db_session, "user-1", " schlaf")
+
+        assert tracker_id_cache.get("user-1", "Schlaf") == tracker.id
+
+    async def test_batch_uses_cached_trackers(self, db_session, count_statements):
+        """Names already cached should not be looked up again."""
+        await save_entries(db_session, "user-1", None, [{"tracker": "Schlaf", "data": {}}])
+        statements = count_statements(db_session)
+
+        await save_entries(db_session, "user-1", None, [{"tracker": "Schlaf", "data": {}}])
+
+        assert not any("FROM trackers" in statement for statement in statements)
+
+    async def test_hits_and_misses_are_counted(self, db_session):
+        """The hit ratio metric should reflect cache use."""
+        hits, misses = tracker_cache_stats.hits, tracker_cache_stats.misses
+
+        await save_entry(db_session, "user-1", None, "Schlaf", {"hours": 7})
+        await save_entry(db_session, "user-1", None, "Schlaf", {"hours": 8})
+
+        assert tracker_cache_stats.misses - misses == 1
+        assert tracker_cache_stats.hits - hits == 1
+
+    async def test_duplicate_tracker_names_are_rejected(self, db_session):
+        """The unique index should prevent two trackers with the same name."""
+        await get_or_create_tracker(db_session, "user-1", "Schlaf")
+        db_session.add(
+            Tracker(user_id="user-1", name="Schlaf", category="health", schema={})
+        )
+
+        with pytest.raises(IntegrityError):
+            await db_session.commit()
+
+    async def test_concurrent_creation_yields_one_tracker(self, pg_db_session):
+        """Racing first sets of a new tracker should end up on the same tracker."""
+        sessions = async_sessionmaker(pg_db_session.bind, expire_on_commit=False)
+        await save_entry(pg_db_session, "user-1", None, "Wasser", {"ml": 250})
+
+        async def save(ml: int) -> Entry:
+            async with sessions() as db:
+                return await save_entry(db, "user-1", None, "Schlaf", {"ml": ml})
+
+        tracker_id_cache.clear()
+        entries = await asyncio.gather(*(save(ml) for ml in range(10)))
+
+        trackers = (
+            await pg_db_session.execute(select(Tracker).where(Tracker.name == "Schlaf"))
+        ).scalars().all()
+        assert len(trackers) == 1
+        assert {entry.tracker_id for entry in entries} == {trackers[0].id}
+
+    def test_entries_expire_after_ttl(self):
+        """Expired entries should no longer be returned."""
+        cache = TrackerIdCache(max_size=10, ttl_seconds=-1)
+        cache.set("user-1", "Schlaf", uuid.uuid4())
+
+        assert cache.get("user-1", "Schlaf") is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """The cache should not grow beyond its size."""
+        cache = TrackerIdCache(max_size=2, ttl_seconds=60)
+        cache.set("user-1", "Schlaf", uuid.uuid4())
+        cache.set("user-1", "Wasser", uuid.uuid4())
+        cache.get("user-1", "Schlaf")
+
+        cache.set("user-1", "Gewicht", uuid.uuid4())
+
+        assert cache.get("user-1", "Schlaf") is not None
+        assert cache.get("user-1", "Wasser") is None
+
+
+BENCH_SETS = [
+    {"tracker": "Bankdrücken", "data": {"weight": 80, "reps": 10, "unit": "kg"},
+     "timestamp": datetime(2024, 2, 28)},
+    {"tracker": "Bankdrücken", "data": {"weight": 100, "reps": 5, "unit": "kg"},
+     "timestamp": datetime(2024, 3, 5)},
+    {"tracker": "Bankdrücken", "data": {"weight": 105, "reps": 3, "unit": "kg"},
+     "timestamp": datetime(2024, 3, 20)},
+    {"tracker": "Bankdrücken", "data": {"weight": "schwer", "reps": 1},
+     "timestamp": datetime(2024, 3, 25)},
+    {"tracker": "Bankdrücken", "data": {"weight": 110, "reps": 1, "unit": "kg"},
+     "timestamp": datetime(2024, 4, 2)},
+    {"tracker": "Kniebeugen", "data": {"weight": 140, "reps": 5, "unit": "kg"},
+     "timestamp": datetime(2024, 3, 10)},
+]
+
+
+class TestFieldQueries:
+    """Tests for filtering and aggregating entry data fields in SQL."""
+
+    async def test_entries_with_weight_at_least(self, db_session):
+        """Only sets of the tracker with a numeric weight >= 100 should match."""
+        await save_entries(db_session, "user-1", None, BENCH_SETS)
+
+        entries = await find_entries(
+            db_session, "user-1", "Bankdrücken", at_least={"weight": 100}
+        )
+
+        assert [entry.data["weight"] for entry in entries] == [110, 105, 100]
+
+    async def test_equality_and_range_filters_combine(self, db_session):
+        """Exact values, bounds and time windows should all apply."""
+        await save_entries(db_session, "user-1", None, BENCH_SETS)
+
+        entries = await find_entries(
+            db_session,
+            "user-1",
+            equals={"unit": "kg", "reps": 5},
+            at_most={"weight": 120},
+            since=datetime(2024, 3, 1),
+            until=datetime(2024, 4, 1),
+        )
+
+        assert [entry.data["weight"] for entry in entries] == [100]
+
+    async def test_max_weight_in_march(self, db_session):
+        """Aggregates should only consider numeric values in the time window."""
+        await save_entries(db_session, "user-1", None, BENCH_SETS)
+
+        heaviest = await aggregate_entry_field(
+            db_session, "user-1", "Bankdrücken", "weight", "max",
+            since=datetime(2024, 3, 1), until=datetime(2024, 4, 1),
+        )
+        sets = await aggregate_entry_field(
+            db_session, "user-1", "Bankdrücken", "weight", "count",
+            since=datetime(2024, 3, 1), until=datetime(2024, 4, 1),
+        )
+
+        assert heaviest == 105
+        assert sets == 2
+
+    async def test_unknown_aggregate_is_rejected(self, db_session):
+        """Only the supported aggregate functions should be accepted."""
+        with pytest.raises(ValueError):
+            await aggregate_entry_field(db_session, "user-1", "Bankdrücken", "weight", "median")
+
+    async def test_postgres_field_queries(self, pg_db_session):
+        """The same queries should work on JSONB, including non-numeric values."""
+        await save_entries(pg_db_session, "user-1", None, BENCH_SETS)
+
+        entries = await find_entries(
+            pg_db_session, "user-1", "Bankdrücken",
+            equals={"unit": "kg"}, at_least={"weight": 100},
+        )
+        heaviest = await aggregate_entry_field(
+            pg_db_session, "user-1", "Bankdrücken", "weight", "max",
+            since=datetime(2024, 3, 1), until=datetime(2024, 4, 1),
+        )
+
+        assert [entry.data["weight"] for entry in entries] == [110, 105, 100]
+        assert heaviest == 105
+
+
+class TestEntryPages:
+    """Tests for keyset pagination of a user's entries."""
+
+    async def test_pages_cover_all_entries_once_in_order(self, db_session):
+        """Following next_cursor should return every entry exactly once, newest first."""
+        # Several entries share a timestamp, so the id has to break the ties
+        await save_entries(db_session, "user-1", None, [
+            {"tracker": "Schlaf", "data": {"hours": i}, "timestamp": datetime(2024, 1, 1 + i // 3)}
+            for i in range(10)
+        ])
+
+        pages, cursor = [], None
+        while True:
+            entries, cursor = await get_entry_page(db_session, "user-1", limit=4, cursor=cursor)
+            pages.append(entries)
+            if cursor is None:
+                break
+
+        everything = (await get_entry_page(db_session, "user-1", limit=100))[0]
+        assert [len(page) for page in pages] == [4, 4, 2]
+        assert [entry.id for page in pages for entry in page] == [entry.id for entry in everything]
+        timestamps = [entry.timestamp for entry in everything]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+    async def test_exact_last_page_has_no_cursor(self, db_session):
+        """A page that ends with the last entry should not point to an empty page."""
+        await save_entries(db_session, "user-1", None, [
+            {"tracker": "Schlaf", "data": {"hours": i}} for i in range(4)
+        ])
+
+        entries, cursor = await get_entry_page(db_session, "user-1", limit=4)
+
+        assert len(entries) == 4
+        assert cursor is None
+
+    async def test_pages_can_be_filtered_by_tracker(self, db_session):
+        """Only entries of the named tracker should be paged."""
+        await save_entries(db_session, "user-1", None, BENCH_SETS)
+
+        entries, cursor = await get_entry_page(db_session, "user-1", "kniebeugen", limit=5)
+
+        assert [entry.data["weight"] for entry in entries] == [140]
+        assert cursor is None
+
+    async def test_invalid_cursor_is_rejected(self, db_session):
+        """Cursors that weren't issued by the API should raise ValueError."""
+        with pytest.raises(ValueError):
+            await get_entry_page(db_session, "user-1", cursor="not-a-cursor")
+
+
+def recent_sets(now: datetime) -> list[dict]:
+    monday = (now - timedelta(days=now.weekday())).replace(hour=12, minute=0)
+    return [
+        # Two weeks ago: 1 × 10 × 80 + 3 × 8 × 85
+        {"tracker": "Bankdrücken", "data": {"weight": 80, "reps": 10},
+         "timestamp": monday - timedelta(weeks=2)},
+        {"tracker": "Bankdrücken", "data": {"weight": 85, "reps": 8, "sets": 3},
+         "timestamp": monday - timedelta(weeks=2, hours=-1)},
+        # This week: no weight, so no volume
+        {"tracker": "Bankdrücken", "data": {"reps": 12, "notiz": "nur Stange"},
+         "timestamp": monday},
+        {"tracker": "Bankdrücken", "data": {"weight": 90, "reps": 5},
+         "timestamp": monday + timedelta(hours=1)},
+        {"tracker": "Kniebeugen", "data": {"weight": 140, "reps": 5},
+         "timestamp": monday},
+    ]
+
+
+class TestTrackerStats:
+    """Tests for the single-query tracker statistics."""
+
+    async def test_stats_are_aggregated_in_sql(self, db_session):
+        """Count, dates, last entry, max weight and volume should cover all entries."""
+        sets = recent_sets(datetime.utcnow())
+        await save_entries(db_session, "user-1", None, sets)
+
+        stats = await get_tracker_stats(db_session, "user-1", "bankdrücken", weeks=3)
+
+        assert stats["count"] == 4
+        assert stats["first_entry_date"] == sets[0]["timestamp"].isoformat()
+        assert stats["last_entry"] == {
+            "data": {"weight": 90, "reps": 5},
+            "timestamp": sets[3]["timestamp"].isoformat(),
+        }
+        assert stats["max_weight"] == 90
+        assert stats["total_volume"] == 800 + 2040 + 450
+        assert [week["count"] for week in stats["weekly_counts"]] == [2, 0, 2]
+
+    async def test_count_is_not_capped(self, db_session):
+        """Trackers with long histories should report their full count."""
+        await save_entries(db_session, "user-1", None, [
+            {"tracker": "Wasser", "data": {"ml": 250}} for _ in range(150)
+        ])
+
+        stats = await get_tracker_stats(db_session, "user-1", "Wasser")
+
+        assert stats["count"] == 150
+        assert stats["max_weight"] is None
+
+    async def test_empty_tracker(self, db_session):
+        """Unknown trackers should have zero counts and no last entry."""
+        stats = await get_tracker_stats(db_session, "user-1", "Schlaf", weeks=2)
+
+        assert stats["count"] == 0
+        assert stats["last_entry"] is None
+        assert [week["count"] for week in stats["weekly_counts"]] == [0, 0]
+
+    async def test_one_statement(self, db_session, count_statements):
+        """All statistics should come from a single query."""
+        await save_entries(db_session, "user-1", None, recent_sets(datetime.utcnow()))
+        statements = count_statements(db_session)
+
+        await get_tracker_stats(db_session, "user-1", "Bankdrücken")
+
+        assert len(statements) == 1
+
+    async def test_postgres_stats(self, pg_db_session):
+        """The aggregate query should work on JSONB as well."""
+        await save_entries(pg_db_session, "user-1", None, recent_sets(datetime.utcnow()))
+
+        stats = await get_tracker_stats(pg_db_session, "user-1", "Bankdrücken", weeks=3)
+
+        assert stats["count"] == 4
+        assert stats["max_weight"] == 90
+        assert stats["total_volume"] == 800 + 2040 + 450
+        assert [week["count"] for week in stats["weekly_counts"]] == [2, 0, 2]
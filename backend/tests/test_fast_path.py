@@ -0,0 +1,133 @@
+"""Tests for the deterministic fast path that bypasses the LLM."""
+
+import pytest
+
+from app.services.fast_path import fast_path_stats, parse_fast_path
+
+BENCH = {"name": "Bankdrücken", "sets": 3, "reps": 10}
+
+
+@pytest.fixture
+def workout_context() -> dict:
+    """Context of an active workout where 80kg was the last weight."""
+    return {"workout_active": True, "last_weight": 80}
+
+
+class TestMinimalWorkoutInput:
+    """Tests for reps-only and weight+reps input during a workout."""
+
+    def test_reps_only_uses_current_exercise_and_last_weight(
+        self, workout_context: dict
+    ):
+        """ "12" should become a set of the current exercise with the last weight."""
+        result = parse_fast_path("12", workout_context, BENCH)
+
+        assert result is not None
+        assert result["action"] == "track"
+        assert result["tracker"] == "Bankdrücken"
+        assert result["data"] == {"reps": 12, "weight": 80, "unit": "kg"}
+
+    @pytest.mark.parametrize(
+        "message", ["95, 12", "95 12", "95kg 12", "95 kg x 12", "95kg, 12 Wdh"]
+    )
+    def test_weight_and_reps_are_parsed(self, workout_context: dict, message: str):
+        """Common ways of saying weight and reps should all be understood."""
+        result = parse_fast_path(message, workout_context, BENCH)
+
+        assert result is not None
+        assert result["data"] == {"reps": 12, "weight": 95, "unit": "kg"}
+
+    def test_decimal_weight_with_comma_is_parsed(self, workout_context: dict):
+        """German decimal commas should be read as decimals."""
+        result = parse_fast_path("82,5 kg 8", workout_context, BENCH)
+
+        assert result is not None
+        assert result["data"]["weight"] == 82.5
+
+    def test_reps_only_without_known_weight_goes_to_llm(self):
+        """Without a last weight the input can't be resolved confidently."""
+        result = parse_fast_path(
+            "12", {"workout_active": True, "last_weight": None}, BENCH
+        )
+
+        assert result is None
+
+    def test_reps_only_without_active_workout_goes_to_llm(self):
+        """A bare number outside a workout is ambiguous."""
+        result = parse_fast_path(
+            "12", {"workout_active": False, "last_weight": 80}, None
+        )
+
+        assert result is None
+
+    def test_ambiguous_times_notation_goes_to_llm(self, workout_context: dict):
+        """ "3x10" could be sets×reps or weight×reps, so the LLM decides."""
+        result = parse_fast_path("3x10", workout_context, BENCH)
+
+        assert result is None
+
+
+class TestFullEntries:
+    """Tests for complete entries with exercise name, sets, reps and weight."""
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "3x10 Bankdrücken mit 80kg",
+            "Bankdrücken 3x10 mit 80 kg",
+            "bankdrücken 80kg 3×10",
+        ],
+    )
+    def test_full_entry_is_parsed_in_any_order(self, message: str):
+        """Exercise, sets×reps and weight should be found in any order."""
+        result = parse_fast_path(message, {})
+
+        assert result is not None
+        assert result["tracker"] == "Bankdrücken"
+        assert result["data"] == {"sets": 3, "reps": 10, "weight": 80, "unit": "kg"}
+        assert result["message"] == "Gespeichert: Bankdrücken 3×10 mit 80kg"
+
+    def test_bodyweight_entry_has_no_weight(self):
+        """Entries without a weight should be tracked as sets and reps only."""
+        result = parse_fast_path("4x8 Klimmzüge", {})
+
+        assert result is not None
+        assert result["data"] == {"sets": 4, "reps": 8}
+
+    def test_unknown_exercise_goes_to_llm(self):
+        """Unknown names are left to the LLM, which knows more exercises."""
+        result = parse_fast_path("3x10 Bizeps Curls am Kabel mit 20kg", {})
+
+        assert result is None
+
+
+class TestNextExercise:
+    """Tests for moving on to the next exercise."""
+
+    @pytest.mark.parametrize("message", ["nächste", "Weiter!", "nächste Übung", "next"])
+    def test_next_commands_are_recognized_during_workout(
+        self, workout_context: dict, message: str
+    ):
+        """Short "next" commands should advance the workout."""
+        result = parse_fast_path(message, workout_context, BENCH)
+
+        assert result is not None
+        assert result["action"] == "next_exercise"
+
+    def test_next_outside_workout_goes_to_llm(self):
+        """Without a workout, "weiter" has no fixed meaning."""
+        assert parse_fast_path("weiter", {"workout_active": False}) is None
+
+
+class TestHitRate:
+    """Tests for the fast path hit-rate metric."""
+
+    def test_hits_and_misses_are_counted(self, workout_context: dict):
+        """Each resolved message is a hit, each LLM fallback a miss."""
+        hits, misses = fast_path_stats.hits, fast_path_stats.misses
+
+        parse_fast_path("12", workout_context, BENCH)
+        parse_fast_path("Wie war mein Training letzte Woche?", workout_context, BENCH)
+
+        assert fast_path_stats.hits == hits + 1
+        assert fast_path_stats.misses == misses + 1
@@ -0,0 +1,289 @@
+"""Tests for the async Gemini REST client."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.gemini import (
+    GeminiClient,
+    GeminiError,
+    SystemInstructionCache,
+    prefill_stats,
+)
+from app.services.gemini_local import LocalGeminiTransport
+from app.services.prompt_context import estimate_tokens
+
+
+def candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def client_with(handler) -> GeminiClient:
+    """GeminiClient whose HTTP requests are answered by a handler function."""
+    return GeminiClient(
+        model="test-model",
+        system_instruction="Sei kurz.",
+        api_key="test-key",
+        transport=httpx.MockTransport(handler),
+        cache_system_instruction=False,
+    )
+
+
+class TestGenerate:
+    """Tests for complete (non-streaming) generation."""
+
+    async def test_generate_returns_text_of_first_candidate(self):
+        """The text parts of the first candidate should be joined."""
+        client = client_with(
+            lambda request: httpx.Response(200, json=candidate("Hallo"))
+        )
+
+        text = await client.generate("Hi")
+
+        assert text == "Hallo"
+
+    async def test_request_contains_prompt_and_system_instruction(self):
+        """The prompt and system prompt should be sent in Gemini's format."""
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=candidate("ok"))
+
+        client = client_with(handler)
+
+        await client.generate("3x10 Bankdrücken")
+
+        body = json.loads(requests[0].content)
+        assert requests[0].url.path == "/v1beta/models/test-model:generateContent"
+        assert requests[0].url.params["key"] == "test-key"
+        assert body["contents"][0]["parts"][0]["text"] == "3x10 Bankdrücken"
+        assert body["systemInstruction"]["parts"][0]["text"] == "Sei kurz."
+
+    async def test_api_error_raises_with_status_code(self):
+        """HTTP errors should surface with their status code (e.g. rate limits)."""
+        client = client_with(
+            lambda request: httpx.Response(
+                429, json={"error": {"message": "Resource exhausted"}}
+            )
+        )
+
+        with pytest.raises(GeminiError) as exc_info:
+            await client.generate("Hi")
+
+        assert exc_info.value.status_code == 429
+        assert "Resource exhausted" in str(exc_info.value)
+
+    async def test_connection_errors_raise_gemini_error(self):
+        """Network failures should not leak httpx exceptions."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("connection refused")
+
+        client = client_with(handler)
+
+        with pytest.raises(GeminiError):
+            await client.generate("Hi")
+
+    async def test_rate_limit_carries_retry_after(self):
+        """The provider's Retry-After header should be passed on."""
+        client = client_with(
+            lambda request: httpx.Response(
+                429, headers={"Retry-After": "7"}, text="slow down"
+            )
+        )
+
+        with pytest.raises(GeminiError) as exc_info:
+            await client.generate("Hi")
+
+        assert exc_info.value.retry_after == 7.0
+
+
+class TestStream:
+    """Tests for streaming generation."""
+
+    async def test_stream_yields_text_of_each_event(self):
+        """Each server-sent event should yield its text."""
+        events = "".join(
+            f"data: {json.dumps(candidate(text))}\r\n\r\n"
+            for text in ['{"act', 'ion": "chat"}']
+        )
+        client = client_with(
+            lambda request: httpx.Response(
+                200,
+                content=events.encode(),
+                headers={"content-type": "text/event-stream"},
+            )
+        )
+
+        chunks = [chunk async for chunk in client.stream("Hi")]
+
+        assert chunks == ['{"act', 'ion": "chat"}']
+
+    async def test_stream_error_raises_with_status_code(self):
+        """Errors before the stream starts should raise like generate()."""
+        client = client_with(lambda request: httpx.Response(503, text="unavailable"))
+
+        with pytest.raises(GeminiError) as exc_info:
+            _ = [chunk async for chunk in client.stream("Hi")]
+
+        assert exc_info.value.status_code == 503
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SlowTransport(LocalGeminiTransport):
+    """Local stand-in that yields to other tasks before answering."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return await super().handle_async_request(request)
+
+
+def cached_client(transport: LocalGeminiTransport, clock: FakeClock) -> GeminiClient:
+    """GeminiClient backed by the local stand-in, caching its system instruction."""
+    client = GeminiClient(
+        model="test-model",
+        system_instruction="Du bist ein Assistent. " * 100,
+        api_key="test-key",
+        transport=transport,
+        cache_system_instruction=True,
+    )
+    client.instruction_cache = SystemInstructionCache(
+        client, ttl_seconds=600, clock=clock
+    )
+    return client
+
+
+class TestContextCache:
+    """Tests for keeping the system instruction in Gemini's context cache."""
+
+    async def test_system_instruction_is_cached_once_and_referenced(self):
+        """The first call should create cached content that later calls reference."""
+        clock = FakeClock()
+        transport = LocalGeminiTransport(clock=clock)
+        client = cached_client(transport, clock)
+
+        await client.generate("Hi")
+        await client.generate("Hallo")
+
+        assert transport.requests.count(("POST", "/v1beta/cachedContents")) == 1
+        assert len(transport.cached) == 1
+
+    async def test_cached_tokens_are_reported_as_prefill_savings(self):
+        """usageMetadata of cached calls should count as saved prefill."""
+        clock = FakeClock()
+        client = cached_client(LocalGeminiTransport(clock=clock), clock)
+        before = prefill_stats.snapshot()
+
+        await client.generate("Hi")
+
+        after = prefill_stats.snapshot()
+        instruction_tokens = estimate_tokens(client.system_instruction or "")
+        assert after["cached_tokens"] - before["cached_tokens"] == instruction_tokens
+        assert (
+            after["prompt_tokens"] - before["prompt_tokens"] == instruction_tokens + 1
+        )
+
+    async def test_ttl_is_refreshed_before_expiry(self):
+        """Close to expiry the TTL should be extended instead of recreating the cache."""
+        clock = FakeClock()
+        transport = LocalGeminiTransport(clock=clock)
+        client = cached_client(transport, clock)
+        await client.generate("Hi")
+
+        clock.now += 580
+        await client.generate("Hi")
+        clock.now += 580
+        await client.generate("Hi")
+
+        methods = [
+            method for method, path in transport.requests if "cachedContents" in path
+        ]
+        assert methods == ["POST", "PATCH", "PATCH"]
+
+    async def test_expired_cache_is_recreated(self):
+        """If the cached content is gone, a new one should be created."""
+        clock = FakeClock()
+        transport = LocalGeminiTransport(clock=clock)
+        client = cached_client(transport, clock)
+        await client.generate("Hi")
+
+        clock.now += 1000
+        await client.generate("Hi")
+
+        assert transport.requests.count(("POST", "/v1beta/cachedContents")) == 2
+
+    async def test_cache_deleted_on_server_falls_back_to_inline(self):
+        """A call referencing vanished cached content should be retried inline."""
+        clock = FakeClock()
+        transport = LocalGeminiTransport(clock=clock)
+        client = cached_client(transport, clock)
+        await client.generate("Hi")
+        transport.cached.clear()
+
+        text = await client.generate("Hi")
+
+        assert text
+        assert client.instruction_cache is not None
+        assert await client.instruction_cache.name() is not None
+
+    async def test_too_small_instruction_is_sent_inline(self):
+        """When the API refuses to cache, calls should still succeed inline."""
+        clock = FakeClock()
+        transport = LocalGeminiTransport(min_cache_tokens=10_000, clock=clock)
+        client = cached_client(transport, clock)
+
+        await client.generate("Hi")
+        await client.generate("Hi")
+
+        # Creation is not retried on every call
+        assert transport.requests.count(("POST", "/v1beta/cachedContents")) == 1
+        assert not transport.cached
+
+    async def test_instruction_below_model_minimum_is_not_cached(self, monkeypatch):
+        """Caching should not even be tried below the configured minimum size."""
+        monkeypatch.setattr(settings, "gemini_context_cache_min_tokens", 10_000)
+        transport = LocalGeminiTransport()
+        client = GeminiClient(
+            model="test-model",
+            system_instruction="Du bist ein Assistent. " * 100,
+            api_key="test-key",
+            transport=transport,
+            cache_system_instruction=True,
+        )
+
+        await client.generate("Hi")
+
+        assert client.instruction_cache is None
+        assert ("POST", "/v1beta/cachedContents") not in transport.requests
+
+    async def test_concurrent_calls_try_to_create_once(self):
+        """Callers queued behind a failed creation should not retry it themselves."""
+        clock = FakeClock()
+        transport = SlowTransport(min_cache_tokens=10_000, clock=clock)
+        client = cached_client(transport, clock)
+
+        await asyncio.gather(*(client.generate("Hi") for _ in range(20)))
+
+        assert transport.requests.count(("POST", "/v1beta/cachedContents")) == 1
+
+    async def test_stream_uses_cached_content(self):
+        """Streaming calls should reference the cached content as well."""
+        clock = FakeClock()
+        transport = LocalGeminiTransport(reply=lambda prompt: "ok", clock=clock)
+        client = cached_client(transport, clock)
+
+        chunks = [chunk async for chunk in client.stream("Hi")]
+
+        assert chunks == ["ok"]
+        assert len(transport.cached) == 1
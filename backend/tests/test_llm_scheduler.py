@@ -0,0 +1,248 @@
+"""Tests for LLM admission control."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.ai import AIService
+from app.services.gemini import GeminiError
+from app.services.llm_scheduler import LLMBusyError, LLMScheduler
+
+
+def scheduler(**kwargs) -> LLMScheduler:
+    defaults = {
+        "max_concurrency": 1,
+        "max_queue": 10,
+        "queue_timeout": 5.0,
+        "user_rate": 1.0,
+        "user_burst": 100,
+        "name": "test_scheduler",
+    }
+    return LLMScheduler(**(defaults | kwargs))
+
+
+async def hold(sched: LLMScheduler, user_id: str, log: list[str], gate: asyncio.Event):
+    """Take a slot, record the user and wait until the gate opens."""
+    async with sched.slot(user_id):
+        log.append(user_id)
+        await gate.wait()
+
+
+class TestConcurrency:
+    """Tests for the global concurrency cap and the wait queue."""
+
+    async def test_calls_beyond_the_cap_wait_for_a_slot(self):
+        """Only max_concurrency calls should run; the rest queue up."""
+        sched = scheduler(max_concurrency=2)
+        gate = asyncio.Event()
+        log: list[str] = []
+
+        tasks = [asyncio.create_task(hold(sched, f"u{i}", log, gate)) for i in range(5)]
+        await asyncio.sleep(0)
+
+        assert sched.active == 2
+        assert sched.queued == 3
+
+        gate.set()
+        await asyncio.gather(*tasks)
+
+        assert sched.active == 0
+        assert sched.queued == 0
+        assert len(log) == 5
+
+    async def test_full_queue_fails_fast(self):
+        """With all slots busy and the queue full, calls should be rejected at once."""
+        sched = scheduler(max_concurrency=1, max_queue=1)
+        gate = asyncio.Event()
+        log: list[str] = []
+        tasks = [asyncio.create_task(hold(sched, f"u{i}", log, gate)) for i in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMBusyError) as exc_info:
+            async with sched.slot("u3"):
+                pass
+
+        assert exc_info.value.retry_after >= 1.0
+        assert sched.rejected == 1
+        gate.set()
+        await asyncio.gather(*tasks)
+
+    async def test_queue_timeout_rejects_and_leaves_queue(self):
+        """A call that waits too long should be rejected and removed from the queue."""
+        sched = scheduler(max_concurrency=1, queue_timeout=0.01)
+        gate = asyncio.Event()
+        task = asyncio.create_task(hold(sched, "u1", [], gate))
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMBusyError):
+            async with sched.slot("u2"):
+                pass
+
+        assert sched.queued == 0
+        gate.set()
+        await task
+        assert sched.active == 0
+
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        """Cancelling a queued call (client disconnect) should free its place."""
+        sched = scheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        first = asyncio.create_task(hold(sched, "u1", [], gate))
+        waiting = asyncio.create_task(hold(sched, "u2", [], gate))
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        gate.set()
+        await first
+
+        assert sched.active == 0
+        assert sched.queued == 0
+
+    async def test_waiters_are_served_round_robin_across_users(self):
+        """A user with many queued calls should not starve other users."""
+        sched = scheduler(max_concurrency=1)
+        release = asyncio.Event()
+        log: list[str] = []
+
+        async def quick(user_id: str):
+            async with sched.slot(user_id):
+                log.append(user_id)
+
+        blocker = asyncio.create_task(hold(sched, "blocker", [], release))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(quick("spammer")) for _ in range(3)]
+        tasks.append(asyncio.create_task(quick("other")))
+        await asyncio.sleep(0)
+
+        release.set()
+        await asyncio.gather(blocker, *tasks)
+
+        assert log.index("other") == 1
+
+    async def test_wait_times_are_recorded(self):
+        """Every admitted call should add a wait time to the metrics."""
+        sched = scheduler()
+
+        async with sched.slot("u1"):
+            pass
+
+        snapshot = sched.snapshot()
+        assert snapshot["wait_seconds"]["count"] == 1
+        assert snapshot["queue_depth"] == 0
+
+
+class TestTokenBucket:
+    """Tests for per-user rate limiting."""
+
+    async def test_burst_is_allowed_then_rejected_with_retry_after(self):
+        """A user should get user_burst calls, then a Retry-After for the next token."""
+        sched = scheduler(user_rate=0.5, user_burst=2, max_concurrency=10)
+
+        for _ in range(2):
+            async with sched.slot("u1"):
+                pass
+        with pytest.raises(LLMBusyError) as exc_info:
+            async with sched.slot("u1"):
+                pass
+
+        assert exc_info.value.retry_after == pytest.approx(2.0, abs=0.1)
+        assert exc_info.value.retry_after_header == "2"
+
+    async def test_buckets_are_per_user(self):
+        """One user's exhausted bucket should not affect another user."""
+        sched = scheduler(user_rate=0.5, user_burst=1, max_concurrency=10)
+        async with sched.slot("u1"):
+            pass
+
+        async with sched.slot("u2"):
+            pass
+
+        with pytest.raises(LLMBusyError):
+            async with sched.slot("u1"):
+                pass
+
+
+class FakeClient:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+
+    async def generate(self, prompt: str) -> str:
+        if self.error:
+            raise self.error
+        return '{"action": "chat", "message": "ok"}'
+
+    async def stream(self, prompt: str):
+        for text in ('{"action": "chat", ', '"message": "o', 'k"}'):
+            yield text
+
+
+class TestAIServiceScheduling:
+    """Tests for AIService behind the scheduler."""
+
+    async def test_rejected_call_raises_busy_error(self):
+        """Scheduler rejections should propagate instead of becoming 'AI Error' messages."""
+        service = AIService(
+            client=FakeClient(),  # type: ignore[arg-type]
+            scheduler=scheduler(user_rate=0.1, user_burst=1),
+        )
+        await service.process_message("Hi", user_id="u1")
+
+        with pytest.raises(LLMBusyError):
+            await service.process_message("Hi", user_id="u1")
+
+    async def test_provider_rate_limit_raises_busy_error(self):
+        """A 429 from Gemini should be reported like our own rate limit."""
+        service = AIService(
+            client=FakeClient(GeminiError("exhausted", status_code=429, retry_after=3)),  # type: ignore[arg-type]
+        )
+
+        with pytest.raises(LLMBusyError) as exc_info:
+            await service.process_message("Hi")
+
+        assert exc_info.value.retry_after == 3
+
+    async def test_other_provider_errors_stay_error_responses(self):
+        """Non rate-limit errors should still produce an error response."""
+        service = AIService(
+            client=FakeClient(GeminiError("bad request", status_code=400)),  # type: ignore[arg-type]
+        )
+
+        result = await service.process_message("Hi")
+
+        assert result["action"] == "error"
+
+    async def test_stalled_stream_reader_does_not_hold_slot(self):
+        """A client that stops reading should not keep the slot once Gemini is done."""
+        sched = scheduler()
+        service = AIService(client=FakeClient(), scheduler=sched)  # type: ignore[arg-type]
+        events = service.stream_message("Hi", user_id="u1")
+
+        assert await anext(events) == ("action", {"action": "chat"})
+        await asyncio.sleep(0.01)
+
+        assert sched.active == 0
+        result = await asyncio.wait_for(service.process_message("Hi", user_id="u2"), 1)
+        assert result["message"] == "ok"
+        await events.aclose()
+
+
+class TestBusyResponse:
+    """Tests for the HTTP mapping of rejected calls."""
+
+    def test_busy_error_maps_to_429_with_retry_after(self):
+        """LLMBusyError should become 429 with a Retry-After header."""
+
+        @app.get("/__test_busy")
+        async def busy():
+            raise LLMBusyError("busy", retry_after=2.5)
+
+        try:
+            response = TestClient(app).get("/__test_busy")
+        finally:
+            app.router.routes.pop()
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,27 @@
+"""Tests for the /metrics endpoint."""
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+
+class TestMetricsEndpoint:
+    """/metrics should only be readable with the admin key."""
+
+    def test_requires_admin_key(self, monkeypatch):
+        """Requests without the key should be rejected."""
+        monkeypatch.setattr(settings, "admin_api_key", "secret")
+
+        response = TestClient(app).get("/metrics")
+
+        assert response.status_code == 403
+
+    def test_returns_snapshot_with_admin_key(self, monkeypatch):
+        """The admin key should give the registered metrics."""
+        monkeypatch.setattr(settings, "admin_api_key", "secret")
+
+        response = TestClient(app).get("/metrics", headers={"X-Admin-Key": "secret"})
+
+        assert response.status_code == 200
+        assert "llm_scheduler" in response.json()
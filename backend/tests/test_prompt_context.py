@@ -0,0 +1,159 @@
+"""Tests for the compact prompt context."""
+
+import json
+
+import pytest
+
+from app.services.ai import AIService
+from app.services.prompt_context import (
+    build_prompt_context,
+    estimate_tokens,
+    serialize_prompt_context,
+)
+
+EXERCISES = [
+    {"name": name, "sets": 4, "reps": 10, "weight": 80, "unit": "kg"}
+    for name in [
+        "Bankdrücken",
+        "Schulterdrücken",
+        "Dips",
+        "Seitheben",
+        "Butterfly",
+        "Trizeps",
+    ]
+]
+ROUTINE = {
+    "id": "abc",
+    "name": "Push/Pull/Legs",
+    "config": {
+        "name": "Push/Pull/Legs",
+        "schedule": "Montag, Mittwoch, Freitag",
+        "time": None,
+        "days": [
+            {"day": "Montag", "name": "Push"},
+            {"day": "Freitag", "name": "Beine"},
+        ],
+    },
+}
+
+
+@pytest.fixture
+def workout_context() -> dict:
+    """Context in the middle of a workout: two exercises done, set 3 of the third."""
+    return {
+        "workout_active": True,
+        "workout_started": None,
+        "current_routine": "Push",
+        "planned_exercises": EXERCISES,
+        "current_exercise_index": 2,
+        "current_set": 3,
+        "last_weight": 80,
+        "completed_exercises": EXERCISES[:2],
+        "today": "2026-01-05",
+        "last_updated": "2026-01-05T18:30:00",
+        "active_routine": ROUTINE,
+    }
+
+
+class TestFieldSelection:
+    """Tests for which fields are sent for a message."""
+
+    def test_workout_message_gets_compact_workout_state(self, workout_context: dict):
+        """During a workout the current exercise, set and progress should be sent."""
+        compact = build_prompt_context("80kg 10", workout_context)
+
+        assert compact["w"] == 1
+        assert compact["ex"] == "Dips 4×10 80kg"
+        assert compact["s"] == 3
+        assert compact["lw"] == 80
+        assert compact["done"] == ["Bankdrücken", "Schulterdrücken"]
+        assert compact["next"] == ["Seitheben 4×10 80kg", "Butterfly", "Trizeps"]
+
+    def test_routine_config_only_sent_for_routine_messages(self, workout_context: dict):
+        """The routine config is only relevant when the message is about routines."""
+        workout = build_prompt_context("80kg 10", workout_context)
+        routine = build_prompt_context(
+            "Freitags mache ich jetzt Yoga statt Beine", workout_context
+        )
+
+        assert workout["ar"] == {"n": "Push/Pull/Legs"}
+        assert routine["ar"]["c"]["days"][1] == {"day": "Freitag", "name": "Beine"}
+
+    def test_empty_and_internal_fields_are_left_out(self):
+        """Defaults, timestamps and empty values should not be sent."""
+        compact = build_prompt_context(
+            "Wie viel habe ich diese Woche trainiert?",
+            {
+                "workout_active": False,
+                "planned_exercises": [],
+                "completed_exercises": [],
+                "last_weight": None,
+                "today": "2026-01-05",
+                "last_updated": "2026-01-05T18:30:00",
+            },
+        )
+
+        assert compact == {"d": "2026-01-05"}
+
+    def test_request_context_is_passed_through(self):
+        """Unknown fields sent by the app should still reach the model."""
+        compact = build_prompt_context(
+            "Hallo", {"today": "2026-01-05", "timezone": "Europe/Berlin"}
+        )
+
+        assert compact["x"] == {"timezone": "Europe/Berlin"}
+
+    def test_no_context_gives_empty_string(self):
+        """Without context nothing should be appended to the prompt."""
+        assert serialize_prompt_context("Hallo", None) == ""
+
+
+class TestTokenBudget:
+    """Tests for the token budget."""
+
+    def test_output_stays_within_budget(self, workout_context: dict):
+        """The serialized context should never exceed the budget."""
+        for budget in (10, 20, 40, 80):
+            text = serialize_prompt_context(
+                "Freitags Yoga statt Beine", workout_context, budget
+            )
+
+            assert estimate_tokens(text) <= budget
+
+    def test_tight_budget_falls_back_to_summaries(self, workout_context: dict):
+        """With little room, detailed fields should shrink before being dropped."""
+        full = build_prompt_context("Freitags Yoga statt Beine", workout_context, 1000)
+        tight = build_prompt_context("Freitags Yoga statt Beine", workout_context, 40)
+
+        assert "c" in full["ar"]
+        assert tight["ar"] == {"n": "Push/Pull/Legs"}
+
+    def test_context_does_not_grow_with_completed_exercises(
+        self, workout_context: dict
+    ):
+        """Completed exercises are summarized, so long workouts stay small."""
+        long_plan = EXERCISES * 5
+        late = {
+            **workout_context,
+            "planned_exercises": long_plan,
+            "current_exercise_index": 25,
+            "completed_exercises": long_plan[:25],
+        }
+
+        compact = build_prompt_context("80kg 10", late)
+
+        assert compact["done"] == ["Bankdrücken", "Schulterdrücken", "Dips", "+22"]
+        assert estimate_tokens(json.dumps(late)) > 10 * estimate_tokens(
+            serialize_prompt_context("80kg 10", late)
+        )
+
+
+class TestPrompt:
+    """Tests for the prompt built by AIService."""
+
+    def test_prompt_contains_compact_context(self, workout_context: dict):
+        """The prompt should carry the compact context, not the full one."""
+        prompt = AIService(client=object())._build_prompt("80kg 10", workout_context)  # type: ignore[arg-type]
+
+        assert prompt.startswith("80kg 10\n\nKontext: {")
+        assert "planned_exercises" not in prompt
@@ -0,0 +1,185 @@
+"""Query plan regression tests for the hot queries (PostgreSQL only).
+
+Seeds a small dataset, runs the service and router queries and checks with
+EXPLAIN that they are answered from the intended index. Tables this small
+would be scanned sequentially anyway, so sequential and bitmap scans are
+disabled for the EXPLAIN (except for GIN indexes, which only support
+bitmap scans): the tests check that an index fits each query's
+filter and order (no Sort node), not the planner's cost decisions.
+"""
+
+from collections.abc import Awaitable, Callable
+
+import pytest
+from sqlalchemy import event, text
+
+from app.auth import ClerkUser
+from app.routers.trackers import list_entries
+from app.services.entry import (
+    find_entries,
+    get_entry_page,
+    get_or_create_tracker,
+    get_recent_entries,
+)
+from app.services.routine import get_active_routine
+
+USERS = 50
+TRACKERS = ["Bankdrücken", "Kniebeugen", "Schlaf", "Wasser", "Gewicht"]
+ENTRIES_PER_TRACKER = 20
+HEAVY_USER_ENTRIES = 20000
+
+SEED = [
+    """
+    INSERT INTO users (id, email, created_at, updated_at)
+    SELECT 'user-' || u, 'user-' || u || '@example.com', now(), now()
+    FROM generate_series(0, :users - 1) u
+    """,
+    """
+    INSERT INTO trackers (id, user_id, name, category, schema, created_at, updated_at)
+    SELECT gen_random_uuid(), users.id, tracker.name, 'general', '{}', now(), now()
+    FROM users, unnest(CAST(:trackers AS text[])) AS tracker(name)
+    """,
+    """
+    INSERT INTO entries (id, user_id, tracker_id, data, timestamp, created_at)
+    SELECT gen_random_uuid(), trackers.user_id, trackers.id, '{}',
+           TIMESTAMP '2024-01-01' + i * INTERVAL '1 hour', now()
+    FROM trackers, generate_series(1, :entries) i
+    """,
+    # A long-time user with a long history of sets
+    """
+    INSERT INTO entries (id, user_id, tracker_id, data, timestamp, created_at)
+    SELECT gen_random_uuid(), trackers.user_id, trackers.id,
+           jsonb_build_object('weight', 40 + i % 80, 'reps', i % 12, 'unit', 'kg'),
+           TIMESTAMP '2020-01-01' + i * INTERVAL '1 hour', now()
+    FROM trackers, generate_series(1, :heavy_entries) i
+    WHERE trackers.user_id = 'user-0' AND trackers.name = 'Bankdrücken'
+    """,
+    """
+    INSERT INTO routines (id, user_id, name, type, config, is_active, created_at, updated_at)
+    SELECT gen_random_uuid(), users.id, 'Routine ' || r, 'custom', '{}', r = 0, now(), now()
+    FROM users, generate_series(0, 2) r
+    """,
+]
+
+
+@pytest.fixture
+async def seeded_db(pg_db_session):
+    """PostgreSQL session with trackers, entries and routines for several users."""
+    for statement in SEED:
+        await pg_db_session.execute(
+            text(statement),
+            {
+                "users": USERS,
+                "trackers": TRACKERS,
+                "entries": ENTRIES_PER_TRACKER,
+                "heavy_entries": HEAVY_USER_ENTRIES,
+            },
+        )
+    await pg_db_session.commit()
+    await pg_db_session.execute(text("ANALYZE"))
+    return pg_db_session
+
+
+async def explain(
+    session, query: Callable[[], Awaitable[object]], bitmap_scans: bool = False
+) -> str:
+    """EXPLAIN the last SELECT that query() sends."""
+    selects: list[tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().startswith("SELECT"):
+            selects.append((statement, parameters))
+
+    engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        await query()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    statement, parameters = selects[-1]
+    connection = await session.connection()
+    await connection.exec_driver_sql("SET enable_seqscan = off")
+    if not bitmap_scans:
+        await connection.exec_driver_sql("SET enable_bitmapscan = off")
+    result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in result)
+
+
+class TestQueryPlans:
+    """The hot queries should use their composite or partial index."""
+
+    async def test_recent_entries_use_user_timestamp_index(self, seeded_db):
+        """get_recent_entries should read the newest rows from the index, unsorted."""
+        plan = await explain(seeded_db, lambda: get_recent_entries(seeded_db, "user-3"))
+
+        assert "ix_entries_user_id_timestamp" in plan
+        assert "Sort" not in plan
+
+    async def test_recent_entries_by_tracker_use_tracker_timestamp_index(
+        self, seeded_db
+    ):
+        """Filtering by tracker name should still avoid sorting all entries."""
+        plan = await explain(
+            seeded_db, lambda: get_recent_entries(seeded_db, "user-3", "Schlaf")
+        )
+
+        assert "ix_entries_tracker_id_timestamp" in plan
+        assert "Sort" not in plan
+
+    async def test_list_entries_uses_tracker_timestamp_index(self, seeded_db):
+        """The tracker entries endpoint should read the newest rows from the index."""
+        tracker = await get_or_create_tracker(seeded_db, "user-3", "Schlaf")
+        user = ClerkUser("user-3")
+
+        plan = await explain(
+            seeded_db,
+            lambda: list_entries(
+                user=user, tracker_id=tracker.id, limit=50, cursor=None, db=seeded_db
+            ),
+        )
+
+        assert "ix_entries_tracker_id_timestamp" in plan
+        assert "Sort" not in plan
+
+    async def test_deep_history_page_is_an_index_range_scan(self, seeded_db):
+        """A page far back in a long history should start right at the cursor."""
+        _, cursor = await get_entry_page(seeded_db, "user-0", limit=15000)
+
+        plan = await explain(
+            seeded_db,
+            lambda: get_entry_page(seeded_db, "user-0", limit=20, cursor=cursor),
+        )
+
+        assert "ix_entries_user_id_timestamp" in plan
+        assert "Sort" not in plan
+        index_condition = next(
+            line for line in plan.splitlines() if "Index Cond" in line
+        )
+        assert '"timestamp"' in index_condition
+
+    async def test_active_routine_uses_partial_index(self, seeded_db):
+        """get_active_routine should be a lookup in the partial unique index."""
+        plan = await explain(seeded_db, lambda: get_active_routine(seeded_db, "user-3"))
+
+        assert "ix_routines_user_id_active" in plan
+
+    async def test_tracker_lookup_uses_unique_name_index(self, seeded_db):
+        """get_or_create_tracker should find trackers through (user_id, name)."""
+        plan = await explain(
+            seeded_db, lambda: get_or_create_tracker(seeded_db, "user-3", "Schlaf")
+        )
+
+        assert "ix_trackers_user_id_name" in plan
+
+    async def test_field_equality_uses_gin_index(self, seeded_db):
+        """Exact data matches in a long history should use the jsonb_path_ops index."""
+        plan = await explain(
+            seeded_db,
+            lambda: find_entries(
+                seeded_db, "user-0", equals={"weight": 100, "reps": 8}
+            ),
+            bitmap_scans=True,
+        )
+
+        assert "ix_entries_data" in plan
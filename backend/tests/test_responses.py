@@ -0,0 +1,86 @@
+"""Tests for the orjson response class and TypeAdapter responses."""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+
+from app.models import Entry
+from app.responses import ORJSONResponse, model_response
+from app.schemas.tracker import EntryPage, TrackerSummary
+
+
+class TestORJSONResponse:
+    """Tests for the app's default response class."""
+
+    def test_uuid_and_datetime_are_encoded_natively(self):
+        """UUIDs and datetimes should come out as their usual JSON strings."""
+        entry_id = uuid4()
+        timestamp = datetime(2024, 3, 4, 7, 30, 0, 123456)
+
+        response = ORJSONResponse({"id": entry_id, "timestamp": timestamp})
+
+        assert json.loads(bytes(response.body)) == {
+            "id": str(entry_id),
+            "timestamp": "2024-03-04T07:30:00.123456",
+        }
+
+    def test_other_types_fall_back_to_jsonable_encoder(self):
+        """Models and types orjson lacks should still be serialized."""
+        summary = TrackerSummary(
+            id=uuid4(),
+            name="Schlaf",
+            category="health",
+            icon=None,
+            color=None,
+            created_at=datetime(2024, 1, 1),
+        )
+
+        response = ORJSONResponse({"tracker": summary, "weight": Decimal("82.5")})
+
+        body = json.loads(bytes(response.body))
+        assert body["tracker"]["name"] == "Schlaf"
+        assert body["weight"] == 82.5
+
+    def test_non_string_keys_are_allowed(self):
+        """Dicts keyed by numbers, e.g. weekly counts, should serialize."""
+        response = ORJSONResponse({1: 3, 2: 5})
+
+        assert json.loads(bytes(response.body)) == {"1": 3, "2": 5}
+
+
+class TestModelResponse:
+    """Tests for validating and rendering with a TypeAdapter."""
+
+    def test_orm_objects_are_validated_and_rendered(self):
+        """ORM entries should be rendered like the EntryPage model."""
+        entry = Entry(
+            id=uuid4(),
+            user_id="user-1",
+            tracker_id=uuid4(),
+            data={"weight": 80, "reps": 8},
+            notes=None,
+            timestamp=datetime(2024, 3, 4, 7, 30),
+            created_at=datetime(2024, 3, 4, 7, 31),
+        )
+
+        response = model_response(
+            TypeAdapter(EntryPage), {"items": [entry], "next_cursor": "abc"}
+        )
+
+        assert response.media_type == "application/json"
+        assert json.loads(bytes(response.body)) == {
+            "items": [
+                {
+                    "id": str(entry.id),
+                    "tracker_id": str(entry.tracker_id),
+                    "data": {"weight": 80, "reps": 8},
+                    "notes": None,
+                    "timestamp": "2024-03-04T07:30:00",
+                    "created_at": "2024-03-04T07:31:00",
+                }
+            ],
+            "next_cursor": "abc",
+        }
@@ -373,3 +373,59 @@ class TestActivateDeactivateRoutine:
         
         # Assert - should have called execute twice (once for get, once for deactivate others)
         assert mock_db_session.execute.call_count >= 1
+
+    async def test_concurrent_activations_leave_one_active(self, pg_db_session):
+        """Racing activations of a user's routines should not hit the unique index."""
+        import asyncio
+
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        from app.services.user import ensure_user
+
+        await ensure_user(pg_db_session, "user-123", None)
+        routine_ids = [
+            (await create_routine(pg_db_session, "user-123", f"Plan {index}")).id
+            for index in range(5)
+        ]
+        sessions = async_sessionmaker(pg_db_session.bind, expire_on_commit=False)
+
+        async def activate(routine_id) -> None:
+            async with sessions() as db:
+                assert await activate_routine(db, routine_id) is not None
+
+        await asyncio.gather(*(activate(routine_id) for routine_id in routine_ids * 4))
+
+        pg_db_session.expire_all()
+        assert len(await get_user_routines(pg_db_session, "user-123", active_only=True)) == 1
+
+
+class TestRoutineSummaries:
+    """Tests for listing routines without their config."""
+
+    async def test_summary_does_not_load_config(self, db_session, count_statements):
+        """summary=True should leave the config JSON out of the query."""
+        await create_routine(
+            db=db_session,
+            user_id="user-123",
+            name="Push Pull Legs",
+            config={"days": [{"name": "Push", "exercises": ["Bankdrücken"] * 20}]},
+        )
+        db_session.expunge_all()
+        statements = count_statements(db_session)
+
+        routines = await get_user_routines(db_session, "user-123", summary=True)
+
+        assert [routine.name for routine in routines] == ["Push Pull Legs"]
+        assert "config" not in statements[0]
+
+    async def test_summary_config_access_raises(self, db_session):
+        """Reading the deferred config should fail loudly instead of loading it."""
+        from sqlalchemy.exc import InvalidRequestError
+
+        await create_routine(db=db_session, user_id="user-123", name="5x5")
+        db_session.expunge_all()
+
+        routines = await get_user_routines(db_session, "user-123", summary=True)
+
+        with pytest.raises(InvalidRequestError):
+            _ = routines[0].config
@@ -0,0 +1,221 @@
+"""Tests for the daily tracker rollups (tracker_daily_stats)."""
+
+import asyncio
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models import TrackerDailyStats
+from app.services.entry import delete_entry, save_entries, save_entry, update_entry
+from app.services.stats import (
+    backfill_daily_stats,
+    get_daily_stats,
+    summarize_daily_stats,
+)
+
+MARCH_SETS = [
+    {
+        "tracker": "Bankdrücken",
+        "data": {"weight": 80, "reps": 10},
+        "timestamp": datetime(2024, 3, 4, 18, 0),
+    },
+    {
+        "tracker": "Bankdrücken",
+        "data": {"weight": 85, "reps": 8, "sets": 3},
+        "timestamp": datetime(2024, 3, 4, 18, 5),
+    },
+    {
+        "tracker": "Bankdrücken",
+        "data": {"reps": 12, "notiz": "nur Stange"},
+        "timestamp": datetime(2024, 3, 6, 18, 0),
+    },
+    {
+        "tracker": "Bankdrücken",
+        "data": {"weight": 90, "reps": 5},
+        "timestamp": datetime(2024, 4, 1, 18, 0),
+    },
+]
+
+
+async def save_march_sets(db) -> list[uuid.UUID]:
+    results = await save_entries(db, "user-1", None, MARCH_SETS)
+    ids = [result for result in results if isinstance(result, uuid.UUID)]
+    assert len(ids) == len(MARCH_SETS)
+    return ids
+
+
+async def rollups(db) -> dict[date, TrackerDailyStats]:
+    db.expire_all()
+    result = await db.execute(select(TrackerDailyStats))
+    return {row.day: row for row in result.scalars()}
+
+
+class TestDailyRollups:
+    """The entry service should keep the rollups current."""
+
+    async def test_inserts_roll_up_per_day(self, db_session):
+        """Counts, volume, max weight and per-field stats should be aggregated by day."""
+        await save_entries(db_session, "user-1", None, MARCH_SETS)
+
+        days = await rollups(db_session)
+
+        assert sorted(days) == [date(2024, 3, 4), date(2024, 3, 6), date(2024, 4, 1)]
+        monday = days[date(2024, 3, 4)]
+        assert (monday.entry_count, monday.volume, monday.max_weight) == (
+            2,
+            800 + 2040,
+            85,
+        )
+        assert monday.fields["weight"] == {"min": 80, "max": 85, "sum": 165}
+        assert monday.fields["sets"] == {"min": 3, "max": 3, "sum": 3}
+        wednesday = days[date(2024, 3, 6)]
+        assert (wednesday.volume, wednesday.max_weight) == (None, None)
+        assert set(wednesday.fields) == {"reps"}
+
+    async def test_single_save_updates_existing_day(self, db_session):
+        """A set saved through the chat path should be added to its day."""
+        await save_entries(db_session, "user-1", None, MARCH_SETS)
+
+        await save_entry(
+            db_session,
+            "user-1",
+            None,
+            "Bankdrücken",
+            {"weight": 100, "reps": 1},
+            timestamp=datetime(2024, 3, 4, 19, 0),
+        )
+
+        monday = (await rollups(db_session))[date(2024, 3, 4)]
+        assert (monday.entry_count, monday.max_weight) == (3, 100)
+        assert monday.fields["weight"]["min"] == 80
+
+    async def test_update_moves_entry_between_days(self, db_session):
+        """Changing the timestamp should update the old and the new day."""
+        ids = await save_march_sets(db_session)
+        entry = await update_entry(
+            db_session,
+            "user-1",
+            (await rollups(db_session))[date(2024, 3, 6)].tracker_id,
+            ids[2],
+            {"timestamp": datetime(2024, 3, 4, 18, 10), "data": {"reps": 15}},
+        )
+
+        days = await rollups(db_session)
+
+        assert entry is not None
+        assert date(2024, 3, 6) not in days
+        assert days[date(2024, 3, 4)].entry_count == 3
+        assert days[date(2024, 3, 4)].fields["reps"]["max"] == 15
+
+    async def test_delete_updates_day(self, db_session):
+        """Deleting the heaviest set should lower the day's max weight."""
+        ids = await save_march_sets(db_session)
+        tracker_id = (await rollups(db_session))[date(2024, 3, 4)].tracker_id
+
+        assert await delete_entry(db_session, "user-1", tracker_id, ids[1])
+
+        monday = (await rollups(db_session))[date(2024, 3, 4)]
+        assert (monday.entry_count, monday.volume, monday.max_weight) == (1, 800, 80)
+
+    async def test_entries_of_other_users_cannot_be_changed(self, db_session):
+        """Update and delete should only find the user's own entries."""
+        ids = await save_march_sets(db_session)
+        tracker_id = (await rollups(db_session))[date(2024, 3, 4)].tracker_id
+
+        assert (
+            await update_entry(db_session, "user-2", tracker_id, ids[0], {"notes": "x"})
+            is None
+        )
+        assert not await delete_entry(db_session, "user-2", tracker_id, ids[0])
+
+    async def test_backfill_matches_incremental_rollups(self, db_session):
+        """Rebuilding from scratch should give the same rows."""
+        await save_entries(db_session, "user-1", None, MARCH_SETS)
+        before = {
+            day: (row.entry_count, row.volume, row.max_weight, row.fields)
+            for day, row in (await rollups(db_session)).items()
+        }
+        await db_session.execute(delete(TrackerDailyStats))
+        await db_session.commit()
+
+        written = await backfill_daily_stats(db_session, "user-1")
+
+        after = {
+            day: (row.entry_count, row.volume, row.max_weight, row.fields)
+            for day, row in (await rollups(db_session)).items()
+        }
+        assert written == 3
+        assert after == before
+
+    async def test_postgres_rollups(self, pg_db_session):
+        """The JSONB variant of the rollup query should give the same numbers."""
+        await save_entries(pg_db_session, "user-1", None, MARCH_SETS)
+
+        monday = (await rollups(pg_db_session))[date(2024, 3, 4)]
+
+        assert (monday.entry_count, monday.volume, monday.max_weight) == (
+            2,
+            800 + 2040,
+            85,
+        )
+        assert monday.fields["weight"] == {"min": 80, "max": 85, "sum": 165}
+
+    async def test_concurrent_saves_to_one_day_are_all_counted(self, pg_db_session):
+        """Racing writes to the same tracker-day must not overwrite each other's totals."""
+        sessions = async_sessionmaker(pg_db_session.bind, expire_on_commit=False)
+        await save_entry(pg_db_session, "user-1", None, "Bankdrücken", {"reps": 1})
+        timestamp = datetime(2024, 3, 4, 18, 0)
+
+        async def save(reps: int) -> None:
+            async with sessions() as db:
+                await save_entry(
+                    db,
+                    "user-1",
+                    None,
+                    "Bankdrücken",
+                    {"reps": reps},
+                    timestamp=timestamp,
+                )
+
+        await asyncio.gather(*(save(reps) for reps in range(20)))
+
+        monday = (await rollups(pg_db_session))[date(2024, 3, 4)]
+        assert monday.entry_count == 20
+        assert monday.fields["reps"]["sum"] == sum(range(20))
+
+
+class TestRollupQueries:
+    """Range queries should be answered from the rollups."""
+
+    async def test_kg_moved_in_march(self, db_session):
+        """ "Wieviel kg im März bewegt?" should sum the March days only."""
+        await save_entries(db_session, "user-1", None, MARCH_SETS)
+
+        march = await summarize_daily_stats(
+            db_session, "user-1", "Bankdrücken", date(2024, 3, 1), date(2024, 4, 1)
+        )
+
+        assert march == {"count": 3, "volume": 2840, "max_weight": 85}
+
+    async def test_tracker_name_is_normalized(self, db_session):
+        """The tracker should be found however the question spells its name."""
+        await save_entries(db_session, "user-1", None, MARCH_SETS)
+
+        march = await summarize_daily_stats(
+            db_session, "user-1", " bankdrücken ", date(2024, 3, 1), date(2024, 4, 1)
+        )
+
+        assert march["count"] == 3
+
+    async def test_daily_stats_for_chart_range(self, db_session):
+        """A range should return its days in order."""
+        await save_entries(db_session, "user-1", None, MARCH_SETS)
+        tracker_id = (await rollups(db_session))[date(2024, 3, 4)].tracker_id
+
+        days = await get_daily_stats(
+            db_session, "user-1", tracker_id, date(2024, 3, 5), date(2024, 4, 2)
+        )
+
+        assert [row.day for row in days] == [date(2024, 3, 6), date(2024, 4, 1)]
@@ -0,0 +1,136 @@
+"""Tests for the incremental JSON parser used for streamed AI responses."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.ai import AIService
+from app.services.stream_parser import DELTA, FIELD, IncrementalJSONParser
+
+TRACK_RESPONSE = (
+    '```json\n{"action": "track", "tracker": "Bankdr\\u00fccken", '
+    '"data": {"sets": 3, "note": "a \\"quoted\\" }"}, '
+    '"message": "Gespeichert: 3\\u00d710 mit 80kg", "component": "confirmation"}\n```'
+)
+
+
+def feed_in_chunks(parser: IncrementalJSONParser, text: str, size: int) -> list:
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i : i + size]))
+    return events
+
+
+class TestIncrementalJSONParser:
+    """Tests for finding fields in a partially received JSON document."""
+
+    def test_action_is_found_before_document_is_complete(self):
+        """The action should be reported as soon as its value is complete."""
+        parser = IncrementalJSONParser()
+
+        events = parser.feed('{"action": "track", "data": {"sets"')
+
+        assert (FIELD, "action", "track") in events
+
+    def test_message_text_is_streamed_as_it_arrives(self):
+        """The message field should be reported piece by piece."""
+        parser = IncrementalJSONParser(stream_fields=("message",))
+
+        events = feed_in_chunks(parser, TRACK_RESPONSE, size=4)
+
+        deltas = [value for kind, key, value in events if kind == DELTA]
+        assert len(deltas) > 1
+        assert "".join(deltas) == "Gespeichert: 3×10 mit 80kg"
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 1000])
+    def test_result_does_not_depend_on_chunk_boundaries(self, size: int):
+        """Escapes split across chunks should decode the same way."""
+        parser = IncrementalJSONParser()
+
+        feed_in_chunks(parser, TRACK_RESPONSE, size=size)
+
+        assert parser.fields == {
+            "action": "track",
+            "tracker": "Bankdrücken",
+            "message": "Gespeichert: 3×10 mit 80kg",
+            "component": "confirmation",
+        }
+
+    def test_strings_inside_nested_values_are_ignored(self):
+        """Only top-level fields should be reported."""
+        parser = IncrementalJSONParser()
+
+        parser.feed('{"data": {"action": "nested", "message": "no"}, "action": "chat"}')
+
+        assert parser.fields == {"action": "chat"}
+
+    def test_non_string_values_do_not_confuse_the_parser(self):
+        """Numbers, booleans and null between fields should be skipped."""
+        parser = IncrementalJSONParser()
+
+        parser.feed('{"count": 3, "ok": true, "component": null, "action": "query"}')
+
+        assert parser.fields == {"action": "query"}
+
+    def test_plain_text_produces_no_events(self):
+        """Text that isn't a JSON object should not be reported as fields."""
+        parser = IncrementalJSONParser()
+
+        events = parser.feed('Hallo! "Das" ist keine JSON-Antwort.')
+
+        assert events == []
+
+
+class TestStreamMessage:
+    """Tests for AIService.stream_message."""
+
+    @staticmethod
+    def _streaming_client(chunks: list[str]) -> MagicMock:
+        async def stream(prompt):
+            for text in chunks:
+                yield text
+
+        client = MagicMock()
+        client.stream = stream
+        return client
+
+    async def test_stream_yields_action_then_deltas_then_result(self):
+        """Events should arrive in the order the UI needs them."""
+        service = AIService(
+            client=self._streaming_client(
+                ['{"action": "chat", "mess', 'age": "Hal', 'lo!"}']
+            )
+        )
+
+        events = [event async for event in service.stream_message("Hi")]
+
+        assert events[0] == ("action", {"action": "chat"})
+        assert [e for e in events if e[0] == "delta"] == [
+            ("delta", {"text": "Hal"}),
+            ("delta", {"text": "lo!"}),
+        ]
+        assert events[-1] == ("result", {"action": "chat", "message": "Hallo!"})
+
+    async def test_stream_error_is_reported_as_result(self):
+        """Model failures should end the stream with an error result."""
+        client = MagicMock()
+
+        async def failing(prompt):
+            raise RuntimeError("quota exceeded")
+            yield
+
+        client.stream = failing
+        service = AIService(client=client)
+
+        events = [event async for event in service.stream_message("Hi")]
+
+        assert events == [
+            (
+                "result",
+                {
+                    "action": "error",
+                    "message": "AI Error: quota exceeded",
+                    "component": None,
+                },
+            )
+        ]
@@ -1,13 +1,33 @@
 """Tests for the Tracker Router endpoints."""
 
+import json
 import pytest
+from datetime import date, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
+from sqlalchemy import select
+
+from app.models import Entry, Tracker
 from app.routers.trackers import (
+    create_entries_batch,
+    create_entry,
+    create_tracker,
+    list_daily_stats,
+    list_entries,
+    list_trackers,
     update_tracker,
     delete_tracker,
 )
+from app.schemas.tracker import (
+    EntryBatchCreate,
+    EntryCreate,
+    EntryUpdate,
+    TrackerCreate,
+    TrackerSummary,
+    TrackerUpdate,
+)
+from app.services.entry import get_or_create_tracker, save_entry, tracker_id_cache
 
 
 # =============================================================================
@@ -41,7 +61,7 @@ async def test_update_tracker_updates_name_when_provided():
 
     update_data = TrackerUpdate(name="New Name")
 
-    with patch("app.routers.trackers.get_or_create_user", new_callable=AsyncMock):
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
         result = await update_tracker(
             user=mock_user,
             tracker_id=tracker_id,
@@ -82,7 +102,7 @@ async def test_update_tracker_updates_multiple_fields():
 
     update_data = TrackerUpdate(name="New Name", category="health", icon="heart", color="#FF0000")
 
-    with patch("app.routers.trackers.get_or_create_user", new_callable=AsyncMock):
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
         result = await update_tracker(
             user=mock_user,
             tracker_id=tracker_id,
@@ -120,7 +140,7 @@ async def test_update_tracker_returns_404_when_tracker_not_found():
     # Act & Assert
     from fastapi import HTTPException
 
-    with patch("app.routers.trackers.get_or_create_user", new_callable=AsyncMock):
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
         with pytest.raises(HTTPException) as exc_info:
             await update_tracker(
                 user=mock_user,
@@ -160,7 +180,7 @@ async def test_update_tracker_returns_403_when_user_does_not_own_tracker():
     # Act & Assert
     from fastapi import HTTPException
 
-    with patch("app.routers.trackers.get_or_create_user", new_callable=AsyncMock):
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
         with pytest.raises(HTTPException) as exc_info:
             await update_tracker(
                 user=mock_user,
@@ -198,7 +218,7 @@ async def test_delete_tracker_removes_tracker_from_database():
     mock_user.email = "test@example.com"
 
     # Act
-    with patch("app.routers.trackers.get_or_create_user", new_callable=AsyncMock):
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
         result = await delete_tracker(
             user=mock_user,
             tracker_id=tracker_id,
@@ -230,7 +250,7 @@ async def test_delete_tracker_returns_404_when_tracker_not_found():
     # Act & Assert
     from fastapi import HTTPException
 
-    with patch("app.routers.trackers.get_or_create_user", new_callable=AsyncMock):
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
         with pytest.raises(HTTPException) as exc_info:
             await delete_tracker(
                 user=mock_user,
@@ -263,7 +283,7 @@ async def test_delete_tracker_returns_403_when_user_does_not_own_tracker():
     # Act & Assert
     from fastapi import HTTPException
 
-    with patch("app.routers.trackers.get_or_create_user", new_callable=AsyncMock):
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
         with pytest.raises(HTTPException) as exc_info:
             await delete_tracker(
                 user=mock_user,
@@ -272,3 +292,304 @@ async def test_delete_tracker_returns_403_when_user_does_not_own_tracker():
             )
 
     assert exc_info.value.status_code == 403
+
+
+# =============================================================================
+# Test Batch Entries
+# =============================================================================
+
+
+async def test_create_entries_batch_reports_invalid_items_without_failing(db_session):
+    """Invalid items should get an error while valid ones are saved."""
+    mock_user = MagicMock()
+    mock_user.id = "test-user-123"
+    mock_user.email = "test@example.com"
+    batch = EntryBatchCreate(entries=[
+        {"tracker": "Bankdrücken", "data": {"reps": 10}},
+        {"data": {"reps": 8}},
+        {"tracker_id": str(uuid4()), "data": {"reps": 8}},
+        {"tracker": "Bankdrücken", "data": "keine Daten"},
+        {"tracker": "Bankdrücken", "data": {"reps": 6}},
+    ])
+
+    response = await create_entries_batch(user=mock_user, batch=batch, db=db_session)
+
+    assert response.created == 2
+    assert response.failed == 3
+    assert [r.index for r in response.results] == [0, 1, 2, 3, 4]
+    assert [r.id is not None for r in response.results] == [True, False, False, False, True]
+    assert "tracker_id or tracker" in (response.results[1].error or "")
+    assert response.results[2].error == "Tracker not found"
+
+
+async def test_create_entries_batch_stores_timestamps_as_naive_utc(db_session):
+    """Timestamps with an offset should be converted like the rest of the entries."""
+    mock_user = MagicMock()
+    mock_user.id = "test-user-123"
+    mock_user.email = "test@example.com"
+    batch = EntryBatchCreate(entries=[
+        {"tracker": "Schlaf", "data": {"hours": 7}, "timestamp": "2024-01-15T10:30:00+02:00"},
+    ])
+
+    response = await create_entries_batch(user=mock_user, batch=batch, db=db_session)
+
+    entry = await db_session.get(Entry, response.results[0].id)
+    assert entry.timestamp == datetime(2024, 1, 15, 8, 30)
+
+
+# =============================================================================
+# Test Tracker Name Cache
+# =============================================================================
+
+
+def make_user():
+    user = MagicMock()
+    user.id = "test-user-123"
+    user.email = "test@example.com"
+    return user
+
+
+async def test_create_tracker_populates_name_cache(db_session):
+    """A tracker created through the API should be resolvable from the cache."""
+    tracker = await create_tracker(
+        user=make_user(),
+        tracker=TrackerCreate(name="Schlaf", category="health"),
+        db=db_session,
+    )
+
+    assert tracker_id_cache.get("test-user-123", "Schlaf") == tracker.id
+
+
+async def test_create_tracker_returns_409_for_duplicate_name(db_session):
+    """Creating a second tracker with the same name should be a conflict."""
+    from fastapi import HTTPException
+
+    await create_tracker(
+        user=make_user(), tracker=TrackerCreate(name="Schlaf", category="health"), db=db_session
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await create_tracker(
+            user=make_user(), tracker=TrackerCreate(name="Schlaf", category="health"), db=db_session
+        )
+
+    assert exc_info.value.status_code == 409
+
+
+async def test_update_tracker_invalidates_old_and_new_name(db_session):
+    """Renaming a tracker should drop both names from the cache."""
+    tracker = await get_or_create_tracker(db_session, "test-user-123", "Schlaf")
+    tracker_id_cache.set("test-user-123", "Nachtruhe", uuid4())
+
+    await update_tracker(
+        user=make_user(),
+        tracker_id=tracker.id,
+        tracker_update=TrackerUpdate(name="Nachtruhe"),
+        db=db_session,
+    )
+
+    assert tracker_id_cache.get("test-user-123", "Schlaf") is None
+    assert tracker_id_cache.get("test-user-123", "Nachtruhe") is None
+
+
+async def test_delete_tracker_invalidates_cached_name(db_session):
+    """A deleted tracker should no longer resolve from the cache."""
+    tracker = await get_or_create_tracker(db_session, "test-user-123", "Schlaf")
+
+    await delete_tracker(user=make_user(), tracker_id=tracker.id, db=db_session)
+
+    assert tracker_id_cache.get("test-user-123", "Schlaf") is None
+
+
+async def test_tracker_cache_uses_normalized_names(db_session):
+    """The routes should cache under the same name save_entry looks up."""
+    tracker = await create_tracker(
+        user=make_user(), tracker=TrackerCreate(name="bankdrücken", category="fitness"), db=db_session
+    )
+    assert tracker_id_cache.get("test-user-123", "Bankdrücken") == tracker.id
+
+    await delete_tracker(user=make_user(), tracker_id=tracker.id, db=db_session)
+
+    assert tracker_id_cache.get("test-user-123", "Bankdrücken") is None
+
+
+async def test_created_tracker_is_found_without_the_cache(db_session):
+    """A tracker created by the route should be reused by save_entry after a cache clear."""
+    tracker = await create_tracker(
+        user=make_user(), tracker=TrackerCreate(name="bankdrücken", category="fitness"), db=db_session
+    )
+    tracker_id_cache.clear()
+
+    entry = await save_entry(db_session, "test-user-123", None, "bankdrücken", {"reps": 10})
+
+    trackers = (await db_session.execute(select(Tracker))).scalars().all()
+    assert [t.id for t in trackers] == [tracker.id]
+    assert entry.tracker_id == tracker.id
+
+
+async def test_renamed_tracker_is_stored_normalized(db_session):
+    """Renaming should store the name the way save_entry looks it up."""
+    tracker = await get_or_create_tracker(db_session, "test-user-123", "Schlaf")
+
+    await update_tracker(
+        user=make_user(),
+        tracker_id=tracker.id,
+        tracker_update=TrackerUpdate(name=" nachtruhe"),
+        db=db_session,
+    )
+
+    assert tracker.name == "Nachtruhe"
+
+
+# =============================================================================
+# Test Entry Pagination
+# =============================================================================
+
+
+async def test_list_entries_pages_with_cursor(db_session):
+    """Entries should be listed page by page until next_cursor is None."""
+    tracker = await get_or_create_tracker(db_session, "test-user-123", "Schlaf")
+    for hours in range(5):
+        db_session.add(Entry(user_id="test-user-123", tracker_id=tracker.id, data={"hours": hours}))
+    await db_session.commit()
+
+    response = await list_entries(
+        user=make_user(), tracker_id=tracker.id, limit=3, cursor=None, db=db_session
+    )
+    first = json.loads(bytes(response.body))
+    response = await list_entries(
+        user=make_user(), tracker_id=tracker.id, limit=3, cursor=first["next_cursor"], db=db_session
+    )
+    second = json.loads(bytes(response.body))
+
+    assert len(first["items"]) == 3
+    assert len(second["items"]) == 2
+    assert second["next_cursor"] is None
+    assert {entry["id"] for entry in first["items"]}.isdisjoint(
+        entry["id"] for entry in second["items"]
+    )
+
+
+async def test_list_entries_returns_400_for_invalid_cursor(db_session):
+    """A malformed cursor should be a client error."""
+    from fastapi import HTTPException
+
+    tracker = await get_or_create_tracker(db_session, "test-user-123", "Schlaf")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await list_entries(
+            user=make_user(), tracker_id=tracker.id, limit=3, cursor="abc", db=db_session
+        )
+
+    assert exc_info.value.status_code == 400
+
+
+# =============================================================================
+# Test Entry Schemas
+# =============================================================================
+
+
+def test_entry_update_rejects_null_data_and_timestamp():
+    """data and timestamp may be left out of an update but not set to null."""
+    from pydantic import ValidationError
+
+    for field in ("data", "timestamp"):
+        with pytest.raises(ValidationError):
+            EntryUpdate.model_validate({field: None})
+
+    assert EntryUpdate.model_validate({"notes": None}).model_dump(exclude_unset=True) == {
+        "notes": None
+    }
+
+
+def test_entry_timestamps_are_stored_as_naive_utc():
+    """Created and updated entries should convert offsets like batch items."""
+    timestamp = "2024-01-15T10:30:00+02:00"
+
+    created = EntryCreate.model_validate({"data": {}, "timestamp": timestamp})
+    updated = EntryUpdate.model_validate({"timestamp": timestamp})
+
+    assert created.timestamp == datetime(2024, 1, 15, 8, 30)
+    assert updated.timestamp == datetime(2024, 1, 15, 8, 30)
+
+
+# =============================================================================
+# Test Daily Stats
+# =============================================================================
+
+
+async def test_created_entry_shows_up_in_daily_stats(db_session):
+    """Entries created through the API should be rolled up for charts."""
+    tracker = await get_or_create_tracker(db_session, "test-user-123", "Gewicht")
+    with patch("app.routers.trackers.ensure_user", new_callable=AsyncMock):
+        await create_entry(
+            user=make_user(),
+            tracker_id=tracker.id,
+            entry=EntryCreate(data={"weight": 82.5}, timestamp=datetime(2024, 3, 4, 7, 0)),
+            db=db_session,
+        )
+
+    response = await list_daily_stats(
+        user=make_user(),
+        tracker_id=tracker.id,
+        since=date(2024, 3, 1),
+        until=date(2024, 4, 1),
+        db=db_session,
+    )
+
+    days = json.loads(bytes(response.body))
+    assert [(row["day"], row["max_weight"]) for row in days] == [("2024-03-04", 82.5)]
+
+
+async def test_daily_stats_range_is_limited(db_session):
+    """Requests spanning more than the maximum range should be rejected."""
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as exc_info:
+        await list_daily_stats(
+            user=make_user(),
+            tracker_id=uuid4(),
+            since=date(2000, 1, 1),
+            until=date(2024, 1, 1),
+            db=db_session,
+        )
+
+    assert exc_info.value.status_code == 400
+
+
+# =============================================================================
+# Test Tracker List Projection
+# =============================================================================
+
+
+async def test_list_trackers_summary_leaves_out_schema(db_session, count_statements):
+    """fields=summary should neither select nor return the schema JSON."""
+    await create_tracker(
+        user=make_user(),
+        tracker=TrackerCreate(
+            name="Bankdrücken", category="fitness", schema={"fields": ["weight", "reps"]}
+        ),
+        db=db_session,
+    )
+    db_session.expunge_all()
+    statements = count_statements(db_session)
+
+    trackers = await list_trackers(user=make_user(), fields="summary", db=db_session)
+
+    assert [tracker.name for tracker in trackers] == ["Bankdrücken"]
+    assert isinstance(trackers[0], TrackerSummary)
+    assert "schema" not in trackers[0].model_dump()
+    assert "schema" not in statements[0]
+
+
+async def test_list_trackers_returns_schema_by_default(db_session):
+    """Without fields the full trackers should be listed, as before."""
+    await create_tracker(
+        user=make_user(),
+        tracker=TrackerCreate(name="Schlaf", category="health", schema={"unit": "h"}),
+        db=db_session,
+    )
+
+    trackers = await list_trackers(user=make_user(), fields="full", db=db_session)
+
+    assert trackers[0].schema == {"unit": "h"}
@@ -0,0 +1,111 @@
+"""Tests for the User Service and the known-user cache."""
+
+from sqlalchemy import select
+
+from app.models import User
+from app.services.user import (
+    KnownUserCache,
+    ensure_user,
+    get_or_create_user,
+    known_users,
+    user_cache_stats,
+)
+
+
+class TestEnsureUser:
+    """Tests for ensure_user with the per-worker cache."""
+
+    async def test_first_sight_creates_user(self, db_session):
+        """An unknown user should be created in the database."""
+        await ensure_user(db_session, "user-1", "a@example.com")
+
+        user = (await db_session.execute(select(User))).scalar_one()
+        assert user.email == "a@example.com"
+
+    async def test_known_user_needs_no_queries(self, db_session, count_statements):
+        """Once seen, later requests should not touch the users table."""
+        await ensure_user(db_session, "user-1", "a@example.com")
+        statements = count_statements(db_session)
+
+        for _ in range(5):
+            await ensure_user(db_session, "user-1", "a@example.com")
+
+        assert statements == []
+
+    async def test_changed_email_claim_updates_the_row(self, db_session):
+        """A new email in the Clerk claims should bypass the cache and be saved."""
+        await ensure_user(db_session, "user-1", "old@example.com")
+
+        await ensure_user(db_session, "user-1", "new@example.com")
+
+        user = (await db_session.execute(select(User))).scalar_one()
+        assert user.email == "new@example.com"
+        assert await known_users.contains("user-1", "new@example.com")
+
+    async def test_hits_and_misses_are_counted(self, db_session):
+        """The hit ratio metric should reflect cache use."""
+        hits, misses = user_cache_stats.hits, user_cache_stats.misses
+
+        await ensure_user(db_session, "user-1", "a@example.com")
+        await ensure_user(db_session, "user-1", "a@example.com")
+
+        assert user_cache_stats.misses - misses == 1
+        assert user_cache_stats.hits - hits == 1
+
+    async def test_get_or_create_user_populates_the_cache(self, db_session):
+        """Users loaded through get_or_create_user should become known."""
+        await get_or_create_user(db_session, "user-1", "a@example.com", "Anna")
+
+        assert await known_users.contains("user-1", "a@example.com", "Anna")
+
+
+class TestKnownUserCache:
+    """Tests for the cache itself."""
+
+    async def test_entries_expire_after_ttl(self):
+        """Expired entries should no longer count as known."""
+        cache = KnownUserCache(max_size=10, ttl_seconds=-1)
+        await cache.add("user-1", "a@example.com", None)
+
+        assert not await cache.contains("user-1")
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        """The cache should not grow beyond its size."""
+        cache = KnownUserCache(max_size=2, ttl_seconds=60)
+        await cache.add("user-1", "a@example.com", None)
+        await cache.add("user-2", "b@example.com", None)
+        await cache.contains("user-1")
+
+        await cache.add("user-3", "c@example.com", None)
+
+        assert await cache.contains("user-1")
+        assert not await cache.contains("user-2")
+
+    async def test_claims_must_match(self):
+        """Only given claims are compared, missing ones match anything."""
+        cache = KnownUserCache(max_size=10, ttl_seconds=60)
+        await cache.add("user-1", "a@example.com", "Anna")
+
+        assert await cache.contains("user-1")
+        assert await cache.contains("user-1", "a@example.com")
+        assert not await cache.contains("user-1", "b@example.com")
+        assert not await cache.contains("user-1", name="Berta")
+
+    async def test_redis_shares_users_between_workers(self, fake_redis):
+        """A user added by one worker should be known to another through Redis."""
+        worker_a = KnownUserCache(max_size=10, ttl_seconds=60, redis_client=fake_redis)
+        worker_b = KnownUserCache(max_size=10, ttl_seconds=60, redis_client=fake_redis)
+
+        await worker_a.add("user-1", "a@example.com", None)
+
+        assert await worker_b.contains("user-1", "a@example.com")
+
+    async def test_invalidate_removes_shared_entry(self, fake_redis):
+        """Invalidation should reach Redis as well."""
+        worker_a = KnownUserCache(max_size=10, ttl_seconds=60, redis_client=fake_redis)
+        worker_b = KnownUserCache(max_size=10, ttl_seconds=60, redis_client=fake_redis)
+        await worker_a.add("user-1", "a@example.com", None)
+
+        await worker_a.invalidate("user-1")
+
+        assert not await worker_b.contains("user-1")
@@ -4,16 +4,19 @@ import { apiClient } from "./client"
 // Types
 // =============================================================================
 
-export interface Tracker {
+export interface TrackerSummary {
   id: string
   name: string
   category: string
-  schema: Record<string, unknown>
   icon: string | null
   color: string | null
   created_at: string
 }
 
+export interface Tracker extends TrackerSummary {
+  schema: Record<string, unknown>
+}
+
 export interface TrackerCreate {
   name: string
   category: string
@@ -39,6 +42,11 @@ export interface Entry {
   created_at: string
 }
 
+export interface EntryPage {
+  items: Entry[]
+  next_cursor: string | null
+}
+
 export interface EntryCreate {
   data: Record<string, unknown>
   notes?: string | null
@@ -50,10 +58,10 @@ export interface EntryCreate {
 // =============================================================================
 
 /**
- * Get all trackers for the current user.
+ * Get all trackers for the current user, without their schema.
  */
-export async function getTrackers(): Promise<Tracker[]> {
-  return apiClient<Tracker[]>("/trackers")
+export async function getTrackers(): Promise<TrackerSummary[]> {
+  return apiClient<TrackerSummary[]>("/trackers?fields=summary")
 }
 
 /**
@@ -93,10 +101,17 @@ export async function deleteTracker(trackerId: string): Promise<{ message: strin
 }
 
 /**
- * Get entries for a tracker.
+ * Get a page of entries for a tracker, newest first.
+ * Pass the previous page's next_cursor to get the following page.
  */
-export async function getTrackerEntries(trackerId: string, limit = 50): Promise<Entry[]> {
-  return apiClient<Entry[]>(`/trackers/${trackerId}/entries?limit=${limit}`)
+export async function getTrackerEntries(
+  trackerId: string,
+  limit = 50,
+  cursor?: string | null,
+): Promise<EntryPage> {
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (cursor) params.set("cursor", cursor)
+  return apiClient<EntryPage>(`/trackers/${trackerId}/entries?${params}`)
 }
 
 /**
@@ -1,12 +1,12 @@
 import { Edit2, Trash2 } from "lucide-react"
-import type { Tracker } from "@/api/trackers"
+import type { TrackerSummary } from "@/api/trackers"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 
 interface TrackerCardProps {
-  tracker: Tracker
-  onEdit: (tracker: Tracker) => void
-  onDelete: (tracker: Tracker) => void
+  tracker: TrackerSummary
+  onEdit: (tracker: TrackerSummary) => void
+  onDelete: (tracker: TrackerSummary) => void
 }
 
 const CATEGORY_COLORS: Record<string, string> = {
@@ -1,10 +1,10 @@
 import { X } from "lucide-react"
 import { useState } from "react"
-import type { Tracker, TrackerCreate, TrackerUpdate } from "@/api/trackers"
+import type { TrackerCreate, TrackerSummary, TrackerUpdate } from "@/api/trackers"
 import { Button } from "@/components/ui/button"
 
 interface TrackerFormProps {
-  tracker?: Tracker
+  tracker?: TrackerSummary
   onSubmit: (data: TrackerCreate | TrackerUpdate) => Promise<void>
   onCancel: () => void
   isLoading?: boolean
@@ -5,7 +5,7 @@ import {
   createTracker,
   deleteTracker,
   getTrackers,
-  type Tracker,
+  type TrackerSummary,
   type TrackerCreate,
   type TrackerUpdate,
   updateTracker,
@@ -20,17 +20,17 @@ export const Route = createFileRoute("/trackers")({
 })
 
 function TrackersPage() {
-  const [trackers, setTrackers] = useState<Tracker[]>([])
+  const [trackers, setTrackers] = useState<TrackerSummary[]>([])
   const [isLoading, setIsLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
   // Form state
   const [showForm, setShowForm] = useState(false)
-  const [editingTracker, setEditingTracker] = useState<Tracker | undefined>()
+  const [editingTracker, setEditingTracker] = useState<TrackerSummary | undefined>()
   const [isSubmitting, setIsSubmitting] = useState(false)
 
   // Delete confirmation state
-  const [deletingTracker, setDeletingTracker] = useState<Tracker | null>(null)
+  const [deletingTracker, setDeletingTracker] = useState<TrackerSummary | null>(null)
 
   const loadTrackers = useCallback(async () => {
     setIsLoading(true)
@@ -54,12 +54,12 @@ function TrackersPage() {
     setShowForm(true)
   }
 
-  const handleEdit = (tracker: Tracker) => {
+  const handleEdit = (tracker: TrackerSummary) => {
     setEditingTracker(tracker)
     setShowForm(true)
   }
 
-  const handleDeleteClick = (tracker: Tracker) => {
+  const handleDeleteClick = (tracker: TrackerSummary) => {
     setDeletingTracker(tracker)
   }
 